@@ -16,11 +16,12 @@ __status__ = "Pre-Alpha"
 
 ## Import Map class
 from .map import Map
+from .viewport import Viewport
 
 ## Import Base Classes
 from .base_renderer import BaseRenderer
 from .skia_renderer import SkiaRenderer
-from .base_style import BaseStyle
+from .base_style import BaseStyle, CompiledStyle
 
 ## Import Layers
 from .raster_layer import RasterLayer
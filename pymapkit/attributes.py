@@ -0,0 +1,491 @@
+"""
+Project: PyMapKit
+File: attributes.py
+Title: Columnar Attribute Storage
+Function: Provides typed attribute columns, with dictionary encoded strings
+    and null masks, and a table of columns holding the attributes of a layer.
+Author: Ben Knisley [benknisley@gmail.com]
+Created: 16 October, 2026
+"""
+import abc
+import numbers
+import operator
+from collections.abc import MutableMapping
+import numpy as np
+
+
+## Comparison operators supported by AttributeColumn.compare
+OPERATORS = {
+    '==': operator.eq, '!=': operator.ne,
+    '<': operator.lt, '>': operator.gt,
+    '<=': operator.le, '>=': operator.ge,
+}
+
+
+def value_kind(value):
+    """
+    Returns the kind of column needed to hold a value.
+
+    Args:
+        value (*): The value.
+
+    Returns:
+        kind (string): One of 'null', 'bool', 'int', 'float', 'string', or
+        'object'.
+    """
+    if value is None:
+        return 'null'
+    if isinstance(value, (bool, np.bool_)):
+        return 'bool'
+    if isinstance(value, numbers.Integral):
+        ## Ints too large for int64 are held as objects
+        return 'int' if -2**63 <= value < 2**63 else 'object'
+    if isinstance(value, numbers.Real):
+        return 'float'
+    if isinstance(value, str):
+        return 'string'
+    return 'object'
+
+
+def common_kind(kind, other_kind):
+    """ Returns the kind of column that can hold values of two kinds. """
+    if kind == other_kind or other_kind == 'null':
+        return kind
+    if kind == 'null':
+        return other_kind
+    if {kind, other_kind} == {'int', 'float'}:
+        return 'float'
+    return 'object'
+
+
+class AttributeColumn(metaclass=abc.ABCMeta):
+    """
+    The base class of attribute columns.
+
+    A column holds one value for each row of a table. Values are read and set
+    by row index, as python values, with None for missing values. Subclasses
+    hold the values in typed arrays, and override the whole column methods
+    with vectorized versions.
+    """
+    kind = None
+
+    def __len__(self):
+        """ Returns the number of values in the column. """
+        return self.size
+
+    def _check_index(self, index):
+        """ Returns a row index, counted from the end if negative. """
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("attribute index out of range")
+        return index
+
+    @abc.abstractmethod
+    def __getitem__(self, index):
+        """ Returns the value at a row, or None if it is missing. """
+
+    @abc.abstractmethod
+    def __setitem__(self, index, value):
+        """ Sets the value at a row. The column must accept the value. """
+
+    @abc.abstractmethod
+    def accepts(self, value):
+        """ Returns whether the column can hold a value. """
+
+    @abc.abstractmethod
+    def resize(self, size):
+        """ Grows the column to a number of rows, adding missing values. """
+
+    def append(self, value):
+        """ Adds a value to the end of the column. """
+        self.resize(self.size + 1)
+        self[self.size - 1] = value
+
+    @property
+    def null_mask(self):
+        """ A boolean array, True for each row with a missing value. """
+        return np.array([value is None for value in self.tolist()], dtype=bool)
+
+    def tolist(self):
+        """ Returns the values of the column as a list. """
+        return [self[index] for index in range(len(self))]
+
+    def compare(self, op, value):
+        """
+        Compares every value in the column to a value.
+
+        Args:
+            op (string): The comparison operator, one of '==', '!=', '<', '>',
+            '<=', or '>='.
+
+            value (*): The value to compare to.
+
+        Returns:
+            mask (numpy.ndarray): A boolean array, True for each row where the
+            comparison is true. Missing values never match.
+        """
+        compare_fn = OPERATORS[op]
+        return np.array([item is not None and compare_fn(item, value) for item in self.tolist()], dtype=bool)
+
+
+class NullColumn(AttributeColumn):
+    """ A column with no values set yet, which only holds None. """
+    kind = 'null'
+
+    def __init__(self, size=0):
+        self.size = size
+
+    def __getitem__(self, index):
+        self._check_index(index)
+        return None
+
+    def __setitem__(self, index, value):
+        self._check_index(index)
+
+    def accepts(self, value):
+        return value is None
+
+    def resize(self, size):
+        self.size = size
+
+    @property
+    def null_mask(self):
+        return np.ones(self.size, dtype=bool)
+
+    def tolist(self):
+        return [None] * self.size
+
+    def compare(self, op, value):
+        return np.zeros(self.size, dtype=bool)
+
+
+class NumericColumn(AttributeColumn):
+    """
+    A column of bool, int, or float values, held in a typed array with a null
+    mask. Missing values hold 0, or nan for floats, in the values array.
+    """
+    dtypes = {'bool': np.bool_, 'int': np.int64, 'float': np.float64}
+
+    ## Python types held without checks, by column kind
+    exact_types = {'bool': (bool,), 'int': (int,), 'float': (float, int)}
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.size = 0
+        self._null_value = np.nan if kind == 'float' else 0
+        self._types = self.exact_types[kind]
+
+        ## Space past the size holds missing values, ready to be used
+        self._values = np.full(64, self._null_value, dtype=self.dtypes[kind])
+        self._nulls = np.ones(64, dtype=bool)
+
+    @property
+    def values(self):
+        """ A view of the typed values. """
+        return self._values[:self.size]
+
+    @property
+    def null_mask(self):
+        return self._nulls[:self.size]
+
+    def __getitem__(self, index):
+        index = self._check_index(index)
+        if self._nulls[index]:
+            return None
+        return self._values[index].item()
+
+    def __setitem__(self, index, value):
+        index = self._check_index(index)
+        if value is None:
+            self._nulls[index] = True
+            self._values[index] = self._null_value
+        else:
+            self._nulls[index] = False
+            self._values[index] = value
+
+    def accepts(self, value):
+        if value is None:
+            return True
+        if type(value) in self._types:
+            return self.kind != 'int' or -2**63 <= value < 2**63
+        kind = value_kind(value)
+        return kind == self.kind or (self.kind == 'float' and kind == 'int')
+
+    def resize(self, size):
+        capacity = len(self._values)
+        if size > capacity:
+            ## Grow geometrically, so adding rows one at a time is amortized
+            capacity = max(size, 2 * capacity)
+            values = np.full(capacity, self._null_value, dtype=self._values.dtype)
+            values[:self.size] = self._values[:self.size]
+            nulls = np.ones(capacity, dtype=bool)
+            nulls[:self.size] = self._nulls[:self.size]
+            self._values, self._nulls = values, nulls
+        self.size = size
+
+    def tolist(self):
+        values = self.values.tolist()
+        for index in np.flatnonzero(self.null_mask):
+            values[index] = None
+        return values
+
+    def compare(self, op, value):
+        ## Non numbers are compared value by value, like python would
+        if not isinstance(value, numbers.Real):
+            return AttributeColumn.compare(self, op, value)
+        return OPERATORS[op](self.values, value) & ~self.null_mask
+
+
+class StringColumn(AttributeColumn):
+    """
+    A dictionary encoded column of strings.
+
+    Each distinct string is held once in categories, and each row holds the
+    int32 code of its string, or -1 for a missing value. Comparisons are done
+    once per category, not once per row.
+    """
+    kind = 'string'
+
+    def __init__(self):
+        self.categories = []
+        self._category_codes = {}
+        self.size = 0
+
+        ## Space past the size holds missing values, ready to be used
+        self._codes = np.full(64, -1, dtype=np.int32)
+
+    @property
+    def codes(self):
+        """ A view of the category code of each row, -1 if missing. """
+        return self._codes[:self.size]
+
+    @property
+    def null_mask(self):
+        return self.codes < 0
+
+    def _encode(self, value):
+        """ Returns the code of a string, adding it as a category if new. """
+        if value is None:
+            return -1
+        code = self._category_codes.get(value)
+        if code is None:
+            code = self._category_codes[value] = len(self.categories)
+            self.categories.append(value)
+        return code
+
+    def __getitem__(self, index):
+        code = self._codes[self._check_index(index)]
+        return None if code < 0 else self.categories[code]
+
+    def __setitem__(self, index, value):
+        self._codes[self._check_index(index)] = self._encode(value)
+
+    def accepts(self, value):
+        return value is None or isinstance(value, str)
+
+    def resize(self, size):
+        capacity = len(self._codes)
+        if size > capacity:
+            codes = np.full(max(size, 2 * capacity), -1, dtype=np.int32)
+            codes[:self.size] = self._codes[:self.size]
+            self._codes = codes
+        self.size = size
+
+    def tolist(self):
+        categories = self.categories + [None]
+        return [categories[code] for code in self.codes.tolist()]
+
+    def compare(self, op, value):
+        ## Compare each category once, then look up the result of each row
+        compare_fn = OPERATORS[op]
+        matches = [compare_fn(category, value) for category in self.categories]
+        matches = np.array(matches + [False], dtype=bool)
+        return matches[self.codes]
+
+
+class ObjectColumn(AttributeColumn):
+    """ A column of values of any type, held in a list. """
+    kind = 'object'
+
+    def __init__(self, values=None):
+        self._values = [] if values is None else list(values)
+
+    @property
+    def size(self):
+        return len(self._values)
+
+    def __getitem__(self, index):
+        return self._values[index]
+
+    def __setitem__(self, index, value):
+        self._values[index] = value
+
+    def accepts(self, value):
+        return True
+
+    def resize(self, size):
+        self._values.extend([None] * (size - len(self._values)))
+
+    def tolist(self):
+        return list(self._values)
+
+
+def new_column(kind, values=()):
+    """
+    Creates a column of a kind, holding the given values.
+
+    Args:
+        kind (string): The kind of column, one of 'null', 'bool', 'int',
+        'float', 'string', or 'object'.
+
+    Optional Args:
+        values (list): The values to fill the column with. Must all be
+        accepted by the column.
+
+    Returns:
+        column (AttributeColumn): The new column.
+    """
+    if kind == 'null':
+        return NullColumn(len(values))
+    if kind in NumericColumn.dtypes:
+        column = NumericColumn(kind)
+    elif kind == 'string':
+        column = StringColumn()
+    else:
+        return ObjectColumn(values)
+
+    column.resize(len(values))
+    for index, value in enumerate(values):
+        if value is not None:
+            column[index] = value
+    return column
+
+
+class AttributeTable:
+    """
+    Holds the attributes of a layer, in a column per field.
+
+    Columns are typed by the values they hold. Fields can be given a kind,
+    otherwise the kind is inferred from the first value set. Setting a value
+    a column can not hold converts the column to a kind that can, e.g. int to
+    float, or anything to object.
+    """
+
+    def __init__(self, field_names, field_kinds=None):
+        """
+        Initializes a new, empty AttributeTable object.
+
+        Args:
+            field_names (list): The names of the fields.
+
+        Optional Args:
+            field_kinds (dict): The column kind of each field, by name. Fields
+            not given start as null columns, typed by their first value.
+
+        Returns:
+            None
+        """
+        field_kinds = field_kinds or {}
+        self.row_count = 0
+        self._columns = {field: new_column(field_kinds.get(field, 'null')) for field in field_names}
+
+    def __len__(self):
+        """ Returns the number of rows in the table. """
+        return self.row_count
+
+    def __contains__(self, field):
+        """ Returns whether the table has a field. """
+        return field in self._columns
+
+    @property
+    def fields(self):
+        """ The names of the fields of the table. """
+        return list(self._columns)
+
+    def append_row(self):
+        """ 
+        Adds a row, with every value missing, to the end of the table. Columns
+        are only grown when they are next used.
+        """
+        self.row_count += 1
+
+    def column(self, field):
+        """ Returns the column of a field, with a value for every row. """
+        column = self._columns[field]
+        if column.size != self.row_count:
+            column.resize(self.row_count)
+        return column
+
+    def get(self, index, field):
+        """ Returns the value of a field at a row. """
+        column = self._columns[field]
+        if 0 <= index < self.row_count and index >= column.size:
+            return None
+        return column[index]
+
+    def set(self, index, field, value):
+        """
+        Sets the value of a field at a row.
+
+        Adds a column for new fields, and converts the field's column if it
+        can not hold the value.
+
+        Args:
+            index (int): The index of the row.
+
+            field (string): The name of the field.
+
+            value (*): The value to set.
+
+        Returns:
+            None
+        """
+        column = self._columns.get(field)
+        if column is None:
+            column = self._columns[field] = NullColumn(self.row_count)
+        elif column.size != self.row_count:
+            column.resize(self.row_count)
+
+        if not column.accepts(value):
+            kind = common_kind(column.kind, value_kind(value))
+            column = self._columns[field] = new_column(kind, column.tolist())
+        column[index] = value
+
+    def row(self, index):
+        """ Returns a dict of the values of every field at a row. """
+        return {field: self.get(index, field) for field in self._columns}
+
+
+class AttributeRow(MutableMapping):
+    """
+    A dict-like view of the values of every field at a row of a table.
+
+    Reads and writes go through to the table, so setting a value converts its
+    column as AttributeTable.set does. Setting a new field adds it to the 
+    whole table. Fields can not be deleted from a single row.
+    """
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    def __getitem__(self, field):
+        if field not in self.table:
+            raise KeyError(field)
+        return self.table.get(self.index, field)
+
+    def __setitem__(self, field, value):
+        self.table.set(self.index, field, value)
+
+    def __delitem__(self, field):
+        raise TypeError("attribute fields can not be deleted from a single row")
+
+    def __iter__(self):
+        return iter(self.table.fields)
+
+    def __len__(self):
+        return len(self.table.fields)
+
+    def __repr__(self):
+        return repr(self.table.row(self.index))
@@ -3,6 +3,7 @@ Author: Ben Knisley [benknisley@gmail.com]
 Date: 19 January, 2020
 """
 import abc
+import threading
 
 class BaseLayer(metaclass=abc.ABCMeta):
     """
@@ -25,6 +26,20 @@ class BaseLayer(metaclass=abc.ABCMeta):
         self.name = None ## Holds the name of the layer
         self.status = False ## Signals what the layer is doing or need done ==>
         ## => Such as 'loading', 'downloading', 'projecting', 'rendering', 'done'
+
+        ## Opacity the layer is composited with, 0-1
+        self.opacity = 1
+
+        ## Signals that the parent map changed, and activate needs to run again
+        self.stale = False
+        self._refresh_lock = threading.Lock() ## Held while activate reruns
+        self._stale_lock = threading.Lock() ## Guards the flags below
+        self._refreshing = False ## Signals that activate is being rerun
+        self._restaled = False ## Signals a mark_stale during the rerun
+
+        ## Counts changes to the layer's content or style, so the parent map
+        ## knows when a cached render of the layer is out of date
+        self.version = 0
     
     def _activate(self, new_parent):
         '''
@@ -49,6 +64,7 @@ class BaseLayer(metaclass=abc.ABCMeta):
 
         ## Run child's activate method
         self.activate()
+        self.mark_dirty()
 
     def _deactivate(self):
         '''
@@ -70,8 +86,85 @@ class BaseLayer(metaclass=abc.ABCMeta):
         
         ## Remove parent map object and call child's deactivate method
         self.map = None
+        self.stale = False
         self.deactivate()
 
+    def mark_stale(self):
+        '''
+        Marks the layer as needing to be reactivated.
+
+        Called by the parent map when a change to it, such as a new projection,
+        invalidates the layer's data. The layer is not reactivated until 
+        refresh is called, usually the first time it is rendered or queried.
+
+        Args:
+            None
+    
+        Returns:
+            None
+        '''
+        with self._stale_lock:
+            self.stale = True
+            if self._refreshing:
+                self._restaled = True
+
+    def refresh(self):
+        '''
+        Reactivates the layer if it is stale.
+
+        Calls the child layer's 'activate' method if the layer has been marked
+        stale, otherwise does nothing. Safe to call from several threads, only
+        one will reactivate the layer while the others wait for it. The layer
+        stays stale until activate finishes, and if it is marked stale again
+        while activating, it is reactivated again before returning.
+
+        Args:
+            None
+    
+        Returns:
+            None
+        '''
+        ## Layer only stops being stale once activate has finished
+        if not self.stale:
+            return
+
+        with self._refresh_lock:
+            ## Layer may have been refreshed while waiting on the lock
+            while self.stale and self.map != None:
+                with self._stale_lock:
+                    self._refreshing = True
+                    self._restaled = False
+                try:
+                    self.activate()
+                except BaseException:
+                    ## Leave layer stale, so the next refresh tries again
+                    with self._stale_lock:
+                        self._refreshing = False
+                    raise
+
+                ## Only clear flag if not marked stale again during activate
+                with self._stale_lock:
+                    self._refreshing = False
+                    if not self._restaled:
+                        self.stale = False
+                self.mark_dirty()
+
+    def mark_dirty(self):
+        '''
+        Marks the layer as needing to be redrawn.
+
+        Called when the layer's content or style changes. Increments the 
+        layer's version, so any cached render of the layer is redrawn the next
+        time the map is rendered.
+
+        Args:
+            None
+    
+        Returns:
+            None
+        '''
+        self.version += 1
+
     def focus(self):
         ''' 
         Focus on the layer.
@@ -90,7 +183,8 @@ class BaseLayer(metaclass=abc.ABCMeta):
         if self.map == None:
             raise Exception("Layer is not activated.")
         
-        ## Get layer extent
+        ## Get layer extent, reactivating layer first if needed
+        self.refresh()
         min_x, min_y, max_x, max_y = self.get_extent()
 
         ## Calculate center and set new map coord 
@@ -174,7 +268,7 @@ class BaseLayer(metaclass=abc.ABCMeta):
         '''
 
     @abc.abstractmethod
-    def render(self, renderer, canvas):
+    def render(self, renderer, canvas, viewport=None):
         ''' 
         Abstract method to be implemented by child layer. 
         Draws the layer onto a canvas using the renderer.
@@ -183,6 +277,10 @@ class BaseLayer(metaclass=abc.ABCMeta):
         renderer (BaseRenderer): The renderer to use to draw on the canvas.
 
         canvas (Unknown): The canvas to draw on.
+
+        Optional Args:
+        viewport (Viewport): The snapshot of the map view to draw. Layers get 
+        one from the map with map.get_viewport() if not given.
     
         Returns:
             None
@@ -249,11 +249,11 @@ class BaseRenderer(metaclass=abc.ABCMeta):
             structure (list[ints]): The structure of the geometry. A list of
                 integers counting the number of points in each subgeomtry.
             
-            x_values (list[int]): List of x values of pixel coordinates for 
-                each point.
+            x_values (list[int] | numpy.ndarray): The x values of pixel 
+                coordinates for each point.
             
-            y_values (list[int]): List of y values of pixel coordinates for 
-                each point.
+            y_values (list[int] | numpy.ndarray): The y values of pixel 
+                coordinates for each point.
             
             style (VectorLayer.FeatureStyle): A FeatureStyle containing the
                 style properties for the point.
@@ -277,11 +277,11 @@ class BaseRenderer(metaclass=abc.ABCMeta):
             structure (list[ints]): The structure of the geometry. A list of
                 integers counting the number of points in each subgeomtry.
             
-            x_values (list[int]): List of x values of pixel coordinates for 
-                each point.
+            x_values (list[int] | numpy.ndarray): The x values of pixel 
+                coordinates for each point.
             
-            y_values (list[int]): List of y values of pixel coordinates for 
-                each point.
+            y_values (list[int] | numpy.ndarray): The y values of pixel 
+                coordinates for each point.
             
             style (VectorLayer.FeatureStyle): A FeatureStyle containing the
                 style properties for the line.
@@ -305,11 +305,11 @@ class BaseRenderer(metaclass=abc.ABCMeta):
             structure (list[ints]): The structure of the geometry. A list of
                 integers counting the number of points in each subgeomtry.
             
-            x_values (list[int]): List of x values of pixel coordinates for 
-                each point.
+            x_values (list[int] | numpy.ndarray): The x values of pixel 
+                coordinates for each point.
             
-            y_values (list[int]): List of y values of pixel coordinates for 
-                each point.
+            y_values (list[int] | numpy.ndarray): The y values of pixel 
+                coordinates for each point.
             
             style (VectorLayer.FeatureStyle): A FeatureStyle containing the
                 style properties for the polygon.
@@ -383,4 +383,126 @@ class BaseRenderer(metaclass=abc.ABCMeta):
     
         Returns:
             None
-        """
\ No newline at end of file
+        """
+
+    """ Offscreen surfaces, optional for renderers """
+
+    ## Whether the renderer implements the offscreen methods below
+    supports_offscreen = False
+
+    def new_offscreen(self, width, height):
+        """
+        Optional method to be implemented by subclass.
+
+        Implemented method should return a new, transparent offscreen surface
+        with the given width and height. Unlike new_canvas, it must not change
+        the surface that save writes out.
+
+        Args:
+            width (int): The width in pixels of the new surface.
+
+            height (int): The height in pixels of the new surface.
+        
+        Returns:
+            offscreen (*): An offscreen surface of the drawing library.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support offscreen surfaces")
+
+    def offscreen_canvas(self, offscreen):
+        """
+        Optional method to be implemented by subclass.
+
+        Implemented method should return the canvas that draws onto the given
+        offscreen surface.
+
+        Args:
+            offscreen (*): An offscreen surface from new_offscreen.
+        
+        Returns:
+            canvas (*): A canvas object of the drawing library.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support offscreen surfaces")
+
+    def draw_offscreen(self, canvas, offscreen, x=0, y=0, opacity=1):
+        """
+        Optional method to be implemented by subclass.
+
+        Implemented method should composite the contents of an offscreen 
+        surface onto the given canvas.
+
+        Args:
+            canvas (*): The canvas object to draw on.
+
+            offscreen (*): The offscreen surface to draw.
+
+        Optional Args:
+            x (int): The pixel x location of the surface's top left corner.
+
+            y (int): The pixel y location of the surface's top left corner.
+
+            opacity (float): Value 0-1 indicating opacity of the surface.
+        
+        Returns:
+            None
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support offscreen surfaces")
+
+    def push_clip(self, canvas, x, y, width, height):
+        """
+        Optional method to be implemented by subclass.
+
+        Implemented method should limit drawing on the canvas to the given 
+        pixel rectangle, until pop_clip is called.
+
+        Args:
+            canvas (*): The canvas object to clip.
+
+            x (int): The pixel x location of the rectangle's top left corner.
+
+            y (int): The pixel y location of the rectangle's top left corner.
+
+            width (int): The width in pixels of the rectangle.
+
+            height (int): The height in pixels of the rectangle.
+        
+        Returns:
+            None
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support offscreen surfaces")
+
+    def clear_region(self, canvas, x, y, width, height):
+        """
+        Optional method to be implemented by subclass.
+
+        Implemented method should make a pixel rectangle of the canvas fully
+        transparent.
+
+        Args:
+            canvas (*): The canvas object to clear.
+
+            x (int): The pixel x location of the rectangle's top left corner.
+
+            y (int): The pixel y location of the rectangle's top left corner.
+
+            width (int): The width in pixels of the rectangle.
+
+            height (int): The height in pixels of the rectangle.
+        
+        Returns:
+            None
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support offscreen surfaces")
+
+    def pop_clip(self, canvas):
+        """
+        Optional method to be implemented by subclass.
+
+        Implemented method should remove the clip last added by push_clip.
+
+        Args:
+            canvas (*): The canvas object to unclip.
+        
+        Returns:
+            None
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support offscreen surfaces")
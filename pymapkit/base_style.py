@@ -288,4 +288,205 @@ class BaseStyle:
         Returns:
             None
         """
-        self.cached_renderer_fn = None
\ No newline at end of file
+        self.cached_renderer_fn = None
+
+class StyleProperty:
+    """
+    A class level descriptor for a managed property of a compiled style.
+
+    Reads and writes the property in the style's managed_properties, so it is
+    only available while a mode using the property is active.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, style, owner=None):
+        if style is None:
+            return self
+        try:
+            return style.managed_properties[self.name]
+        except KeyError:
+            raise AttributeError(f"'{self.name}' is not a property of the current style modes")
+
+    def __set__(self, style, new_value):
+        if self.name not in style.managed_properties:
+            raise AttributeError(f"'{self.name}' is not a property of the current style modes")
+        style.managed_properties[self.name] = new_value
+        style.clear_cache()
+
+
+## Compiled style classes, by base class, build function & its arguments
+_compiled_styles = {}
+
+class CompiledStyle:
+    """
+    A style with a fixed profile, compiled into a class once per schema.
+
+    A BaseStyle builds its profile on each instance, and binds new getter and 
+    setter functions to it every time a property or mode is added, or a mode 
+    is changed. A compiled style class is built once for a style schema, with
+    the domains, modes, and default values shared at class level, a 
+    StyleProperty descriptor and getter for every property, and __slots__ for
+    the per-style state. Creating a style, or changing its mode, only copies
+    or updates its current_modes and managed_properties dicts.
+
+    Compiled classes are created with compile, and are drop in replacements
+    for a BaseStyle built with the same function, except getters and setters 
+    are not bound to the styled object.
+    """
+    __slots__ = ('feature', 'current_modes', 'managed_properties', 'cached_renderer_fn')
+
+    ## Style profile, set on each compiled class
+    type = None
+    domains = {}
+    default_modes = {}
+    default_properties = {}
+
+    def __init__(self, feature, source=None):
+        """
+        Initializes a new style, with the default modes & property values.
+
+        Args:
+            feature (object): The object to style.
+
+        Optional Args:
+            source (CompiledStyle): A style of the same class to copy the modes
+            and property values of. Defaults to None, using the defaults.
+
+        Returns:
+            None
+        """
+        self.feature = feature
+        if source is None:
+            source = type(self)
+            self.current_modes = dict(source.default_modes)
+            self.managed_properties = dict(source.default_properties)
+        else:
+            self.current_modes = dict(source.current_modes)
+            self.managed_properties = dict(source.managed_properties)
+        self.cached_renderer_fn = None
+
+    @classmethod
+    def compile(cls, build_fn, *args):
+        """
+        Returns the style class for a schema, compiling it on first use.
+
+        Args:
+            build_fn (function): A function that builds a style profile on a 
+            BaseStyle, taking the style and the given args, e.g. build_style.
+
+            *args: Arguments for build_fn, which identify the schema together 
+            with it, e.g. a geometry type.
+
+        Returns:
+            style_class (type): The compiled subclass of cls.
+        """
+        key = (cls, build_fn, args)
+        style_class = _compiled_styles.get(key)
+        if style_class is not None:
+            return style_class
+
+        ## Build the profile once on a template style
+        template = BaseStyle(_TemplateFeature())
+        build_fn(template, *args)
+
+        namespace = {
+            '__slots__': (),
+            'type': getattr(template, 'type', None),
+            'domains': template.domains,
+            'default_modes': dict(template.current_modes),
+            'default_properties': dict(template.managed_properties),
+        }
+
+        ## Add a descriptor & getter for every property any mode can have
+        property_names = set(template.managed_properties)
+        for modes in template.domains.values():
+            for properties in modes.values():
+                property_names.update(properties)
+        for name in property_names:
+            namespace[name] = StyleProperty(name)
+            namespace['get_' + name] = _property_getter(name)
+
+        ## Add a mode getter for every domain
+        for domain in template.domains:
+            if domain:
+                namespace['get_' + domain + '_display'] = _mode_getter(domain)
+            else:
+                namespace['get_display'] = _mode_getter(domain)
+
+        name = f"{cls.__name__}_{'_'.join(str(arg) for arg in args)}"
+        style_class = _compiled_styles.setdefault(key, type(name, (cls,), namespace))
+        return style_class
+
+    def __getitem__(self, key):
+        """ Returns the value of a property. """
+        return self.managed_properties[key]
+
+    def copy(self, feature=None):
+        """
+        Returns a new style of the same class, with the same modes & values.
+
+        Optional Args:
+            feature (object): The object the copy styles. Defaults to the 
+            object this style styles.
+
+        Returns:
+            style (CompiledStyle): The copy.
+        """
+        return type(self)(self.feature if feature is None else feature, self)
+
+    def set_mode(self, mode_name, domain=None):
+        """
+        Sets which mode is active for a domain.
+
+        Properties of the old mode are removed, and properties of the new mode
+        are added with their default values. Properties in both modes keep 
+        their values.
+
+        Args:
+            mode_name (string): The name for the mode to activate.
+        
+        Optional Args:
+            domain (string): The name of the domain to the mode belongs to.
+            Default is None, which is for modes with no domain.
+
+        Returns:
+            None
+        """
+        modes = self.domains[domain]
+        incoming_properties = modes[mode_name]
+        current_mode = self.current_modes[domain]
+        current_properties = modes[current_mode] if current_mode else {}
+
+        for prop in current_properties:
+            if prop not in incoming_properties:
+                del self.managed_properties[prop]
+        for prop, default_value in incoming_properties.items():
+            if prop not in current_properties:
+                self.managed_properties[prop] = default_value
+
+        self.current_modes[domain] = mode_name
+        self.managed_properties[domain + '_mode' if domain else 'display_mode'] = mode_name
+
+    def clear_cache(self):
+        """ Clears the cached renderer function. """
+        self.cached_renderer_fn = None
+
+
+class _TemplateFeature:
+    """ Stands in for a styled object while compiling a style. """
+    style = None
+
+def _property_getter(name):
+    """ Returns a style method getting a managed property. """
+    def get_property(self):
+        return self.managed_properties[name]
+    get_property.__name__ = 'get_' + name
+    return get_property
+
+def _mode_getter(domain):
+    """ Returns a style method getting the current mode of a domain. """
+    def get_display(self):
+        return self.current_modes[domain]
+    return get_display
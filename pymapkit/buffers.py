@@ -0,0 +1,121 @@
+"""
+Project: PyMapKit
+File: buffers.py
+Title: Reusable Array Buffers
+Function: Provides pools of preallocated numpy buffers that are reused
+    between frames.
+Author: Ben Knisley [benknisley@gmail.com]
+Created: 16 October, 2026
+"""
+import threading
+import numpy as np
+
+
+class BufferPool:
+    """
+    Holds named numpy buffers that are reused between calls.
+
+    Buffers grow geometrically and are never shrunk, so repeatedly requesting
+    buffers of similar sizes (e.g. once per rendered frame) does not allocate.
+    Each thread gets its own set of buffers, so a pool can be shared by code
+    running on several threads.
+    """
+
+    def __init__(self):
+        """
+        Initializes a new BufferPool object.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self._local = threading.local()
+
+    def get(self, name, size, dtype=np.float64):
+        """
+        Returns a pair of buffers with the given name, size and type.
+
+        Returned buffers are views of the pooled storage. Their contents are
+        undefined, and are only valid until the same name and type is
+        requested again on the same thread.
+
+        Args:
+            name (str): The name of the buffer pair.
+
+            size (int): The number of values each buffer needs to hold.
+
+        Optional Args:
+            dtype (numpy.dtype): The data type of the buffers. Defaults to
+            float64.
+
+        Returns:
+            buffer_x (numpy.ndarray): The first buffer of the pair.
+
+            buffer_y (numpy.ndarray): The second buffer of the pair.
+        """
+        ## Get the buffer store for this thread
+        store = getattr(self._local, 'store', None)
+        if store is None:
+            store = self._local.store = {}
+
+        key = (name, np.dtype(dtype))
+        buffers = store.get(key)
+
+        ## Grow storage geometrically when it is too small
+        if buffers is None or len(buffers[0]) < size:
+            capacity = max(size, 1024)
+            if buffers is not None:
+                capacity = max(capacity, 2 * len(buffers[0]))
+            buffers = (np.empty(capacity, dtype=dtype), np.empty(capacity, dtype=dtype))
+            store[key] = buffers
+
+        return buffers[0][:size], buffers[1][:size]
+
+    def clear(self):
+        """
+        Releases all buffers held for the calling thread.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self._local.store = {}
+
+
+def affine_into(values, offset, factor, shift, out, block_size=65536):
+    """
+    Applies `(values - offset) * factor + shift` into an output buffer.
+
+    The affine is applied block by block, so each block is still in cache for
+    every step, and no temporary arrays are allocated. The offset is removed
+    from the full precision input first, so float32 outputs stay accurate for
+    large projected coordinates.
+
+    Args:
+        values (numpy.ndarray): The input values.
+
+        offset (float): The value subtracted from each input value.
+
+        factor (float): The value each offset value is multiplied by.
+
+        shift (float): The value added to each scaled value.
+
+        out (numpy.ndarray): The buffer to write results into. Can be the
+        same array as values.
+
+    Optional Args:
+        block_size (int): The number of values processed per block.
+
+    Returns:
+        out (numpy.ndarray): The output buffer.
+    """
+    for start in range(0, len(values), block_size):
+        block = out[start:start+block_size]
+        np.subtract(values[start:start+block_size], offset, out=block)
+        np.multiply(block, factor, out=block)
+        np.add(block, shift, out=block)
+    return out
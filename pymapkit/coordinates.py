@@ -0,0 +1,297 @@
+"""
+Project: PyMapKit
+File: coordinates.py
+Title: Columnar Coordinate Storage
+Function: Provides growable numpy buffers, and a columnar store of geometry
+    coordinates described by offset arrays.
+Author: Ben Knisley [benknisley@gmail.com]
+Created: 16 October, 2026
+"""
+import numpy as np
+
+
+class GrowableArray:
+    """
+    A contiguous numpy array that can be appended to in amortized constant time.
+
+    Values are held in a buffer with spare capacity, which doubles when full,
+    so building an array one value or one list at a time does not copy it on
+    every append. The current values are a view of the buffer.
+    """
+
+    def __init__(self, dtype=np.float64, capacity=1024):
+        """
+        Initializes a new, empty GrowableArray object.
+
+        Args:
+            None
+
+        Optional Args:
+            dtype (numpy.dtype): The data type of the values. Defaults to
+            float64.
+
+            capacity (int): The number of values to allocate space for.
+
+        Returns:
+            None
+        """
+        self._data = np.empty(capacity, dtype=dtype)
+        self.size = 0
+
+    def __len__(self):
+        """ Returns the number of values in the array. """
+        return self.size
+
+    @property
+    def values(self):
+        """ A view of the current values. Only valid until the array grows. """
+        return self._data[:self.size]
+
+    def reserve(self, capacity):
+        """
+        Makes sure the buffer can hold at least the given number of values.
+
+        Args:
+            capacity (int): The number of values the buffer needs to hold.
+
+        Returns:
+            None
+        """
+        if capacity <= len(self._data):
+            return
+
+        ## Grow geometrically, so repeated appends are amortized
+        new_data = np.empty(max(capacity, 2 * len(self._data)), dtype=self._data.dtype)
+        new_data[:self.size] = self._data[:self.size]
+        self._data = new_data
+
+    def append(self, value):
+        """
+        Adds a single value to the end of the array.
+
+        Args:
+            value (*): The value to add.
+
+        Returns:
+            None
+        """
+        self.reserve(self.size + 1)
+        self._data[self.size] = value
+        self.size += 1
+
+    def extend(self, values):
+        """
+        Adds a sequence of values to the end of the array.
+
+        Args:
+            values (list | numpy.ndarray): The values to add.
+
+        Returns:
+            None
+        """
+        count = len(values)
+        self.reserve(self.size + count)
+        self._data[self.size:self.size+count] = values
+        self.size += count
+
+    def insert(self, index, values):
+        """
+        Inserts a sequence of values before the given index.
+
+        Args:
+            index (int): The index to insert the values at.
+
+            values (list | numpy.ndarray): The values to insert.
+
+        Returns:
+            None
+        """
+        count = len(values)
+        self.reserve(self.size + count)
+
+        ## Move the following values back to make room
+        self._data[index+count:self.size+count] = self._data[index:self.size].copy()
+        self._data[index:index+count] = values
+        self.size += count
+
+    def set(self, values):
+        """
+        Replaces all values in the array.
+
+        Args:
+            values (list | numpy.ndarray): The new values.
+
+        Returns:
+            None
+        """
+        values = np.asarray(values, dtype=self._data.dtype)
+        self.reserve(len(values))
+        self._data[:len(values)] = values
+        self.size = len(values)
+
+
+class CoordinateStore:
+    """
+    Holds the coordinates of a set of geometries in columnar arrays.
+
+    All x and y values are held in two contiguous float64 arrays. Geometries
+    are described by offset arrays, like GeoArrow: part i spans vertices
+    [part_offsets[i], part_offsets[i+1]), and geometry j spans parts
+    [geom_offsets[j], geom_offsets[j+1]). All arrays are growable, so
+    geometries can be loaded one part at a time.
+    """
+
+    def __init__(self):
+        """
+        Initializes a new, empty CoordinateStore object.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.x = GrowableArray()
+        self.y = GrowableArray()
+
+        ## Offset arrays start with the offset of the first part & geometry
+        self.part_offsets = GrowableArray(np.int64)
+        self.part_offsets.append(0)
+        self.geom_offsets = GrowableArray(np.int64)
+        self.geom_offsets.append(0)
+
+    def __len__(self):
+        """ Returns the number of vertices in the store. """
+        return len(self.x)
+
+    def geometry_count(self):
+        """ Returns the number of geometries in the store. """
+        return len(self.geom_offsets) - 1
+
+    def add_geometry(self):
+        """
+        Adds a new geometry, with no parts, to the end of the store.
+
+        Args:
+            None
+
+        Returns:
+            geom_index (int): The index of the new geometry.
+        """
+        self.geom_offsets.append(self.geom_offsets.values[-1])
+        return self.geometry_count() - 1
+
+    def add_part(self, geom_index, x_values, y_values):
+        """
+        Adds a part to the end of a geometry.
+
+        Parts added to the last geometry are appended. Parts added to any
+        other geometry are inserted, moving the vertices after them.
+
+        Args:
+            geom_index (int): The index of the geometry to add the part to.
+
+            x_values (list | numpy.ndarray): The x values of the part.
+
+            y_values (list | numpy.ndarray): The y values of the part.
+
+        Returns:
+            None
+        """
+        count = len(x_values)
+        geom_offsets = self.geom_offsets.values
+
+        if geom_index == self.geometry_count() - 1:
+            self.x.extend(x_values)
+            self.y.extend(y_values)
+            self.part_offsets.append(len(self.x))
+            geom_offsets[-1] += 1
+            return
+
+        ## Insert the vertices & part at the end of the geometry
+        part_index = geom_offsets[geom_index+1]
+        vertex_index = self.part_offsets.values[part_index]
+        self.x.insert(vertex_index, x_values)
+        self.y.insert(vertex_index, y_values)
+
+        self.part_offsets.values[part_index:] += count
+        self.part_offsets.insert(part_index, [vertex_index])
+        geom_offsets[geom_index+1:] += 1
+
+    def geometry_range(self, geom_index):
+        """
+        Returns the range of vertices of a geometry.
+
+        Args:
+            geom_index (int): The index of the geometry.
+
+        Returns:
+            start (int): The index of the geometry's first vertex.
+
+            end (int): The index after the geometry's last vertex.
+        """
+        first_part = self.geom_offsets.values[geom_index]
+        last_part = self.geom_offsets.values[geom_index+1]
+        part_offsets = self.part_offsets.values
+        return int(part_offsets[first_part]), int(part_offsets[last_part])
+
+    def part_counts(self, geom_index):
+        """
+        Returns the number of vertices in each part of a geometry.
+
+        Args:
+            geom_index (int): The index of the geometry.
+
+        Returns:
+            counts (numpy.ndarray): The vertex count of each part.
+        """
+        first_part = self.geom_offsets.values[geom_index]
+        last_part = self.geom_offsets.values[geom_index+1]
+        return np.diff(self.part_offsets.values[first_part:last_part+1])
+
+    def geometry_extents(self, x_values, y_values):
+        """
+        Returns the extent of every geometry, computed in one vectorized pass.
+
+        Vertices with an infinite or nan coordinate are left out. Geometries
+        with no valid vertices get an inverted, infinite extent.
+
+        Args:
+            x_values (numpy.ndarray): The x values of all vertices, e.g. the
+            projected values of the store.
+
+            y_values (numpy.ndarray): The y values of all vertices.
+
+        Returns:
+            min_x (numpy.ndarray): The minimum x value of each geometry.
+
+            min_y (numpy.ndarray): The minimum y value of each geometry.
+
+            max_x (numpy.ndarray): The maximum x value of each geometry.
+
+            max_y (numpy.ndarray): The maximum y value of each geometry.
+        """
+        count = self.geometry_count()
+        starts = self.part_offsets.values[self.geom_offsets.values]
+        has_vertices = starts[1:] > starts[:-1]
+
+        ## Treat invalid values as nan, which fmin & fmax skip
+        x_values = np.asarray(x_values, dtype=float)
+        y_values = np.asarray(y_values, dtype=float)
+        invalid = ~(np.isfinite(x_values) & np.isfinite(y_values))
+        if invalid.any():
+            x_values, y_values = x_values.copy(), y_values.copy()
+            x_values[invalid] = np.nan
+            y_values[invalid] = np.nan
+
+        extents = []
+        for reduce_fn, empty_value in ((np.fmin, np.inf), (np.fmax, -np.inf)):
+            for values in (x_values, y_values):
+                extent = np.full(count, empty_value)
+                if len(values):
+                    reduced = reduce_fn.reduceat(values, starts[:-1][has_vertices])
+                    extent[has_vertices] = np.where(np.isnan(reduced), empty_value, reduced)
+                extents.append(extent)
+
+        min_x, min_y, max_x, max_y = extents
+        return min_x, min_y, max_x, max_y
@@ -0,0 +1,218 @@
+"""
+Project: PyMapKit
+File: hit_testing.py
+Title: Vectorized Hit Testing
+Function: Provides vectorized point-in-polygon, distance-to-polyline, and
+    point proximity tests over sets of (query point, geometry) pairs.
+Author: Ben Knisley [benknisley@gmail.com]
+Created: 16 October, 2026
+"""
+import numpy as np
+
+
+def expand_ranges(starts, ends):
+    """
+    Expands ranges into the indices they cover, and the range of each.
+
+    Args:
+        starts (numpy.ndarray): The first index of each range.
+
+        ends (numpy.ndarray): The index after the last of each range.
+
+    Returns:
+        range_index (numpy.ndarray): The range each index belongs to.
+
+        indices (numpy.ndarray): The indices covered by the ranges, in order.
+    """
+    counts = ends - starts
+    range_index = np.repeat(np.arange(len(starts)), counts)
+
+    ## Offset of each index within its range
+    first = np.cumsum(counts) - counts
+    indices = starts[range_index] + np.arange(len(range_index)) - first[range_index]
+    return range_index, indices
+
+
+def pair_segments(x_values, y_values, part_offsets, vertex_starts, vertex_ends, closed):
+    """
+    Returns the segments of the geometries of a set of pairs.
+
+    Each vertex starts a segment to the next vertex of its part. The last
+    vertex of a part starts a segment back to the first if closed, like a
+    polygon ring, or none if not, like a line.
+
+    Args:
+        x_values (numpy.ndarray): The x values of all vertices.
+
+        y_values (numpy.ndarray): The y values of all vertices.
+
+        part_offsets (numpy.ndarray): The first vertex of each part, and the
+        end of the last part.
+
+        vertex_starts (numpy.ndarray): The first vertex of the geometry of
+        each pair.
+
+        vertex_ends (numpy.ndarray): The vertex after the last of the geometry
+        of each pair.
+
+        closed (bool): Whether parts are closed rings.
+
+    Returns:
+        pair_index (numpy.ndarray): The pair each segment belongs to.
+
+        x1, y1, x2, y2 (numpy.ndarray): The start & end of each segment.
+    """
+    pair_index, vertex = expand_ranges(vertex_starts, vertex_ends)
+
+    ## Find the next vertex, at the end of a part wrap or leave it out
+    part = np.searchsorted(part_offsets, vertex, side='right') - 1
+    next_vertex = vertex + 1
+    part_end = next_vertex == part_offsets[part+1]
+    if closed:
+        next_vertex[part_end] = part_offsets[part[part_end]]
+    else:
+        keep = ~part_end
+        pair_index, vertex, next_vertex = pair_index[keep], vertex[keep], next_vertex[keep]
+
+    return (pair_index, x_values[vertex], y_values[vertex],
+        x_values[next_vertex], y_values[next_vertex])
+
+
+def points_in_polygons(query_x, query_y, x_values, y_values, part_offsets, vertex_starts, vertex_ends):
+    """
+    Tests whether the point of each pair is inside the polygon of the pair.
+
+    Uses even-odd ray casting over all rings of each polygon at once, so
+    points in holes are outside. Vertices that failed to project are nan, and
+    their segments never cross.
+
+    Args:
+        query_x (numpy.ndarray): The x value of the point of each pair.
+
+        query_y (numpy.ndarray): The y value of the point of each pair.
+
+        x_values, y_values, part_offsets, vertex_starts, vertex_ends: The
+        vertices, parts & geometry ranges, as in pair_segments.
+
+    Returns:
+        inside (numpy.ndarray): True for each pair with the point inside.
+    """
+    pair_index, x1, y1, x2, y2 = pair_segments(x_values, y_values, part_offsets,
+        vertex_starts, vertex_ends, closed=True)
+    px, py = query_x[pair_index], query_y[pair_index]
+
+    ## Count segments crossing a ray cast right from each point
+    with np.errstate(divide='ignore', invalid='ignore'):
+        spans = (y1 > py) != (y2 > py)
+        crossing_x = (x2 - x1) * (py - y1) / (y2 - y1) + x1
+        crosses = spans & (px < crossing_x)
+
+    crossings = np.bincount(pair_index[crosses], minlength=len(query_x))
+    return crossings % 2 == 1
+
+
+def polyline_distances(query_x, query_y, x_values, y_values, part_offsets, vertex_starts, vertex_ends, closed=False):
+    """
+    Returns the distance from the point of each pair to the line of the pair.
+
+    Args:
+        query_x (numpy.ndarray): The x value of the point of each pair.
+
+        query_y (numpy.ndarray): The y value of the point of each pair.
+
+        x_values, y_values, part_offsets, vertex_starts, vertex_ends: The
+        vertices, parts & geometry ranges, as in pair_segments.
+
+    Optional Args:
+        closed (bool): Whether parts are closed rings, measuring to polygon
+        outlines. Defaults to False.
+
+    Returns:
+        distances (numpy.ndarray): The distance from each point to the nearest
+        segment of its line, inf if the line has no valid segments.
+    """
+    pair_index, x1, y1, x2, y2 = pair_segments(x_values, y_values, part_offsets,
+        vertex_starts, vertex_ends, closed)
+    px, py = query_x[pair_index], query_y[pair_index]
+
+    ## Project each point onto each segment, clamped to the segment ends
+    dx, dy = x2 - x1, y2 - y1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = ((px - x1) * dx + (py - y1) * dy) / (dx * dx + dy * dy)
+    t = np.clip(np.nan_to_num(t, nan=0.0), 0.0, 1.0)
+    segment_distances = np.hypot(px - (x1 + t * dx), py - (y1 + t * dy))
+
+    return _pair_minimum(pair_index, segment_distances, len(query_x))
+
+
+def point_distances(query_x, query_y, x_values, y_values, vertex_starts, vertex_ends, euclidean=False):
+    """
+    Returns the distance from the point of each pair to the nearest vertex of
+    the pair's geometry, measured as the larger of the x & y distances.
+
+    Args:
+        query_x (numpy.ndarray): The x value of the point of each pair.
+
+        query_y (numpy.ndarray): The y value of the point of each pair.
+
+        x_values, y_values, vertex_starts, vertex_ends: The vertices &
+        geometry ranges, as in pair_segments.
+
+    Optional Args:
+        euclidean (bool): Whether to measure the straight line distance 
+        instead. Defaults to False.
+
+    Returns:
+        distances (numpy.ndarray): The distance from each point to the nearest
+        vertex, inf if the geometry has no valid vertices.
+    """
+    pair_index, vertex = expand_ranges(vertex_starts, vertex_ends)
+    dx = np.abs(x_values[vertex] - query_x[pair_index])
+    dy = np.abs(y_values[vertex] - query_y[pair_index])
+    vertex_distances = np.hypot(dx, dy) if euclidean else np.maximum(dx, dy)
+
+    return _pair_minimum(pair_index, vertex_distances, len(query_x))
+
+
+def geometry_distances(query_x, query_y, x_values, y_values, part_offsets, vertex_starts, vertex_ends, geometry_type):
+    """
+    Returns the straight line distance from the point of each pair to the 
+    geometry of the pair: to the nearest vertex of points, the nearest segment
+    of lines, and the outline of polygons, or 0 if inside.
+
+    Args:
+        query_x (numpy.ndarray): The x value of the point of each pair.
+
+        query_y (numpy.ndarray): The y value of the point of each pair.
+
+        x_values, y_values, part_offsets, vertex_starts, vertex_ends: The
+        vertices, parts & geometry ranges, as in pair_segments.
+
+        geometry_type (string): The type of the geometries, 'point', 'line', 
+        or 'polygon'.
+
+    Returns:
+        distances (numpy.ndarray): The distance from each point to its 
+        geometry, inf if the geometry has no valid vertices.
+    """
+    if geometry_type == 'point':
+        return point_distances(query_x, query_y, x_values, y_values, vertex_starts, vertex_ends, euclidean=True)
+
+    closed = geometry_type == 'polygon'
+    distances = polyline_distances(query_x, query_y, x_values, y_values, part_offsets, 
+        vertex_starts, vertex_ends, closed)
+    if closed:
+        inside = points_in_polygons(query_x, query_y, x_values, y_values, part_offsets, vertex_starts, vertex_ends)
+        distances[inside] = 0.0
+    return distances
+
+
+def _pair_minimum(pair_index, values, pair_count):
+    """ Returns the minimum of the values of each pair, skipping nan. """
+    minimum = np.full(pair_count, np.inf)
+    if len(values):
+        ## Pair indices are sorted, so each pair's values are one run
+        starts = np.flatnonzero(np.r_[True, pair_index[1:] != pair_index[:-1]])
+        reduced = np.fmin.reduceat(values, starts)
+        minimum[pair_index[starts]] = np.where(np.isnan(reduced), np.inf, reduced)
+    return minimum
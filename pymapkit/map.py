@@ -6,9 +6,17 @@ Function: Define the Map class that pymapkit project is build around.
 Author: Ben Knisley [benknisley@gmail.com]
 Created: 5 January, 2021
 """
+import os
+import threading
+import dataclasses
+from concurrent.futures import ThreadPoolExecutor
 import pyproj
 import numpy as np
 from .base_style import BaseStyle
+from .buffers import BufferPool, affine_into
+from .viewport import Viewport, exposed_regions
+from .projection import (INVALID_POLICIES, get_transformer, transform_values, 
+    ChunkedTransformer, invalid_mask, fill_invalid, clamp_invalid)
 
 
 def get_renderer(renderer_name):
@@ -86,9 +94,47 @@ class Map:
         self.geographic_crs: pyproj.crs.CRS = pyproj.crs.CRS("EPSG:4326")
         self.projected_crs: pyproj.crs.CRS = pyproj.crs.CRS("EPSG:3785")
 
-        ## Create transformer objects
-        self.transform_geo2proj = pyproj.Transformer.from_crs(self.geographic_crs, self.projected_crs, always_xy=True)
-        self.transform_proj2geo = pyproj.Transformer.from_crs(self.projected_crs, self.geographic_crs, always_xy=True)
+        ## Get transformer objects from the shared cache
+        self.transform_geo2proj = get_transformer(self.geographic_crs, self.projected_crs)
+        self.transform_proj2geo = get_transformer(self.projected_crs, self.geographic_crs)
+
+        ## Set how coordinates that fail to project are handled, & a holder 
+        ## for the CRS bounds the 'clamp' policy clamps to
+        self.invalid_policy = 'fill'
+        self._crs_bounds = None
+
+        ## Create a placeholder for a thread pool, for background refreshes
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+        ## Set whether layers are rendered in parallel onto offscreen surfaces
+        self.parallel_render = False
+        self.render_workers = None
+        self._render_executor = None
+
+        ## Set whether each layer's render is cached on an offscreen surface,
+        ## & hold the cached surfaces and their keys by layer id
+        self.cache_layers = False
+        self._layer_surfaces = {}
+
+        ## Set whether cached layers are shifted, rather than redrawn, when 
+        ## the view only pans, & how many pixels layers are drawn past the 
+        ## edges of a partially drawn region
+        self.incremental_pan = True
+        self.region_margin = 32
+
+        ## Hold projected boxes invalidated since the last render, as 
+        ## (box, layer, layer version, padding)
+        self._invalid_boxes = []
+
+        ## Create a chunked transformer, to reproject large arrays in parallel
+        self.chunked_transformer = ChunkedTransformer()
+
+        ## Set max pixel error of approximate reprojection, None to be exact
+        self.approx_tolerance = None
+
+        ## Create a pool of scratch buffers reused between calls
+        self._buffers = BufferPool()
 
         ## Create a variable to hold scale
         self._proj_scale = 1.0 ## unit/pixel
@@ -143,7 +189,10 @@ class Map:
         del_layer._deactivate()
         self.layers.remove(del_layer)
 
-    def set_geographic_crs(self, new_crs):
+        ## Drop the layer's cached render
+        self._layer_surfaces.pop(id(del_layer), None)
+
+    def set_geographic_crs(self, new_crs, background=False):
         """
         Sets the base geographic reference system. 
 
@@ -154,6 +203,11 @@ class Map:
         Args:
             new_crs (str | pyproj.crs.CRS): The CRS to use as the base 
             geographic reference system.
+
+        Optional Args:
+            background (bool): Whether to start reprojecting layers on a 
+            background thread right away. Default is False, which leaves 
+            layers to be reprojected when they are next rendered or queried.
         
         Returns:
             None
@@ -168,15 +222,15 @@ class Map:
         else:
             pass #@ NOTE: throw errors
 
-        ## Recreate transformer objects
-        self.transform_geo2proj = pyproj.Transformer.from_crs(self.geographic_crs, self.projected_crs, always_xy=True)
-        self.transform_proj2geo = pyproj.Transformer.from_crs(self.projected_crs, self.geographic_crs, always_xy=True)
+        ## Get transformer objects for new CRS pair
+        self.transform_geo2proj = get_transformer(self.geographic_crs, self.projected_crs)
+        self.transform_proj2geo = get_transformer(self.projected_crs, self.geographic_crs)
+        self._crs_bounds = None
 
-        ## Reactivate layers
-        for layer in self.layers:
-            layer.activate()
+        ## Mark layers to be reactivated when next needed
+        self._mark_layers_stale(background)
 
-    def set_projection(self, new_crs): #@ Rename to set_crs
+    def set_projection(self, new_crs, background=False): #@ Rename to set_crs
         """
         Sets the projected coordinate system of the map.
 
@@ -186,6 +240,11 @@ class Map:
         Args:
             new_crs (str | pyproj.crs.CRS): The CRS to use as the projected 
             reference system.
+
+        Optional Args:
+            background (bool): Whether to start reprojecting layers on a 
+            background thread right away. Default is False, which leaves 
+            layers to be reprojected when they are next rendered or queried.
         
         Returns:
             None
@@ -205,13 +264,13 @@ class Map:
         else:
             raise Exception("Input not a valid CRS")
         
-        ## Recreate transformer objects
-        self.transform_geo2proj = pyproj.Transformer.from_crs(self.geographic_crs, self.projected_crs, always_xy=True)
-        self.transform_proj2geo = pyproj.Transformer.from_crs(self.projected_crs, self.geographic_crs, always_xy=True)
+        ## Get transformer objects for new CRS pair
+        self.transform_geo2proj = get_transformer(self.geographic_crs, self.projected_crs)
+        self.transform_proj2geo = get_transformer(self.projected_crs, self.geographic_crs)
+        self._crs_bounds = None
 
-        ## Reactivate layers
-        for layer in self.layers:
-            layer.activate()
+        ## Mark layers to be reactivated when next needed
+        self._mark_layers_stale(background)
 
         ## Restore location and scale
         self.set_location(*location)
@@ -311,6 +370,7 @@ class Map:
 
         if proj_units:
             self._proj_scale = float(new_scale)
+            self._check_approximation()
             return
 
         ## Get unit code of base unit of projection
@@ -328,6 +388,7 @@ class Map:
 
         ## Set scale in proj units per pix
         self._proj_scale = float(new_scale)
+        self._check_approximation()
 
     def get_scale(self):
         """
@@ -446,7 +507,308 @@ class Map:
         else: 
             self.renderer = renderer
 
-    def render(self, output=None, *args):
+    def set_invalid_policy(self, policy, background=False):
+        """
+        Sets how coordinates that fail to project are handled.
+
+        Sets the policy used when vectorized coordinates transform to inf or 
+        nan values, e.g. polar points in Mercator. Every policy runs in linear
+        time.
+
+        Args:
+            policy (str): One of:
+                'fill': Replace each invalid vertex with the last valid vertex.
+                'clamp': Clamp invalid vertices to the CRS's area of use, and 
+                    project them again.
+                'drop': Remove invalid vertices from their geometries.
+                'split': Remove invalid vertices, splitting geometry parts 
+                    where vertices were removed.
+                
+                Conversion methods return 'drop' and 'split' invalid vertices 
+                as nan, to be removed by layers that know their geometries.
+
+        Optional Args:
+            background (bool): Whether to start reprojecting layers on a 
+            background thread right away. Default is False, which leaves 
+            layers to be reprojected when they are next rendered or queried.
+        
+        Returns:
+            None
+        """
+        if policy not in INVALID_POLICIES:
+            raise ValueError(f"Invalid policy must be one of: {', '.join(INVALID_POLICIES)}")
+        
+        self.invalid_policy = policy
+
+        ## Mark layers to be reactivated when next needed
+        self._mark_layers_stale(background)
+
+    def set_transform_workers(self, workers, chunk_size=None):
+        """
+        Sets how many threads are used to reproject large coordinate arrays.
+
+        Arrays larger than one chunk are split into chunks, which are 
+        transformed in parallel by the given number of worker threads.
+
+        Args:
+            workers (int | None): The number of worker threads. None uses the
+            number of CPUs, and 1 disables parallel transforms.
+
+        Optional Args:
+            chunk_size (int): The number of vertices transformed per chunk.
+
+        Returns:
+            None
+        """
+        self.chunked_transformer.set_workers(workers)
+        if chunk_size is not None:
+            self.chunked_transformer.chunk_size = chunk_size
+
+    def set_approximate(self, tolerance, background=False):
+        """
+        Sets the map to reproject large arrays approximately.
+
+        Large vectorized geo2proj conversions are interpolated over an adaptive
+        grid of exactly projected points, within the given error in pixels. 
+        Errors are kept within tolerance down to half the current scale, 
+        zooming in further reprojects layers when they're next needed.
+
+        Args:
+            tolerance (float | None): The max error in pixels, or None to 
+            reproject exactly.
+
+        Optional Args:
+            background (bool): Whether to start reprojecting layers on a 
+            background thread right away.
+
+        Returns:
+            None
+        """
+        if tolerance is not None and tolerance <= 0:
+            raise ValueError("Tolerance must be a positive number of pixels")
+
+        self.approx_tolerance = tolerance
+
+        ## Mark layers to be reactivated when next needed
+        self._mark_layers_stale(background)
+
+    def get_approx_tolerance(self):
+        """
+        Returns the approximate reprojection tolerance in projection units.
+
+        Args:
+            None
+
+        Returns:
+            tolerance (float | None): The max error in projection units, at 
+            half the current scale, or None if reprojection is exact.
+        """
+        if self.approx_tolerance is None:
+            return None
+        return self.approx_tolerance * self._proj_scale / 2
+
+    def _check_approximation(self):
+        """
+        Marks layers stale when zoomed in past their approximation accuracy.
+
+        Each layer's projection_tolerance holds the error, in projection units,
+        its values were projected within. A layer is marked stale once that 
+        error is more than approx_tolerance pixels at the current scale.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        if self.approx_tolerance is None:
+            return
+
+        max_error = self.approx_tolerance * self._proj_scale
+        for layer in self.layers:
+            tolerance = getattr(layer, 'projection_tolerance', None)
+            if tolerance is not None and tolerance > max_error:
+                layer.mark_stale()
+
+    def _mark_layers_stale(self, background=False):
+        """
+        Marks all layers to be reactivated when they are next needed.
+
+        Layers are reactivated by their refresh method, which the map calls 
+        before rendering a layer, and layers call before answering queries. 
+        So layers that are never drawn or queried are never reprojected.
+
+        Optional Args:
+            background (bool): Whether to start refreshing the layers on a
+            background thread right away.
+
+        Returns:
+            None
+        """
+        for layer in self.layers:
+            layer.mark_stale()
+        
+        if background:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+                for layer in self.layers:
+                    self._executor.submit(layer.refresh)
+
+    def close(self, wait=True):
+        """
+        Shuts down the map's worker threads.
+
+        Stops the pools used for background refreshes, parallel rendering, and
+        chunked reprojection. The map can still be used afterwards, the pools
+        are created again when next needed.
+
+        Optional Args:
+            wait (bool): Whether to wait for queued work to finish first.
+
+        Returns:
+            None
+        """
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+        if self._render_executor is not None:
+            self._render_executor.shutdown(wait=wait)
+            self._render_executor = None
+
+        ## Replacing the pool with the same worker count shuts it down
+        self.chunked_transformer.set_workers(self.chunked_transformer.workers)
+
+    def get_crs_bounds(self):
+        """
+        Returns the area of use of the projected CRS.
+
+        Returns the area of use of the map's projected CRS, both in geographic
+        and in projected coordinates. The projected bounds are found by 
+        projecting a grid of points covering the area of use. The bounds are 
+        cached until the map's CRSs change.
+
+        Args:
+            None
+
+        Returns:
+            geo_bounds (tuple | None): The (min_x, min_y, max_x, max_y) 
+            bounds in the geographic CRS, or None if the CRS has no area of 
+            use. min_x is greater than max_x if the area crosses the 
+            antimeridian.
+
+            proj_bounds (tuple | None): The (min_x, min_y, max_x, max_y) 
+            projected bounds, or None if the CRS has no area of use.
+        """
+        if self._crs_bounds is None:
+            self._crs_bounds = self._find_crs_bounds()
+        return self._crs_bounds
+
+    def _find_crs_bounds(self):
+        """ Finds the bounds returned by get_crs_bounds. """
+        area_of_use = self.projected_crs.area_of_use
+        if area_of_use is None:
+            return None, None
+        
+        ## The area of use is in WGS84 degrees, so find it in the map's 
+        ## geographic CRS. Areas crossing the antimeridian keep west > east
+        to_geographic = get_transformer('EPSG:4326', self.geographic_crs)
+        geo_bounds = to_geographic.transform_bounds(*area_of_use.bounds, densify_pts=21)
+
+        ## Project a grid over the area of use, and keep valid extremes. 
+        ## Longitudes past 180 are wrapped by the transformer
+        west, south, east, north = geo_bounds
+        if west > east:
+            east += 360
+        grid_x, grid_y = np.meshgrid(
+            np.linspace(west, east, 21), 
+            np.linspace(south, north, 21)
+        )
+        proj_x, proj_y = self.transform_geo2proj.transform(grid_x.ravel(), grid_y.ravel())
+        valid = ~invalid_mask(proj_x, proj_y)
+        if not valid.any():
+            return geo_bounds, None
+
+        proj_bounds = (
+            proj_x[valid].min(), proj_y[valid].min(), 
+            proj_x[valid].max(), proj_y[valid].max()
+        )
+        return geo_bounds, proj_bounds
+
+    def _handle_invalid(self, transformer, in_x, in_y, out_x, out_y, bounds):
+        """
+        Handles transformed values that are inf or nan, in place.
+
+        Applies the map's invalid_policy to a set of transformed values. 
+        'drop' and 'split' need geometry structure, so they set both values 
+        of each invalid vertex to nan to be removed by the caller.
+
+        Args:
+            transformer (pyproj.Transformer): The transformer used.
+
+            in_x (numpy.ndarray): The input x values.
+
+            in_y (numpy.ndarray): The input y values.
+
+            out_x (numpy.ndarray): The transformed x values.
+
+            out_y (numpy.ndarray): The transformed y values.
+
+            bounds (tuple | None): The valid bounds of the input values, used
+            by the 'clamp' policy.
+        
+        Returns:
+            None
+        """
+        if self.invalid_policy == 'clamp':
+            clamp_invalid(transformer, in_x, in_y, out_x, out_y, bounds)
+        
+        elif self.invalid_policy in ('drop', 'split'):
+            invalid = invalid_mask(out_x, out_y)
+            out_x[invalid] = np.nan
+            out_y[invalid] = np.nan
+        
+        else:
+            fill_invalid(out_x, out_y)
+
+    def get_viewport(self):
+        """
+        Returns an immutable snapshot of the current map view.
+
+        Computes the view affine, scale, location and bounds once, so layers 
+        can draw a whole frame from consistent values, even while the map is
+        moved during rendering.
+
+        Args:
+            None
+
+        Returns:
+            viewport (Viewport): The snapshot of the map view.
+        """
+        ## Find geographic bounds from the corners & edge midpoints of view
+        width, height = self.width, self.height
+        grid_x, grid_y = np.meshgrid([0, width / 2, width], [0, height / 2, height])
+        proj_x = self.proj_x + (grid_x.ravel() - int(width / 2)) * self._proj_scale
+        proj_y = self.proj_y - (grid_y.ravel() - int(height / 2)) * self._proj_scale
+        geo_x, geo_y = self.proj2geo(proj_x, proj_y)
+
+        with np.errstate(invalid='ignore'):
+            geo_bounds = (np.nanmin(geo_x), np.nanmin(geo_y), np.nanmax(geo_x), np.nanmax(geo_y))
+
+        return Viewport(
+            width=width,
+            height=height,
+            proj_x=self.proj_x,
+            proj_y=self.proj_y,
+            proj_scale=self._proj_scale,
+            scale=self.get_scale(),
+            location=self.get_location(),
+            geo_bounds=tuple(float(value) for value in geo_bounds),
+        )
+
+    def render(self, output=None, *args, region=None):
         """
         Renders the map.
         
@@ -463,6 +825,12 @@ class Map:
             args (tuple): All other arguments will be sent to the 
             renderer.save method if called.
 
+            region (tuple): A pixel region to redraw, as (x, y, width, height).
+            Only the region is cleared and redrawn, with layers culled to it.
+            When layers are cached, the region is redrawn on each layer's 
+            surface, and the map is composited from them. Defaults to None, 
+            redrawing the whole map.
+
         Returns:
             None
          
@@ -477,134 +845,567 @@ class Map:
            canvas = self.renderer.new_canvas(self.width, self.height)
            output_file = output
         
+        ## Cached layers are redrawn on their own surfaces, so only limit 
+        ## drawing to the region when drawing layers onto the canvas directly
+        cached = self.cache_layers and getattr(self.renderer, 'supports_offscreen', False)
+        clipped = region is not None and not cached
+        if clipped:
+            self.renderer.push_clip(canvas, *region)
+            self.renderer.clear_region(canvas, *region)
+
         ## Draw background
         self.renderer.draw_background(canvas, self.style)
 
-        ## Draw each layer, pass renderer, and canvas to each object
-        for layer in self.layers:
-            layer.render(self.renderer, canvas)
+        ## Take a snapshot of the view, shared by every layer
+        viewport = self.get_viewport()
+
+        ## A full redraw covers pending invalidations, however it is drawn. 
+        ## Clear them first, so ones added while drawing are kept
+        if region is None and not cached:
+            self._invalid_boxes = []
+
+        ## Draw each layer, pass renderer, canvas and viewport to each object
+        if cached:
+            self._render_cached(canvas, viewport, region)
+        elif self.parallel_render and region is None and getattr(self.renderer, 'supports_offscreen', False):
+            self._render_parallel(canvas, viewport)
+        else:
+            for layer in self.layers:
+                ## Layers drawn with opacity are composited from offscreen
+                opacity = getattr(layer, 'opacity', 1)
+                if opacity < 1 and getattr(self.renderer, 'supports_offscreen', False):
+                    offscreen = self._render_offscreen(layer, viewport, region)
+                    self.renderer.draw_offscreen(canvas, offscreen, opacity=opacity)
+                elif region is not None:
+                    layer.refresh()
+                    self._render_region(layer, canvas, viewport, region)
+                else:
+                    layer.refresh()
+                    layer.render(self.renderer, canvas, viewport)
+
+        if clipped:
+            self.renderer.pop_clip(canvas)
         
         ## Save or display canvas
         self.renderer.save(canvas, output_file)
 
-    def geo2proj(self, geo_x, geo_y):
+    def set_parallel_render(self, enabled, workers=None):
         """
-        Converts geographic coordinates to projection coordinates.
+        Sets whether layers are rendered in parallel.
 
-        Converts geographic coordinates, either singlet or vectorized, to 
-        projection coordinates of the maps CRS. Output is same type as input.
+        When enabled, each layer renders onto its own offscreen surface on a
+        pool of worker threads, and the surfaces are composited onto the map
+        in layer order, with each layer's opacity. Only used when the renderer
+        supports offscreen surfaces.
 
         Args:
-            geo_x (int | float | list): The input longitude or geographic x 
-            value(s) to convert.
+            enabled (bool): Whether to render layers in parallel.
 
-            geo_y (int | float | list): The input latitude or geographic y 
-            value(s) to convert.
-    
+        Optional Args:
+            workers (int): The number of worker threads. Defaults to one per 
+            layer, up to the number of CPUs plus four.
 
         Returns:
-            proj_x (int | float | list): The output x value(s).
+            None
+        """
+        self.parallel_render = bool(enabled)
+
+        ## Replace the pool if the worker count changed
+        if workers != self.render_workers and self._render_executor is not None:
+            self._render_executor.shutdown(wait=False)
+            self._render_executor = None
+        self.render_workers = workers
 
-            proj_y (int | float | list): The output y value(s).
+    def set_layer_cache(self, enabled, incremental_pan=True):
         """
-        ## Use geo2proj transform to convert points
-        proj_x, proj_y = self.transform_geo2proj.transform(geo_x, geo_y)
+        Sets whether each layer's render is cached between frames.
 
-        ## If data is a list, purge all infs from dataset
-        if isinstance(proj_x, list):
-            proj_x, proj_y = np.array(proj_x), np.array(proj_y)
+        When enabled, each layer is rendered onto its own offscreen surface, 
+        which is kept and composited onto the map. A layer is only redrawn
+        when the view changes, or its version changes, i.e. its content or 
+        style was edited, or it was reprojected. Only used when the renderer 
+        supports offscreen surfaces.
 
-            ## Replace all np.inf values with last valid value (to prevent tearing during rendering)
-            while np.isinf(proj_x).any() or np.isinf(proj_y).any():
-                proj_x[np.where(np.isinf(proj_x))] = proj_x[np.where(np.isinf(proj_x))[0]-1]
-                proj_y[np.where(np.isinf(proj_y))] = proj_y[np.where(np.isinf(proj_y))[0]-1]
-            
-            ## Convert back to python list
-            proj_x, proj_y = list(proj_x), list(proj_y)
+        Args:
+            enabled (bool): Whether to cache layer renders.
+
+        Optional Args:
+            incremental_pan (bool): Whether to shift cached surfaces when the 
+            view only pans by whole pixels, drawing just the newly exposed 
+            strips. Defaults to True.
+
+        Returns:
+            None
+        """
+        self.cache_layers = bool(enabled)
+        self.incremental_pan = bool(incremental_pan)
+
+        ## Release cached surfaces when disabled
+        if not self.cache_layers:
+            self._layer_surfaces = {}
+
+    def _surface_key(self, layer, viewport):
+        """
+        Returns the key a layer's cached render is valid for.
+
+        Args:
+            layer (BaseLayer): The layer to get the key of.
+
+            viewport (Viewport): The snapshot of the view being rendered.
+
+        Returns:
+            key (tuple): The view size, location and scale, and the layer's 
+            version.
+        """
+        return (viewport.width, viewport.height, viewport.proj_x, viewport.proj_y,
+            viewport.proj_scale, getattr(layer, 'version', None))
+
+    def invalidate(self, bbox, layer=None, padding=8):
+        """
+        Marks a projected box of the map as needing to be redrawn.
+
+        When layers are cached, the next render clears and redraws only the 
+        pixel region covering the box on the cached layer surfaces, rather 
+        than whole layers. If a layer is given, only it is redrawn, and edits
+        made to it before calling invalidate are taken to be inside the box, 
+        so it is not fully redrawn for them. A feature that moved needs both 
+        its old and new extent invalidated.
+
+        Args:
+            bbox (tuple): The projected box to redraw, as (min_x, min_y, 
+            max_x, max_y), e.g. from a feature's geometry.get_extent().
+
+        Optional Args:
+            layer (BaseLayer): The layer to redraw. Defaults to None, which 
+            redraws every layer.
+
+            padding (int): The number of pixels to pad the region by, to 
+            cover strokes and symbols drawn past the box. Defaults to 8.
+
+        Returns:
+            None
+        """
+        self._invalid_boxes.append((tuple(bbox), layer, getattr(layer, 'version', None), padding))
+
+    def _render_cached(self, canvas, viewport, region=None):
+        """
+        Redraws layers with out of date cached renders, and composites all 
+        layers from their cached surfaces in order.
+
+        Args:
+            canvas (*): The canvas to composite the layers onto.
+
+            viewport (Viewport): The snapshot of the view to render.
+
+        Optional Args:
+            region (tuple): A pixel region to redraw on every layer, as (x, y,
+            width, height).
+
+        Returns:
+            None
+        """
+        layers = list(self.layers)
+
+        ## Take the invalidated boxes, as pixel regions of the current view
+        invalid_boxes, self._invalid_boxes = self._invalid_boxes, []
+        regions = []
+        if region is not None:
+            regions.append((region, None, None))
+        for bbox, target, version, padding in invalid_boxes:
+            box_region = viewport.bbox_region(*bbox, padding=padding)
+            if box_region is not None:
+                regions.append((box_region, target, version))
+
+        ## Reactivate stale layers first, as that changes their version
+        for layer in layers:
+            layer.refresh()
+
+        ## Find layers without a cached surface matching the current key. The 
+        ## key is taken before rendering, so edits made while a layer is 
+        ## rendering leave it dirty for the next frame
+        keys = [self._surface_key(layer, viewport) for layer in layers]
+        dirty = []
+        for layer, key in zip(layers, keys):
+            cached = self._layer_surfaces.get(id(layer))
+            layer_regions = [r for r, target, _ in regions if target is None or target is layer]
+
+            ## Edits covered by invalidated regions don't need a full redraw
+            cached_key = cached[0] if cached is not None else None
+            if any(target is layer and version == key[5] for _, target, version in regions):
+                cached_key = cached_key[:5] + key[5:] if cached_key is not None else None
+
+            if cached_key == key:
+                if layer_regions:
+                    dirty.append((layer, key, self._render_regions, (layer, viewport, cached[1], layer_regions)))
+                continue
+
+            ## Shift the cached surface if the view only panned, else redraw
+            shift = None
+            if cached_key is not None and self.incremental_pan:
+                shift = self._pan_shift(cached_key, key)
+            if shift is None:
+                dirty.append((layer, key, self._render_offscreen, (layer, viewport)))
+            else:
+                dirty.append((layer, key, self._render_panned, (layer, viewport, cached[1], *shift, layer_regions)))
+
+        ## Redraw dirty layers, on worker threads if rendering in parallel
+        if self.parallel_render and len(dirty) > 1:
+            if self._render_executor is None:
+                self._render_executor = ThreadPoolExecutor(max_workers=self.render_workers)
+            futures = [self._render_executor.submit(fn, *args) for _, _, fn, args in dirty]
+            surfaces = [future.result() for future in futures]
+        else:
+            surfaces = [fn(*args) for _, _, fn, args in dirty]
+
+        for (layer, key, _, _), surface in zip(dirty, surfaces):
+            self._layer_surfaces[id(layer)] = (key, surface)
+
+        ## Composite every layer from its surface, in layer order
+        for layer in layers:
+            surface = self._layer_surfaces[id(layer)][1]
+            self.renderer.draw_offscreen(canvas, surface, opacity=getattr(layer, 'opacity', 1))
+
+    def _pan_shift(self, old_key, new_key):
+        """
+        Returns the pixel shift between two cached surface keys, if the view 
+        only panned.
+
+        Args:
+            old_key (tuple): The key of the cached surface.
+
+            new_key (tuple): The key of the view being rendered.
+
+        Returns:
+            shift (tuple | None): The whole pixel (x, y) shift to move the 
+            cached surface by. None if the size, scale or layer version 
+            changed, the shift is not whole pixels, or nothing is left to reuse.
+        """
+        ## Size, scale and layer version must be unchanged
+        if old_key[:2] != new_key[:2] or old_key[4:] != new_key[4:]:
+            return None
+        width, height, proj_scale = new_key[0], new_key[1], new_key[4]
+
+        ## Old pixels move opposite the pan, y is flipped on the canvas
+        shift_x = (old_key[2] - new_key[2]) / proj_scale
+        shift_y = (new_key[3] - old_key[3]) / proj_scale
+        whole_x, whole_y = round(shift_x), round(shift_y)
+
+        if abs(shift_x - whole_x) > 1e-3 or abs(shift_y - whole_y) > 1e-3:
+            return None
+        if abs(whole_x) >= width or abs(whole_y) >= height:
+            return None
+        return whole_x, whole_y
+
+    def _render_panned(self, layer, viewport, surface, shift_x, shift_y, regions=()):
+        """
+        Renders a layer onto a new offscreen surface, by shifting its cached 
+        surface and drawing only the exposed regions.
+
+        Args:
+            layer (BaseLayer): The layer to render.
+
+            viewport (Viewport): The snapshot of the view to render.
+
+            surface (*): The layer's cached surface from the previous view.
+
+            shift_x (int): The number of pixels to shift the surface right.
+
+            shift_y (int): The number of pixels to shift the surface down.
+
+        Optional Args:
+            regions (list): Invalidated pixel regions to clear and redraw 
+            after shifting, as (x, y, width, height).
+
+        Returns:
+            offscreen (*): The renderer's offscreen surface holding the layer.
+        """
+        offscreen = self.renderer.new_offscreen(viewport.width, viewport.height)
+        canvas = self.renderer.offscreen_canvas(offscreen)
+        self.renderer.draw_offscreen(canvas, surface, x=shift_x, y=shift_y)
+
+        for region in exposed_regions(viewport.width, viewport.height, shift_x, shift_y):
+            self._render_region(layer, canvas, viewport, region)
+        return self._render_regions(layer, viewport, offscreen, regions)
+
+    def _render_regions(self, layer, viewport, surface, regions):
+        """
+        Clears and redraws pixel regions of a layer's cached surface in place.
+
+        Args:
+            layer (BaseLayer): The layer to render.
+
+            viewport (Viewport): The snapshot of the view to render.
+
+            surface (*): The layer's cached surface for the view.
+
+            regions (list): The pixel regions to redraw, as (x, y, width, 
+            height).
+
+        Returns:
+            surface (*): The updated surface.
+        """
+        canvas = self.renderer.offscreen_canvas(surface)
+        for region in regions:
+            self.renderer.clear_region(canvas, *region)
+            self._render_region(layer, canvas, viewport, region)
+        return surface
+
+    def _render_region(self, layer, canvas, viewport, region):
+        """
+        Renders a layer onto a canvas, clipped to a pixel region.
+
+        The layer is given a viewport limited to the region, padded by 
+        region_margin pixels, so it only draws features near the region.
+
+        Args:
+            layer (BaseLayer): The layer to render.
+
+            canvas (*): The canvas to draw on.
+
+            viewport (Viewport): The snapshot of the view to render.
+
+            region (tuple): The pixel region to draw, as (x, y, width, height).
+
+        Returns:
+            None
+        """
+        x, y, width, height = region
+        margin = self.region_margin
+        region_viewport = dataclasses.replace(viewport, 
+            region=(x - margin, y - margin, width + 2 * margin, height + 2 * margin))
+
+        self.renderer.push_clip(canvas, x, y, width, height)
+        try:
+            layer.render(self.renderer, canvas, region_viewport)
+        finally:
+            self.renderer.pop_clip(canvas)
+
+    def _render_offscreen(self, layer, viewport, region=None):
+        """
+        Renders a single layer onto a new offscreen surface.
+
+        Args:
+            layer (BaseLayer): The layer to render.
+
+            viewport (Viewport): The snapshot of the view to render.
+
+        Optional Args:
+            region (tuple): A pixel region to limit drawing to, as (x, y, 
+            width, height). Defaults to None, drawing the whole layer.
+
+        Returns:
+            offscreen (*): The renderer's offscreen surface holding the layer.
+        """
+        layer.refresh()
+        offscreen = self.renderer.new_offscreen(viewport.width, viewport.height)
+        offscreen_canvas = self.renderer.offscreen_canvas(offscreen)
+        if region is None:
+            layer.render(self.renderer, offscreen_canvas, viewport)
+        else:
+            self._render_region(layer, offscreen_canvas, viewport, region)
+        return offscreen
+
+    def _render_parallel(self, canvas, viewport):
+        """
+        Renders all layers on worker threads, and composites them in order.
+
+        Args:
+            canvas (*): The canvas to composite the layers onto.
+
+            viewport (Viewport): The snapshot of the view to render.
+
+        Returns:
+            None
+        """
+        if self._render_executor is None:
+            self._render_executor = ThreadPoolExecutor(max_workers=self.render_workers)
+
+        ## Start every layer, then composite each as soon as it and all the
+        ## layers below it are done
+        layers = list(self.layers)
+        futures = [self._render_executor.submit(self._render_offscreen, layer, viewport) for layer in layers]
+        for layer, future in zip(layers, futures):
+            self.renderer.draw_offscreen(canvas, future.result(), opacity=getattr(layer, 'opacity', 1))
+
+    def geo2proj(self, geo_x, geo_y, out=None, progress=None, cancel=None):
+        """
+        Converts geographic coordinates to projection coordinates.
+
+        Converts geographic coordinates, either singlet or vectorized, to 
+        projection coordinates of the maps CRS. Output is same type as input,
+        numpy arrays are returned as numpy arrays without any conversion.
+
+        Args:
+            geo_x (int | float | list | numpy.ndarray): The input longitude or 
+            geographic x value(s) to convert.
+
+            geo_y (int | float | list | numpy.ndarray): The input latitude or 
+            geographic y value(s) to convert.
+        
+        Optional Args:
+            out (tuple): A pair of numpy arrays, the same size as the input, to
+            write the output values into. If given, the pair is returned.
+
+            progress (callable): Called as progress(done, total) as chunks of 
+            vectorized values finish transforming.
+
+            cancel (threading.Event): An event which stops transforming 
+            vectorized values when set, raising TransformCancelled.
+
+        Returns:
+            proj_x (int | float | list | numpy.ndarray): The output x value(s).
+
+            proj_y (int | float | list | numpy.ndarray): The output y value(s).
+        """
+        ## Convert list to numpy array
+        list_flag = isinstance(geo_x, list)
+        if list_flag:
+            geo_x = np.array(geo_x, dtype=float)
+            geo_y = np.array(geo_y, dtype=float)
+
+        ## Use geo2proj transform to convert points, arrays in parallel chunks
+        if isinstance(geo_x, np.ndarray) and geo_x.ndim == 1:
+            tolerance = self.get_approx_tolerance()
+            proj_x, proj_y = self.chunked_transformer.transform(self.transform_geo2proj, geo_x, geo_y, 
+                out, progress, cancel, tolerance)
+        else:
+            proj_x, proj_y = transform_values(self.transform_geo2proj, geo_x, geo_y, out)
+
+        ## If data is vectorized, handle all infs in dataset
+        if isinstance(proj_x, np.ndarray):
+            bounds = None
+            if self.invalid_policy == 'clamp':
+                bounds = self.get_crs_bounds()[0]
+            self._handle_invalid(self.transform_geo2proj, geo_x, geo_y, proj_x, proj_y, bounds)
+
+        ## Convert back to python list
+        if list_flag and out is None:
+            proj_x, proj_y = proj_x.tolist(), proj_y.tolist()
         
         ## Return data values
         return proj_x, proj_y
     
-    def proj2geo(self, proj_x, proj_y):
+    def proj2geo(self, proj_x, proj_y, out=None, progress=None, cancel=None):
         """
         Converts projection coordinates to geographic coordinates.
 
         Converts projection coordinates using the maps CRS, either singlet or 
-        vectorized, to geographic coordinates. Output is same type as input.
+        vectorized, to geographic coordinates. Output is same type as input,
+        numpy arrays are returned as numpy arrays without any conversion.
 
         Args:
-            proj_x (int | float | list): The input projected x value(s) to 
-            convert.
+            proj_x (int | float | list | numpy.ndarray): The input projected x
+            value(s) to convert.
 
-            proj_y (int | float | list): The input projected y value(s) to 
-            convert.
-    
+            proj_y (int | float | list | numpy.ndarray): The input projected y
+            value(s) to convert.
+        
+        Optional Args:
+            out (tuple): A pair of numpy arrays, the same size as the input, to
+            write the output values into. If given, the pair is returned.
+
+            progress (callable): Called as progress(done, total) as chunks of 
+            vectorized values finish transforming.
+
+            cancel (threading.Event): An event which stops transforming 
+            vectorized values when set, raising TransformCancelled.
 
         Returns:
-            geo_x (int | float | list): The output longitude (x) value(s).
+            geo_x (int | float | list | numpy.ndarray): The output longitude 
+            (x) value(s).
 
-            geo_y (int | float | list): The output latitude (y) value(s).
+            geo_y (int | float | list | numpy.ndarray): The output latitude 
+            (y) value(s).
         """
-        geo_x, geo_y = self.transform_proj2geo.transform(proj_x, proj_y)
-
-        ## If data is a list, purge all infs from dataset
-        if isinstance(geo_x, list):
-            geo_x, geo_y = np.array(geo_x), np.array(geo_y)
+        ## Convert list to numpy array
+        list_flag = isinstance(proj_x, list)
+        if list_flag:
+            proj_x = np.array(proj_x, dtype=float)
+            proj_y = np.array(proj_y, dtype=float)
 
-            ## Replace all np.inf values with last valid value (to prevent tearing during rendering)
-            while np.isinf(geo_x).any() or np.isinf(geo_y).any():
-                geo_x[np.where(np.isinf(geo_x))] = geo_x[np.where(np.isinf(geo_x))[0]-1]
-                geo_y[np.where(np.isinf(geo_y))] = geo_y[np.where(np.isinf(geo_y))[0]-1]
-            
-            ## Convert back to python list
-            geo_x, geo_y = list(geo_x), list(geo_y)
+        ## Use proj2geo transform to convert points, arrays in parallel chunks
+        if isinstance(proj_x, np.ndarray) and proj_x.ndim == 1:
+            geo_x, geo_y = self.chunked_transformer.transform(self.transform_proj2geo, proj_x, proj_y, 
+                out, progress, cancel)
+        else:
+            geo_x, geo_y = transform_values(self.transform_proj2geo, proj_x, proj_y, out)
+
+        ## If data is vectorized, handle all infs in dataset
+        if isinstance(geo_x, np.ndarray):
+            bounds = None
+            if self.invalid_policy == 'clamp':
+                bounds = self.get_crs_bounds()[1]
+            self._handle_invalid(self.transform_proj2geo, proj_x, proj_y, geo_x, geo_y, bounds)
+
+        ## Convert back to python list
+        if list_flag and out is None:
+            geo_x, geo_y = geo_x.tolist(), geo_y.tolist()
         
         return geo_x, geo_y
 
-    def proj2pix(self, proj_x, proj_y):
+    def proj2pix(self, proj_x, proj_y, out=None):
         """
         Converts projection coordinates to canvas pixel coordinates.
 
         Converts projection coordinates using the maps CRS, either singlet or 
         vectorized, to canvas pixel coordinates with (0,0) at the top left 
-        corner of the map. Output type is same type as input.
+        corner of the map. Output type is same type as input. Lists are 
+        rounded to whole pixels, numpy arrays are returned as unrounded float 
+        arrays.
 
         Args:
-            proj_x (int | float | list): The input projected x value(s) to 
-            convert.
+            proj_x (int | float | list | numpy.ndarray): The input projected x
+            value(s) to convert.
 
-            proj_y (int | float | list): The input projected y value(s) to 
-            convert.
-    
+            proj_y (int | float | list | numpy.ndarray): The input projected y
+            value(s) to convert.
+        
+        Optional Args:
+            out (tuple): A pair of numpy arrays, the same size as the input, to
+            write the output values into. If given, the pair is returned.
 
         Returns:
-            canvas_x (int | float | list): The output pixel x value(s).
+            canvas_x (int | float | list | numpy.ndarray): The output pixel x
+            value(s).
 
-            canvas_y (int | float | list): The output pixel y value(s).
+            canvas_y (int | float | list | numpy.ndarray): The output pixel y
+            value(s).
         """
         ## Flag true if input is list
         list_flag = False
 
         ## Convert list to numpy array
         if isinstance(proj_x, list):
-            proj_x = np.array(proj_x)
-            proj_y = np.array(proj_y)
+            proj_x = np.array(proj_x, dtype=float)
+            proj_y = np.array(proj_y, dtype=float)
             list_flag = True
         
-        ## Do math logic on all points
+        ## Do math logic on singlet points
         # NOTE: @ self._proj_scale has to be a float!
-        pix_x = ((proj_x - self.proj_x) / self._proj_scale) + int(self.width / 2)
-        pix_y = -((proj_y - self.proj_y) / self._proj_scale) + int(self.height / 2)
+        if not isinstance(proj_x, np.ndarray):
+            pix_x = ((proj_x - self.proj_x) / self._proj_scale) + int(self.width / 2)
+            pix_y = -((proj_y - self.proj_y) / self._proj_scale) + int(self.height / 2)
+            return pix_x, pix_y
+
+        ## Apply the view affine to vectorized points in a single blocked pass
+        if out is None:
+            pix_x, pix_y = np.empty(proj_x.shape), np.empty(proj_y.shape)
+        else:
+            pix_x, pix_y = out
+        affine_into(proj_x, self.proj_x, 1.0 / self._proj_scale, int(self.width / 2), pix_x)
+        affine_into(proj_y, self.proj_y, -1.0 / self._proj_scale, int(self.height / 2), pix_y)
 
-        ## Convert numpy array to list
+        if out is not None:
+            return out
+
+        ## Round and convert numpy array to list
         if list_flag:
-            pix_x = list(map(round, pix_x))
-            pix_y = list(map(round, pix_y))
-        
+            pix_x = np.rint(pix_x).astype(int).tolist()
+            pix_y = np.rint(pix_y).astype(int).tolist()
         
         return pix_x, pix_y
 
-    def pix2proj(self, pix_x, pix_y):
+    def pix2proj(self, pix_x, pix_y, out=None):
         """
         Converts canvas pixel coordinates to projection coordinates.
 
@@ -614,66 +1415,122 @@ class Map:
         as input type.
 
         Args:
-            pix_x (int | float | list): The input canvas x value(s) to 
-            convert.
+            pix_x (int | float | list | numpy.ndarray): The input canvas x 
+            value(s) to convert.
 
-            pix_y (int | float | list): The input canvas y value(s) to 
-            convert.
+            pix_y (int | float | list | numpy.ndarray): The input canvas y 
+            value(s) to convert.
+        
+        Optional Args:
+            out (tuple): A pair of numpy arrays, the same size as the input, to
+            write the output values into. If given, the pair is returned.
     
         Returns:
-            proj_x (int | float | list): The output projection x value(s).
+            proj_x (int | float | list | numpy.ndarray): The output projection
+            x value(s).
 
-            proj_y (int | float | list): The output projection y value(s).
+            proj_y (int | float | list | numpy.ndarray): The output projection
+            y value(s).
         """
         ## Flag true if input is list
         list_flag = False
 
         ## Convert list to numpy array
         if isinstance(pix_x, list):
-            pix_x = np.array(pix_x)
-            pix_y = np.array(pix_y)
+            pix_x = np.array(pix_x, dtype=float)
+            pix_y = np.array(pix_y, dtype=float)
             list_flag = True
         
-        ## Do math logic on all points
+        ## Do math logic on singlet points
         #! NOTE: @ self._proj_scale has to be a float!
         #! NOTE: a round(...) might be better 
-        proj_x = self.proj_x + ((pix_x - int(self.width / 2)) * self._proj_scale) 
-        proj_y = (self.proj_y + ((pix_y - int(self.height / 2)) * self._proj_scale))
+        if not isinstance(pix_x, np.ndarray):
+            proj_x = self.proj_x + ((pix_x - int(self.width / 2)) * self._proj_scale) 
+            proj_y = (self.proj_y + ((pix_y - int(self.height / 2)) * self._proj_scale))
+            return proj_x, proj_y
+
+        ## Apply the inverse view affine to vectorized points
+        if out is None:
+            proj_x, proj_y = np.empty(pix_x.shape), np.empty(pix_y.shape)
+        else:
+            proj_x, proj_y = out
+        affine_into(pix_x, int(self.width / 2), self._proj_scale, self.proj_x, proj_x)
+        affine_into(pix_y, int(self.height / 2), self._proj_scale, self.proj_y, proj_y)
 
+        if out is not None:
+            return out
 
         ## Convert numpy array to list
         if list_flag:
-            proj_x = list(proj_x)
-            proj_y = list(proj_y)
+            proj_x = proj_x.tolist()
+            proj_y = proj_y.tolist()
         
         return proj_x, proj_y
 
-    def geo2pix(self, geo_x, geo_y):
+    def geo2pix(self, geo_x, geo_y, out=None):
         """
         Converts geographic coordinates to canvas pixel coordinates.
 
         Converts geographic coordinates directly to canvas pixel coordinates.
         Input can be either singlet or vectorized. Output will be same type as 
         input. Canvas pixel coordinates are set to have (0,0) at the top left 
-        corner of the map.
+        corner of the map. Vectorized points are projected and moved into 
+        pixel space inside the output buffers, without intermediate arrays.
 
         Args:
-            geo_x (int | float | list): The input longitude or geographic x 
-            value(s) to convert.
+            geo_x (int | float | list | numpy.ndarray): The input longitude or 
+            geographic x value(s) to convert.
 
-            geo_y (int | float | list): The input latitude or geographic y 
-            value(s) to convert.
+            geo_y (int | float | list | numpy.ndarray): The input latitude or 
+            geographic y value(s) to convert.
+        
+        Optional Args:
+            out (tuple): A pair of float32 or float64 numpy arrays, the same 
+            size as the input, to write the output values into. If given, the 
+            pair is returned.
 
         Returns:
-            canvas_x (int | float | list): The output pixel x value(s).
+            canvas_x (int | float | list | numpy.ndarray): The output pixel x
+            value(s).
 
-            canvas_y (int | float | list): The output pixel y value(s).
+            canvas_y (int | float | list | numpy.ndarray): The output pixel y
+            value(s).
         """
-        proj_x, proj_y = self.geo2proj(geo_x, geo_y)
-        canvas_x, canvas_y = self.proj2pix(proj_x, proj_y)
-        return canvas_x, canvas_y
+        ## Singlet points do not need any buffers
+        if not isinstance(geo_x, (list, np.ndarray)):
+            proj_x, proj_y = self.geo2proj(geo_x, geo_y)
+            return self.proj2pix(proj_x, proj_y)
+
+        ## Convert list to numpy array, and round results at the end
+        list_flag = isinstance(geo_x, list)
+        if list_flag:
+            geo_x = np.array(geo_x, dtype=float)
+            geo_y = np.array(geo_y, dtype=float)
+
+        if out is None:
+            pix_x, pix_y = np.empty(geo_x.shape), np.empty(geo_y.shape)
+        else:
+            pix_x, pix_y = out
+
+        ## Project into the output buffers if pyproj can write into them 
+        ## directly, otherwise into a reused float64 scratch buffer
+        if pix_x.dtype == np.float64 and pix_x.flags.c_contiguous:
+            proj_x, proj_y = pix_x, pix_y
+        else:
+            proj_x, proj_y = self._buffers.get('geo2pix', len(geo_x))
+        self.geo2proj(geo_x, geo_y, out=(proj_x, proj_y))
+
+        ## Apply view affine in place
+        self.proj2pix(proj_x, proj_y, out=(pix_x, pix_y))
+
+        ## Round and convert numpy array to list
+        if list_flag and out is None:
+            pix_x = np.rint(pix_x).astype(int).tolist()
+            pix_y = np.rint(pix_y).astype(int).tolist()
+
+        return pix_x, pix_y
     
-    def pix2geo(self, pix_x, pix_y):
+    def pix2geo(self, pix_x, pix_y, out=None):
         """
         Converts canvas pixel coordinates to geographic coordinates.
 
@@ -683,17 +1540,23 @@ class Map:
         Output type is same type as input.
 
         Args:
-            pix_x (int | float | list): The input canvas x value(s) to 
-            convert.
+            pix_x (int | float | list | numpy.ndarray): The input canvas x 
+            value(s) to convert.
 
-            pix_y (int | float | list): The input canvas y value(s) to 
-            convert.
+            pix_y (int | float | list | numpy.ndarray): The input canvas y 
+            value(s) to convert.
+        
+        Optional Args:
+            out (tuple): A pair of numpy arrays, the same size as the input, to
+            write the output values into. If given, the pair is returned.
 
         Returns:
-            geo_x (int | float | list): The output longitude (x) value(s).
+            geo_x (int | float | list | numpy.ndarray): The output longitude 
+            (x) value(s).
 
-            geo_y (int | float | list): The output latitude (y) value(s).
+            geo_y (int | float | list | numpy.ndarray): The output latitude 
+            (y) value(s).
         """
-        proj_x, proj_y = self.pix2proj(pix_x, pix_y)
-        geo_x, geo_y = self.proj2geo(proj_x, proj_y)
-        return geo_x, geo_y
\ No newline at end of file
+        proj_x, proj_y = self.pix2proj(pix_x, pix_y, out)
+        geo_x, geo_y = self.proj2geo(proj_x, proj_y, out)
+        return geo_x, geo_y
@@ -0,0 +1,917 @@
+"""
+Project: PyMapKit
+File: projection.py
+Title: Projection Utilities
+Function: Holds the functions used to transform coordinates between CRSs, and
+    to handle coordinates that fail to project.
+Author: Ben Knisley [benknisley@gmail.com]
+Created: 16 October, 2026
+"""
+import math
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
+import pyproj
+
+
+## Policies for handling coordinates that project to inf or nan
+##  fill:  replace each invalid vertex with the last valid vertex
+##  clamp: clamp invalid vertices to the CRS bounds and reproject them
+##  drop:  remove invalid vertices from their geometry
+##  split: remove invalid vertices, splitting parts where they were removed
+INVALID_POLICIES = ('fill', 'clamp', 'drop', 'split')
+
+
+## EPSG codes of WGS84 lon/lat, and of spherical (web) mercator CRSs
+GEOGRAPHIC_WGS84_CODES = (4326,)
+SPHERICAL_MERCATOR_CODES = (3857, 3785, 900913)
+
+DEG_TO_RAD = math.pi / 180
+RAD_TO_DEG = 180 / math.pi
+
+
+class SphericalMercatorTransformer:
+    """
+    A closed-form transformer between WGS84 lon/lat and spherical mercator.
+
+    Implements the subset of the pyproj Transformer interface used by 
+    PyMapKit with NumPy formulas, avoiding PROJ overhead for the most common
+    CRS pair. Latitudes are clamped to the square web mercator extent 
+    (±85.0511°), instead of growing without bound towards the poles. Like 
+    PROJ, longitudes are wrapped into ±180°, and latitudes past the poles 
+    transform to inf.
+    """
+
+    ## Radius of the sphere, in meters
+    radius = 6378137.0
+
+    ## Latitude at which the mercator map is square
+    max_latitude = 85.05112877980659
+
+    def __init__(self, inverse=False):
+        """
+        Initializes a new SphericalMercatorTransformer object.
+
+        Args:
+            None
+
+        Optional Args:
+            inverse (bool): Whether to transform from mercator to lon/lat. 
+            Defaults to False, transforming lon/lat to mercator.
+
+        Returns:
+            None
+        """
+        self.inverse = inverse
+
+    def __repr__(self):
+        """ Returns a string representation of the transformer """
+        direction = 'mercator to lon/lat' if self.inverse else 'lon/lat to mercator'
+        return f"SphericalMercatorTransformer ({direction})"
+
+    def is_exact_same(self, other):
+        """ Returns True if other transforms exactly the same way """
+        return isinstance(other, SphericalMercatorTransformer) and other.inverse == self.inverse
+
+    def transform(self, xx, yy, inplace=False):
+        """
+        Transforms coordinates.
+
+        Args:
+            xx (int | float | list | numpy.ndarray): The input x value(s).
+
+            yy (int | float | list | numpy.ndarray): The input y value(s).
+
+        Optional Args:
+            inplace (bool): Whether to write the output into the inputs, which
+            must be float64 numpy arrays. Defaults to False.
+
+        Returns:
+            out_x (float | list | numpy.ndarray): The transformed x value(s).
+
+            out_y (float | list | numpy.ndarray): The transformed y value(s).
+        """
+        ## Transform singlet values with the math module, matching PROJ
+        if np.ndim(xx) == 0 and not inplace:
+            if self.inverse:
+                return self._inverse_scalar(float(xx), float(yy))
+            return self._forward_scalar(float(xx), float(yy))
+
+        list_flag = isinstance(xx, (list, tuple))
+
+        if inplace:
+            out_x, out_y = xx, yy
+        else:
+            out_x = np.array(xx, dtype=np.float64)
+            out_y = np.array(yy, dtype=np.float64)
+
+        if self.inverse:
+            self._inverse(out_x, out_y)
+        else:
+            self._forward(out_x, out_y)
+
+        if list_flag:
+            return out_x.tolist(), out_y.tolist()
+        return out_x, out_y
+
+    def _forward_scalar(self, lon, lat):
+        """ Transforms a single lon/lat to mercator. """
+        if not (abs(lat) <= 90 and math.isfinite(lon)):
+            return math.inf, math.inf
+        if abs(lon) > 180:
+            lon = (lon + 180) % 360 - 180
+        lat = min(max(lat, -self.max_latitude), self.max_latitude)
+        return lon * DEG_TO_RAD * self.radius, self.radius * math.asinh(math.tan(lat * DEG_TO_RAD))
+
+    def _inverse_scalar(self, x, y):
+        """ Transforms a single mercator x/y to lon/lat. """
+        lon = x * (1 / self.radius) * RAD_TO_DEG
+        if abs(lon) > 180:
+            lon = (lon + 180) % 360 - 180
+        return lon, math.atan(math.sinh(y * (1 / self.radius))) * RAD_TO_DEG
+
+    def _forward(self, x, y):
+        """ Transforms lon/lat arrays to mercator, in place. """
+        ## Mark latitudes past the poles, or unusable input, as invalid
+        with np.errstate(invalid='ignore'):
+            invalid = ~(np.abs(y) <= 90)
+        invalid |= ~np.isfinite(x)
+
+        _wrap_longitude(x)
+        np.clip(y, -self.max_latitude, self.max_latitude, out=y)
+
+        ## x = R * lon, y = R * asinh(tan(lat)), in radians
+        np.multiply(x, DEG_TO_RAD, out=x)
+        np.multiply(x, self.radius, out=x)
+        np.multiply(y, DEG_TO_RAD, out=y)
+        np.tan(y, out=y)
+        np.arcsinh(y, out=y)
+        np.multiply(y, self.radius, out=y)
+
+        if invalid.any():
+            x[invalid] = np.inf
+            y[invalid] = np.inf
+
+    def _inverse(self, x, y):
+        """ Transforms mercator arrays to lon/lat, in place. """
+        ## lon = x / R, lat = atan(sinh(y / R)), in radians
+        np.multiply(x, 1 / self.radius, out=x)
+        np.multiply(x, RAD_TO_DEG, out=x)
+        _wrap_longitude(x)
+        np.multiply(y, 1 / self.radius, out=y)
+        np.sinh(y, out=y)
+        np.arctan(y, out=y)
+        np.multiply(y, RAD_TO_DEG, out=y)
+
+
+def _wrap_longitude(lon):
+    """ Wraps longitudes past ±180 degrees back into range, in place. """
+    with np.errstate(invalid='ignore'):
+        outside = np.abs(lon) > 180
+    if outside.any():
+        lon[outside] = (lon[outside] + 180) % 360 - 180
+
+def is_spherical_mercator_pair(source_crs, target_crs):
+    """
+    Returns whether a CRS pair is WGS84 lon/lat and spherical mercator.
+
+    Args:
+        source_crs (pyproj.crs.CRS): The CRS to transform from.
+
+        target_crs (pyproj.crs.CRS): The CRS to transform to.
+
+    Returns:
+        direction (str | None): 'forward' for lon/lat to mercator, 'inverse'
+        for mercator to lon/lat, or None for any other pair.
+    """
+    source_code = source_crs.to_epsg()
+    target_code = target_crs.to_epsg()
+
+    if source_code in GEOGRAPHIC_WGS84_CODES and target_code in SPHERICAL_MERCATOR_CODES:
+        return 'forward'
+    if source_code in SPHERICAL_MERCATOR_CODES and target_code in GEOGRAPHIC_WGS84_CODES:
+        return 'inverse'
+    return None
+
+
+def _crs_key(crs):
+    """
+    Returns a hashable key for a CRS, without serializing it to WKT.
+
+    CRS objects are keyed by the definition they were built from, which is 
+    what pyproj pickles them as. Other inputs, such as 'EPSG:4326', are keyed
+    as given, so equivalent inputs may be cached more than once.
+    """
+    if isinstance(crs, pyproj.crs.CRS):
+        return crs.srs
+    try:
+        hash(crs)
+    except TypeError:
+        ## Unhashable inputs, such as dicts, are keyed by their definition
+        return pyproj.crs.CRS.from_user_input(crs).srs
+    return crs
+
+
+class TransformerCache:
+    """
+    A thread-safe, bounded cache of pyproj transformers.
+
+    Building a pyproj Transformer takes tens of milliseconds, so transformers
+    are cached by (source CRS, target CRS, always_xy), and shared by every map
+    and layer in the process. Sharing them across threads relies on pyproj 
+    3.1+, where transformers are thread-safe. The least recently used 
+    transformer is dropped once the cache holds max_size transformers.
+    """
+
+    def __init__(self, max_size=64):
+        """
+        Initializes a new TransformerCache object.
+
+        Args:
+            None
+
+        Optional Args:
+            max_size (int): The max number of transformers to hold.
+
+        Returns:
+            None
+        """
+        self.max_size = max_size
+        self._transformers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """ Returns the number of cached transformers. """
+        return len(self._transformers)
+
+    def get(self, source_crs, target_crs, always_xy=True):
+        """
+        Returns a transformer between two CRSs, building it if needed.
+
+        Args:
+            source_crs (str | pyproj.crs.CRS): The CRS to transform from.
+
+            target_crs (str | pyproj.crs.CRS): The CRS to transform to.
+
+        Optional Args:
+            always_xy (bool): Whether the transformer uses x, y (lon, lat)
+            axis order. Defaults to True.
+
+        Returns:
+            transformer (pyproj.Transformer | SphericalMercatorTransformer): 
+            The cached transformer.
+        """
+        key = (_crs_key(source_crs), _crs_key(target_crs), bool(always_xy))
+
+        with self._lock:
+            transformer = self._transformers.get(key)
+            if transformer is not None:
+                self._transformers.move_to_end(key)
+                return transformer
+
+        source_crs = pyproj.crs.CRS.from_user_input(source_crs)
+        target_crs = pyproj.crs.CRS.from_user_input(target_crs)
+
+        ## Build outside of the lock, so other lookups are not blocked. The
+        ## closed-form mercator transformer only supports lon/lat axis order
+        direction = is_spherical_mercator_pair(source_crs, target_crs) if always_xy else None
+        if direction:
+            transformer = SphericalMercatorTransformer(inverse=direction == 'inverse')
+        else:
+            transformer = pyproj.Transformer.from_crs(source_crs, target_crs, always_xy=always_xy)
+
+        with self._lock:
+            ## Keep the first transformer if another thread built one too
+            transformer = self._transformers.setdefault(key, transformer)
+            self._transformers.move_to_end(key)
+            while len(self._transformers) > self.max_size:
+                self._transformers.popitem(last=False)
+        
+        return transformer
+
+    def clear(self):
+        """
+        Removes all cached transformers.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._transformers.clear()
+
+
+## Create the transformer cache shared by the whole process
+transformer_cache = TransformerCache()
+
+def get_transformer(source_crs, target_crs, always_xy=True):
+    """
+    Returns a transformer between two CRSs from the shared transformer cache.
+
+    Args:
+        source_crs (str | pyproj.crs.CRS): The CRS to transform from.
+
+        target_crs (str | pyproj.crs.CRS): The CRS to transform to.
+
+    Optional Args:
+        always_xy (bool): Whether the transformer uses x, y (lon, lat) axis 
+        order. Defaults to True.
+
+    Returns:
+        transformer (pyproj.Transformer | SphericalMercatorTransformer): The 
+        cached transformer.
+    """
+    return transformer_cache.get(source_crs, target_crs, always_xy)
+
+def transform_values(transformer, x_values, y_values, out=None):
+    """
+    Transforms coordinates with a pyproj transformer.
+
+    Runs the given transformer over singlet or vectorized coordinates. If an
+    output buffer pair is given the results are written into it, in place when
+    the buffers are contiguous float64 arrays, and the buffers are returned.
+
+    Args:
+        transformer (pyproj.Transformer): The transformer to run.
+
+        x_values (int | float | numpy.ndarray): The input x value(s).
+
+        y_values (int | float | numpy.ndarray): The input y value(s).
+
+    Optional Args:
+        out (tuple): A pair of numpy arrays to write the output values into.
+
+    Returns:
+        out_x (float | numpy.ndarray): The transformed x value(s).
+
+        out_y (float | numpy.ndarray): The transformed y value(s).
+    """
+    if out is None:
+        return transformer.transform(x_values, y_values)
+
+    out_x, out_y = out
+
+    ## pyproj can only transform in place into writable float64 buffers
+    inplace = all(
+        buf.dtype == np.float64 and buf.flags.c_contiguous and buf.flags.writeable
+        for buf in out
+    )
+
+    if inplace:
+        np.copyto(out_x, x_values)
+        np.copyto(out_y, y_values)
+        transformer.transform(out_x, out_y, inplace=True)
+    else:
+        out_x[...], out_y[...] = transformer.transform(x_values, y_values)
+
+    return out_x, out_y
+
+class TransformCancelled(Exception):
+    """ Raised when a chunked transform is cancelled before finishing. """
+
+
+def transform_chunked(transformer, x_values, y_values, out=None, chunk_size=1000000,
+        executor=None, progress=None, cancel=None, tolerance=None):
+    """
+    Transforms large coordinate arrays in chunks, optionally in parallel.
+
+    Splits the coordinate arrays into chunks, and transforms each chunk into
+    its slice of the output buffers. If an executor is given, chunks are 
+    transformed on its workers, pyproj releases the GIL while transforming so
+    threads scale with core count. Otherwise chunks run on the calling thread.
+    The workers share one transformer, which requires pyproj 3.1+, where 
+    transformers are thread-safe.
+
+    Args:
+        transformer (pyproj.Transformer): The transformer to run.
+
+        x_values (numpy.ndarray): The input x values.
+
+        y_values (numpy.ndarray): The input y values.
+
+    Optional Args:
+        out (tuple): A pair of numpy arrays to write the output values into.
+        Float64 buffers are allocated if not given.
+
+        chunk_size (int): The number of vertices transformed per chunk.
+
+        executor (concurrent.futures.Executor): The pool to run chunks on.
+
+        progress (callable): Called as progress(done, total) with the number of
+        vertices transformed, after each chunk finishes.
+
+        cancel (threading.Event): An event which stops the transform when set.
+        Chunks not yet started are skipped, and TransformCancelled is raised.
+
+        tolerance (float): If given, each chunk is transformed approximately 
+        with approx_transform, within this error in output units.
+
+    Returns:
+        out_x (numpy.ndarray): The transformed x values.
+
+        out_y (numpy.ndarray): The transformed y values.
+    """
+    total = len(x_values)
+    if out is None:
+        out = (np.empty(total, dtype=np.float64), np.empty(total, dtype=np.float64))
+    out_x, out_y = out
+
+    def run_chunk(start):
+        ## Skip chunks that start after a cancel
+        if cancel is not None and cancel.is_set():
+            return 0
+        end = min(start + chunk_size, total)
+        chunk_out = (out_x[start:end], out_y[start:end])
+        if tolerance is None:
+            transform_values(transformer, x_values[start:end], y_values[start:end], chunk_out)
+        else:
+            approx_transform(transformer, x_values[start:end], y_values[start:end], tolerance, chunk_out)
+        return end - start
+
+    starts = range(0, total, max(int(chunk_size), 1))
+    done = 0
+
+    if executor is None or len(starts) < 2:
+        for start in starts:
+            done += run_chunk(start)
+            if progress is not None:
+                progress(done, total)
+    else:
+        futures = [executor.submit(run_chunk, start) for start in starts]
+        try:
+            for future in as_completed(futures):
+                done += future.result()
+                if progress is not None:
+                    progress(done, total)
+        finally:
+            ## Don't leave chunks writing into the buffers after an error
+            for future in futures:
+                future.cancel()
+
+    if cancel is not None and cancel.is_set():
+        raise TransformCancelled(f"Transform cancelled after {done} of {total} vertices")
+
+    return out_x, out_y
+
+
+class ChunkedTransformer:
+    """
+    Runs chunked transforms on a lazily created pool of worker threads.
+
+    Held by a map to reproject large layers on several cores. The pool is 
+    created the first time an array larger than one chunk is transformed. 
+    Like transform_chunked, relies on pyproj 3.1+ thread-safe transformers.
+    """
+
+    def __init__(self, workers=None, chunk_size=1000000):
+        """
+        Initializes a new ChunkedTransformer object.
+
+        Args:
+            None
+
+        Optional Args:
+            workers (int): The number of worker threads. Defaults to the 
+            number of CPUs.
+
+            chunk_size (int): The number of vertices transformed per chunk.
+
+        Returns:
+            None
+        """
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def set_workers(self, workers):
+        """
+        Sets the number of worker threads, replacing any running pool.
+
+        Args:
+            workers (int | None): The number of worker threads, or None to use
+            the number of CPUs. 1 transforms on the calling thread.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            self.workers = workers
+
+    def get_executor(self):
+        """
+        Returns the worker pool, creating it if needed.
+
+        Args:
+            None
+
+        Returns:
+            executor (concurrent.futures.ThreadPoolExecutor | None): The pool,
+            or None if only one worker is configured.
+        """
+        if self.workers == 1:
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def transform(self, transformer, x_values, y_values, out=None, progress=None, cancel=None,
+            tolerance=None):
+        """
+        Transforms coordinate arrays, in parallel chunks when they are large.
+
+        Args:
+            transformer (pyproj.Transformer): The transformer to run.
+
+            x_values (numpy.ndarray): The input x values.
+
+            y_values (numpy.ndarray): The input y values.
+
+        Optional Args:
+            out (tuple): A pair of numpy arrays to write the output values into.
+
+            progress (callable): Called as progress(done, total) after each 
+            chunk finishes.
+
+            cancel (threading.Event): An event which stops the transform when 
+            set, raising TransformCancelled.
+
+            tolerance (float): If given, values are transformed approximately,
+            within this error in output units.
+
+        Returns:
+            out_x (numpy.ndarray): The transformed x values.
+
+            out_y (numpy.ndarray): The transformed y values.
+        """
+        executor = None
+        if len(x_values) > self.chunk_size:
+            executor = self.get_executor()
+
+        return transform_chunked(transformer, x_values, y_values, out, self.chunk_size,
+            executor, progress, cancel, tolerance)
+
+
+def approx_transform(transformer, x_values, y_values, tolerance, out=None, min_depth=2,
+        max_depth=10, min_points=4096):
+    """
+    Approximately transforms coordinates, interpolating on an adaptive grid.
+
+    Samples the exact transform on a quadtree of cells over the extent of the
+    input, only subdividing cells that hold input vertices. A cell is accepted
+    when bilinear interpolation of its corners predicts its center, edge 
+    midpoints and quarter points within tolerance, and its vertices are then 
+    interpolated from the corners. Vertices in cells that never meet the 
+    tolerance, and inputs too small to benefit, are transformed exactly. 
+    Similar to GDAL's approximate transformer, but over a 2D grid rather than
+    scanlines.
+
+    Args:
+        transformer (pyproj.Transformer): The exact transformer to sample.
+
+        x_values (numpy.ndarray): The input x values.
+
+        y_values (numpy.ndarray): The input y values.
+
+        tolerance (float): The max allowed error, in output units, at sample 
+        points of each accepted cell.
+
+    Optional Args:
+        out (tuple): A pair of float64 numpy arrays to write the output values
+        into. Allocated if not given.
+
+        min_depth (int): The number of times cells are subdivided before any
+        are accepted, so coarse cells can't alias the sample points.
+
+        max_depth (int): The max number of times cells are subdivided.
+
+        min_points (int): Inputs with fewer vertices are transformed exactly.
+
+    Returns:
+        out_x (numpy.ndarray): The transformed x values.
+
+        out_y (numpy.ndarray): The transformed y values.
+    """
+    x_values = np.asarray(x_values, dtype=np.float64)
+    y_values = np.asarray(y_values, dtype=np.float64)
+    if out is None:
+        out = (np.empty(len(x_values), dtype=np.float64), np.empty(len(x_values), dtype=np.float64))
+    out_x, out_y = out
+
+    ## Interpolation only pays off for large inputs, & costlier transforms
+    if len(x_values) < min_points or isinstance(transformer, SphericalMercatorTransformer):
+        return transform_values(transformer, x_values, y_values, out)
+
+    ## Invalid inputs are left to the exact transform's handling
+    invalid = invalid_mask(x_values, y_values)
+    pending = np.flatnonzero(~invalid)
+    if len(pending) < len(x_values):
+        out_x[invalid], out_y[invalid] = transformer.transform(x_values[invalid], y_values[invalid])
+
+    if not len(pending):
+        return out_x, out_y
+
+    ## Normalize vertices to the unit square of their extent
+    unit_x, unit_y = x_values[pending], y_values[pending]
+    min_x, max_x = unit_x.min(), unit_x.max()
+    min_y, max_y = unit_y.min(), unit_y.max()
+    unit_x -= min_x
+    unit_x *= 1 / max(max_x - min_x, 1e-12)
+    unit_y -= min_y
+    unit_y *= 1 / max(max_y - min_y, 1e-12)
+    width, height = max(max_x - min_x, 1e-12), max(max_y - min_y, 1e-12)
+
+    ## Count vertices in each cell of the finest grid
+    max_cells = 2 ** max_depth
+    fine_keys = np.minimum((unit_y * max_cells).astype(np.int64), max_cells - 1)
+    fine_keys *= max_cells
+    fine_keys += np.minimum((unit_x * max_cells).astype(np.int64), max_cells - 1)
+    remaining = np.bincount(fine_keys, minlength=max_cells ** 2).reshape(max_cells, max_cells)
+
+    ## Sample offsets within a cell: 4 corners, then the test points
+    sample_u = np.array([0, 1, 0, 1, 0.5, 0.5, 0.5, 0.0, 1.0, 0.25, 0.75, 0.25, 0.75])
+    sample_v = np.array([0, 0, 1, 1, 0.5, 0.0, 1.0, 0.5, 0.5, 0.25, 0.25, 0.75, 0.75])
+    test_u, test_v = sample_u[4:], sample_v[4:]
+    weights = np.stack([(1 - test_u) * (1 - test_v), test_u * (1 - test_v), (1 - test_u) * test_v, test_u * test_v])
+
+    ## Index of the accepted cell covering each fine cell, & the bilinear 
+    ## coefficients of each accepted cell, over unit coordinates
+    leaf = np.full((max_cells, max_cells), -1, dtype=np.int64)
+    coefficients = ([], [])
+    leaf_count = 0
+
+    ## Refine the occupied cells not yet accepted, level by level
+    for depth in range(min_depth, max_depth + 1):
+        cells_per_side = 2 ** depth
+        block = max_cells // cells_per_side
+        occupied = remaining.reshape(cells_per_side, block, cells_per_side, block).sum(axis=(1, 3))
+        cells = np.flatnonzero(occupied)
+
+        ## Stop when sampling cells costs as much as transforming vertices
+        if not len(cells) or len(cells) * len(sample_u) > occupied.sum():
+            break
+
+        ## Exactly transform the sample points of every occupied cell
+        cell_x, cell_y = cells % cells_per_side, cells // cells_per_side
+        sample_x = min_x + (cell_x[:, None] + sample_u) * (width / cells_per_side)
+        sample_y = min_y + (cell_y[:, None] + sample_v) * (height / cells_per_side)
+        exact_x, exact_y = transformer.transform(sample_x.ravel(), sample_y.ravel())
+        exact_x = np.asarray(exact_x).reshape(sample_x.shape)
+        exact_y = np.asarray(exact_y).reshape(sample_y.shape)
+
+        ## Compare interpolated & exact values at the test points
+        error = np.hypot(exact_x[:, :4] @ weights - exact_x[:, 4:], exact_y[:, :4] @ weights - exact_y[:, 4:])
+        with np.errstate(invalid='ignore'):
+            accepted = np.max(error, axis=1) <= tolerance
+        if not accepted.any():
+            continue
+        cell_x, cell_y = cell_x[accepted], cell_y[accepted]
+
+        ## Expand bilinear interpolation of the corners, from cell coordinates
+        ## (unit * cells_per_side - cell) into unit coordinates
+        for exact, coefficient in ((exact_x, coefficients[0]), (exact_y, coefficients[1])):
+            corner = exact[accepted, :4]
+            dx = corner[:, 1] - corner[:, 0]
+            dy = corner[:, 2] - corner[:, 0]
+            dxy = corner[:, 3] - corner[:, 2] - corner[:, 1] + corner[:, 0]
+            coefficient.append(np.stack([
+                corner[:, 0] - dx * cell_x - dy * cell_y + dxy * cell_x * cell_y,
+                (dx - dxy * cell_y) * cells_per_side,
+                (dy - dxy * cell_x) * cells_per_side,
+                dxy * cells_per_side ** 2,
+            ], axis=1))
+
+        ## Point the fine cells of each accepted cell at its coefficients
+        level_leaf = np.full((cells_per_side, cells_per_side), -1, dtype=np.int64)
+        level_leaf[cell_y, cell_x] = np.arange(leaf_count, leaf_count + len(cell_x))
+        level_leaf = np.repeat(np.repeat(level_leaf, block, axis=0), block, axis=1)
+        covered = level_leaf >= 0
+        leaf[covered] = level_leaf[covered]
+        remaining[covered] = 0
+        leaf_count += len(cell_x)
+
+    ## Interpolate vertices within accepted cells
+    vertex_leaf = leaf.ravel()[fine_keys]
+    approximated = vertex_leaf >= 0
+    if leaf_count:
+        ## Skip compacting & scattering when every vertex was approximated
+        if approximated.all():
+            index = pending if len(pending) < len(x_values) else slice(None)
+        else:
+            vertex_leaf = vertex_leaf[approximated]
+            unit_x, unit_y = unit_x[approximated], unit_y[approximated]
+            index = pending[approximated]
+
+        for coefficient, out_values in zip(coefficients, out):
+            a, b, c, d = np.ascontiguousarray(np.concatenate(coefficient).T)
+            values = np.take(d, vertex_leaf)
+            values *= unit_y
+            values += np.take(b, vertex_leaf)
+            values *= unit_x
+            values += np.take(a, vertex_leaf)
+            unit_c = np.take(c, vertex_leaf)
+            unit_c *= unit_y
+            values += unit_c
+            out_values[index] = values
+
+    ## Exactly transform whatever could not be approximated
+    pending = pending[~approximated]
+    if len(pending):
+        out_x[pending], out_y[pending] = transformer.transform(x_values[pending], y_values[pending])
+
+    return out_x, out_y
+
+
+def invalid_mask(x_values, y_values):
+    """
+    Returns a mask of vertices with an infinite or nan coordinate.
+
+    Args:
+        x_values (numpy.ndarray): The x values to check.
+
+        y_values (numpy.ndarray): The y values to check.
+
+    Returns:
+        mask (numpy.ndarray): A boolean array, true where a vertex is invalid.
+    """
+    mask = ~np.isfinite(x_values)
+    mask |= ~np.isfinite(y_values)
+    return mask
+
+def fill_invalid(x_values, y_values, invalid=None):
+    """
+    Replaces invalid vertices with the last valid vertex, in place.
+
+    Forward-fills every vertex with an infinite or nan coordinate with the
+    last valid vertex before it, to prevent tearing during rendering. Invalid
+    vertices at the start of the data are filled with the first valid vertex.
+    Runs in linear time, regardless of how long runs of invalid vertices are.
+
+    Args:
+        x_values (numpy.ndarray): The x values to fill.
+
+        y_values (numpy.ndarray): The y values to fill.
+
+    Optional Args:
+        invalid (numpy.ndarray): A precomputed invalid_mask of the values.
+
+    Returns:
+        None
+    """
+    if invalid is None:
+        invalid = invalid_mask(x_values, y_values)
+
+    ## Nothing to do if all or no vertices are valid
+    if not invalid.any() or invalid.all():
+        return
+
+    ## Find the index of the last valid vertex at or before each vertex
+    source = np.arange(len(invalid))
+    source[invalid] = 0
+    np.maximum.accumulate(source, out=source)
+
+    ## Leading invalid vertices take the first valid vertex
+    first_valid = np.argmin(invalid)
+    source[:first_valid] = first_valid
+
+    ## Only copy into the invalid positions
+    x_values[invalid] = x_values[source[invalid]]
+    y_values[invalid] = y_values[source[invalid]]
+
+def clamp_invalid(transformer, in_x, in_y, out_x, out_y, bounds):
+    """
+    Clamps invalid vertices to the CRS bounds and reprojects them, in place.
+
+    Vertices that failed to transform are clamped to the given bounds in the
+    input coordinates, and only those vertices are transformed again. Any
+    vertices still invalid afterwards are forward-filled.
+
+    Args:
+        transformer (pyproj.Transformer): The transformer used for the values.
+
+        in_x (numpy.ndarray): The input x values that were transformed.
+
+        in_y (numpy.ndarray): The input y values that were transformed.
+
+        out_x (numpy.ndarray): The transformed x values to fix.
+
+        out_y (numpy.ndarray): The transformed y values to fix.
+
+        bounds (tuple | None): The valid (min_x, min_y, max_x, max_y) of the
+        input coordinates. If None, vertices are only forward-filled. If 
+        min_x is greater than max_x, the bounds are longitudes crossing the
+        antimeridian, and x values are clamped to the nearer edge.
+
+    Returns:
+        None
+    """
+    invalid = invalid_mask(out_x, out_y)
+    if not invalid.any():
+        return
+
+    if bounds is not None:
+        min_x, min_y, max_x, max_y = bounds
+
+        ## Clamp input values of invalid vertices, and transform just those
+        clamped_x = np.broadcast_to(in_x, invalid.shape)[invalid]
+        if min_x > max_x:
+            clamped_x = _clamp_longitude(clamped_x, min_x, max_x)
+        else:
+            clamped_x = np.clip(clamped_x, min_x, max_x)
+        clamped_y = np.clip(np.broadcast_to(in_y, invalid.shape)[invalid], min_y, max_y)
+        out_x[invalid], out_y[invalid] = transformer.transform(clamped_x, clamped_y)
+        invalid = invalid_mask(out_x, out_y)
+
+    fill_invalid(out_x, out_y, invalid)
+
+def _clamp_longitude(lon, west, east):
+    """ 
+    Clamps longitudes to bounds crossing the antimeridian, where west > east.
+    Longitudes are unwrapped to [west, west + 360), so the bounds span 
+    [west, east + 360], and those outside move to the nearer edge.
+    """
+    east += 360
+    lon = west + np.mod(lon - west, 360)
+    outside = lon > east
+    nearer_west = outside & (lon - east > west + 360 - lon)
+    lon = np.where(outside, east, lon)
+    lon[nearer_west] = west
+    _wrap_longitude(lon)
+    return lon
+
+def remove_invalid(x_values, y_values, part_offsets, geom_offsets=None, split=False):
+    """
+    Removes invalid vertices from a set of geometries.
+
+    Removes every vertex with an infinite or nan coordinate. Geometries are
+    described by offset arrays: part i spans vertices
+    [part_offsets[i], part_offsets[i+1]), and geometry j spans parts
+    [geom_offsets[j], geom_offsets[j+1]). If split is true, each run of valid
+    vertices in a part becomes its own part, so no edge is drawn across the
+    removed vertices. Runs in linear time.
+
+    Args:
+        x_values (numpy.ndarray): The x values of all vertices.
+
+        y_values (numpy.ndarray): The y values of all vertices.
+
+        part_offsets (numpy.ndarray): The vertex offsets of each part, with a
+        final entry equal to the number of vertices.
+
+    Optional Args:
+        geom_offsets (numpy.ndarray): The part offsets of each geometry, with
+        a final entry equal to the number of parts. Required to keep parts
+        grouped when splitting.
+
+        split (bool): Whether to split parts at removed vertices. Default is
+        False, which joins the remaining vertices of each part.
+
+    Returns:
+        x_values (numpy.ndarray): The remaining x values.
+
+        y_values (numpy.ndarray): The remaining y values.
+
+        part_offsets (numpy.ndarray): The new vertex offsets of each part.
+
+        geom_offsets (numpy.ndarray | None): The new part offsets of each
+        geometry.
+    """
+    part_offsets = np.asarray(part_offsets, dtype=np.int64)
+    valid = ~invalid_mask(x_values, y_values)
+
+    ## Return data untouched if there is nothing to remove
+    if valid.all():
+        return x_values, y_values, part_offsets, geom_offsets
+
+    ## Position of each vertex in the compacted data
+    position = np.zeros(len(valid) + 1, dtype=np.int64)
+    np.cumsum(valid, out=position[1:])
+
+    if not split:
+        return x_values[valid], y_values[valid], position[part_offsets], geom_offsets
+
+    ## A new part starts at every valid vertex which begins a part, or which
+    ## follows an invalid vertex
+    is_start = valid.copy()
+    is_start[1:] &= ~valid[:-1]
+    part_starts = part_offsets[:-1][part_offsets[:-1] < len(valid)]
+    is_start[part_starts] = valid[part_starts]
+    start_index = np.flatnonzero(is_start)
+
+    new_part_offsets = np.append(position[start_index], position[-1])
+
+    if geom_offsets is not None:
+        ## Find the geometry that owns the old part of each new part
+        old_part = np.searchsorted(part_offsets, start_index, side='right') - 1
+        part_owner = np.searchsorted(geom_offsets, old_part, side='right') - 1
+        geom_count = len(geom_offsets) - 1
+        geom_offsets = np.searchsorted(part_owner, np.arange(geom_count + 1), side='left')
+
+    return x_values[valid], y_values[valid], new_part_offsets, geom_offsets
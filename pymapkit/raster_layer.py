@@ -7,6 +7,7 @@ import tempfile
 import gdal
 import pyproj
 from .base_layer import BaseLayer
+from .projection import get_transformer
 
 
 class RasterLayer(BaseLayer):
@@ -169,10 +170,9 @@ class RasterLayer(BaseLayer):
         raster_crs = pyproj.crs.CRS(self.gdal_raster.GetProjection())
 
         ##
-        proj_x_vals, proj_y_vals = pyproj.transform(
-            raster_crs, self.map.projected_crs, 
-            (raster_x_min, raster_x_max), (raster_y_min, raster_y_max),
-            always_xy=True
+        transformer = get_transformer(raster_crs, self.map.projected_crs)
+        proj_x_vals, proj_y_vals = transformer.transform(
+            (raster_x_min, raster_x_max), (raster_y_min, raster_y_max)
         )
         
         ## Unpack 
@@ -193,7 +193,7 @@ class RasterLayer(BaseLayer):
         """
         self.image_cache = None
 
-    def render(self, renderer, canvas):
+    def render(self, renderer, canvas, viewport=None):
         """
         Renders the data onto the given canvas, using the given renderer.
 
@@ -202,6 +202,10 @@ class RasterLayer(BaseLayer):
             data.
 
             canvas (BaseCanvas): The canvas object to render the data onto.
+
+        Optional Args:
+            viewport (Viewport): The snapshot of the map view to draw. Taken 
+            from the map if not given.
         
         Returns:
             None
@@ -209,16 +213,19 @@ class RasterLayer(BaseLayer):
         ## Update Status
         self.status = 'rendering'
 
+        if viewport is None:
+            viewport = self.map.get_viewport()
+
         ## Cache image if required
         if self.image_cache == None:
             self.image_cache = renderer.cache_image(self.image_path)
 
         ## Get pixel location
-        pix_x, pix_y = self.map.proj2pix(self.proj_x, self.proj_y)
+        pix_x, pix_y = viewport.proj2pix(self.proj_x, self.proj_y)
 
         ## Calculate scale 
-        scale_x = abs( self.scale_x / self.map._proj_scale )
-        scale_y = abs( self.scale_y / self.map._proj_scale )
+        scale_x = abs( self.scale_x / viewport.proj_scale )
+        scale_y = abs( self.scale_y / viewport.proj_scale )
         
         ## Draw image onto canvas
         renderer.draw_image(canvas, self.image_cache, pix_x, pix_y, scale_x, scale_y, opacity=self.alpha)
@@ -0,0 +1,169 @@
+"""
+Project: PyMapKit
+File: simplify.py
+Title: Multi-resolution Line Simplification
+Function: Ranks vertices by the Douglas-Peucker tolerance that would remove
+    them, for all parts at once, so simplified geometry at any tolerance is a
+    single threshold away.
+Author: Ben Knisley [benknisley@gmail.com]
+Created: 16 October, 2026
+"""
+import numpy as np
+from .hit_testing import expand_ranges
+
+
+def vertex_importance(x_values, y_values, part_offsets, keep_depth=0):
+    """
+    Returns the Douglas-Peucker importance of every vertex.
+
+    Douglas-Peucker keeps the ends of a part, then recursively keeps the
+    vertex farthest from the segment between the kept vertices on either
+    side, while it is farther than the tolerance. The importance of a vertex
+    is the distance it was kept by, so the vertices kept at a tolerance are
+    exactly those with importance above the tolerance.
+
+    Every part is simplified at once, one level of recursion at a time, with
+    the farthest vertex of every open span found in one vectorized pass.
+    Importance never exceeds that of the vertex that split its span, so
+    thresholds always give the same vertices as running Douglas-Peucker.
+
+    Args:
+        x_values (numpy.ndarray): The x values of all vertices.
+
+        y_values (numpy.ndarray): The y values of all vertices.
+
+        part_offsets (numpy.ndarray): The first vertex of each part, and the
+        end of the last part.
+
+    Optional Args:
+        keep_depth (int): The number of levels of recursion always kept, e.g.
+        2 so polygon rings never collapse below a triangle. Defaults to 0.
+
+    Returns:
+        importance (numpy.ndarray): The importance of each vertex. Part ends,
+        and vertices that failed to project, are inf, & are always kept.
+    """
+    importance = np.zeros(len(x_values))
+    part_offsets = np.asarray(part_offsets, dtype=np.int64)
+    starts, ends = part_offsets[:-1], part_offsets[1:] - 1
+
+    ## Keep the ends of every part, & vertices that are nan
+    filled = ends >= starts
+    importance[starts[filled]] = np.inf
+    importance[ends[filled]] = np.inf
+    importance[~(np.isfinite(x_values) & np.isfinite(y_values))] = np.inf
+
+    ## Spans between kept vertices, & the importance of the vertex that
+    ## split each one
+    span_starts, span_ends = starts[filled], ends[filled]
+    span_limits = np.full(len(span_starts), np.inf)
+
+    depth = 0
+    while len(span_starts):
+        ## Only spans with vertices between their ends can be split
+        open_spans = span_ends - span_starts > 1
+        span_starts, span_ends = span_starts[open_spans], span_ends[open_spans]
+        span_limits = span_limits[open_spans]
+        if not len(span_starts):
+            break
+
+        ## Distance of each inner vertex to the segment between its span's ends
+        span_index, vertex = expand_ranges(span_starts + 1, span_ends)
+        distances = _segment_distances(x_values[vertex], y_values[vertex],
+            x_values[span_starts][span_index], y_values[span_starts][span_index],
+            x_values[span_ends][span_index], y_values[span_ends][span_index])
+
+        ## Find the first farthest vertex of each span
+        first = np.cumsum(span_ends - span_starts - 1) - (span_ends - span_starts - 1)
+        farthest = np.maximum.reduceat(distances, first)
+        is_farthest = np.flatnonzero(distances == farthest[span_index])
+        _, firsts = np.unique(span_index[is_farthest], return_index=True)
+        split = vertex[is_farthest[firsts]]
+
+        split_importance = np.minimum(farthest, span_limits)
+        if depth < keep_depth:
+            split_importance[:] = np.inf
+        importance[split] = np.maximum(importance[split], split_importance)
+
+        ## Split each span in two at its farthest vertex
+        span_starts = np.concatenate((span_starts, split))
+        span_ends = np.concatenate((split, span_ends))
+        span_limits = np.concatenate((split_importance, split_importance))
+        depth += 1
+
+    return importance
+
+
+def _segment_distances(px, py, x1, y1, x2, y2):
+    """
+    Returns the distance from each point to its segment, or to its first end
+    if the segment has no length. Distances involving nan are inf.
+    """
+    dx, dy = x2 - x1, y2 - y1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = ((px - x1) * dx + (py - y1) * dy) / (dx * dx + dy * dy)
+    t = np.clip(np.nan_to_num(t, nan=0.0), 0.0, 1.0)
+    distances = np.hypot(px - (x1 + t * dx), py - (y1 + t * dy))
+    distances[np.isnan(distances)] = np.inf
+    return distances
+
+
+def simplified_offsets(keep, part_offsets):
+    """
+    Returns the part offsets of the vertices left by a keep mask.
+
+    Args:
+        keep (numpy.ndarray): True for each vertex that is kept.
+
+        part_offsets (numpy.ndarray): The first vertex of each part, and the
+        end of the last part, before simplifying.
+
+    Returns:
+        part_offsets (numpy.ndarray): The first kept vertex of each part, and
+        the end of the last part, in the kept vertices.
+    """
+    kept_before = np.zeros(len(keep) + 1, dtype=np.int64)
+    np.cumsum(keep, out=kept_before[1:])
+    return kept_before[part_offsets]
+
+
+def pixel_decimate(pix_x, pix_y, part_offsets, min_count=1):
+    """
+    Drops vertices that round to the same pixel as the vertex before them.
+
+    The first vertex of each part is always kept, and vertices that are nan
+    are never dropped. Parts left with fewer than min_count vertices, like
+    lines or rings that fit in a pixel, are dropped whole.
+
+    Args:
+        pix_x (numpy.ndarray): The pixel x values of all vertices.
+
+        pix_y (numpy.ndarray): The pixel y values of all vertices.
+
+        part_offsets (numpy.ndarray): The first vertex of each part, and the
+        end of the last part.
+
+    Optional Args:
+        min_count (int): The fewest vertices a part can keep. Defaults to 1.
+
+    Returns:
+        keep (numpy.ndarray): True for each vertex that is kept.
+
+        part_counts (numpy.ndarray): The number of kept vertices of each part,
+        0 for dropped parts.
+    """
+    round_x, round_y = np.rint(pix_x), np.rint(pix_y)
+
+    ## Keep vertices on a different pixel than the one before, & part starts
+    keep = np.ones(len(pix_x), dtype=bool)
+    keep[1:] = (round_x[1:] != round_x[:-1]) | (round_y[1:] != round_y[:-1])
+    keep[part_offsets[:-1][part_offsets[:-1] < len(keep)]] = True
+
+    ## Drop parts with too few kept vertices
+    part_counts = np.diff(simplified_offsets(keep, part_offsets))
+    if min_count > 1:
+        dropped = (part_counts < min_count) & (part_counts > 0)
+        if dropped.any():
+            keep &= ~np.repeat(dropped, np.diff(part_offsets))
+            part_counts[dropped] = 0
+    return keep, part_counts
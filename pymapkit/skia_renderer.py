@@ -7,6 +7,7 @@ Author: Ben Knisley [benknisley@gmail.com]
 Created: 5 February, 2021
 """
 import functools
+import numpy as np
 import skia
 from .base_renderer import BaseRenderer
 
@@ -175,9 +176,9 @@ class SkiaRenderer(BaseRenderer):
 
             structure (List): A list holding the structure of the geometry. 
 
-            x_values (List): A List holding the pixel x values.
+            x_values (List | numpy.ndarray): The pixel x values.
             
-            y_values (List): A List holding the pixel y values.
+            y_values (List | numpy.ndarray): The pixel y values.
 
             style (vector_layer.FeatureStyle): Object storing style infomation.
         
@@ -185,6 +186,9 @@ class SkiaRenderer(BaseRenderer):
             None
         """
 
+        ## Iterate plain python values, which is far faster than numpy scalars
+        x_values, y_values = as_value_lists(x_values, y_values)
+
         ## Create a point list
         point_list = []
 
@@ -227,9 +231,9 @@ class SkiaRenderer(BaseRenderer):
 
             structure (List): A list holding the structure of the geometry. 
 
-            x_values (List): A List holding the pixel x values.
+            x_values (List | numpy.ndarray): The pixel x values.
             
-            y_values (List): A List holding the pixel y values.
+            y_values (List | numpy.ndarray): The pixel y values.
 
             style (vector_layer.FeatureStyle): Object storing style infomation.
         
@@ -237,6 +241,9 @@ class SkiaRenderer(BaseRenderer):
             None
         """
 
+        ## Iterate plain python values, which is far faster than numpy scalars
+        x_values, y_values = as_value_lists(x_values, y_values)
+
         ## Create skia path object
         path = skia.Path()
 
@@ -284,9 +291,9 @@ class SkiaRenderer(BaseRenderer):
 
             structure (List): A list holding the structure of the geometry. 
 
-            x_values (List): A List holding the pixel x values.
+            x_values (List | numpy.ndarray): The pixel x values.
             
-            y_values (List): A List holding the pixel y values.
+            y_values (List | numpy.ndarray): The pixel y values.
 
             style (vector_layer.FeatureStyle): Object storing style infomation.
         
@@ -294,6 +301,9 @@ class SkiaRenderer(BaseRenderer):
             None
         """
 
+        ## Iterate plain python values, which is far faster than numpy scalars
+        x_values, y_values = as_value_lists(x_values, y_values)
+
         ## Create skia path object
         path = skia.Path()
 
@@ -414,6 +424,136 @@ class SkiaRenderer(BaseRenderer):
     def draw_text(self, canvas, text, text_style):
         pass
 
+    """ Offscreen surfaces """
+
+    supports_offscreen = True
+
+    def new_offscreen(self, width, height):
+        """
+        Creates and returns a new, transparent Skia surface.
+
+        Unlike new_canvas, the surface is not stored as `self.surface`, so 
+        offscreen surfaces can be created while a map is being drawn.
+
+        Args:
+            width (int): The width in pixels of the new Skia surface.
+
+            height (int): The height in pixels of the new Skia surface.
+
+        Returns:
+            offscreen (skia.Surface): The new Skia surface.
+        """
+        offscreen = skia.Surface(width, height)
+        offscreen.getCanvas().clear(skia.ColorTRANSPARENT)
+        return offscreen
+
+    def offscreen_canvas(self, offscreen):
+        """
+        Returns the canvas of a Skia surface.
+
+        Args:
+            offscreen (skia.Surface): A Skia surface from new_offscreen.
+
+        Returns:
+            canvas (skia.Canvas): The canvas that draws onto the surface.
+        """
+        return offscreen.getCanvas()
+
+    def draw_offscreen(self, canvas, offscreen, x=0, y=0, opacity=1):
+        """
+        Composites a Skia surface onto a canvas.
+
+        Args:
+            canvas (skia.Canvas): The canvas to draw on.
+
+            offscreen (skia.Surface): The surface to draw.
+
+        Optional Args:
+            x (int): The pixel x location of the surface's top left corner.
+
+            y (int): The pixel y location of the surface's top left corner.
+
+            opacity (float): Value 0-1 indicating opacity of the surface.
+
+        Returns:
+            None
+        """
+        paint = skia.Paint(Alphaf=opacity)
+        canvas.drawImage(offscreen.makeImageSnapshot(), x, y, paint=paint)
+
+    def push_clip(self, canvas, x, y, width, height):
+        """
+        Limits drawing on a canvas to a pixel rectangle, until pop_clip.
+
+        Args:
+            canvas (skia.Canvas): The canvas to clip.
+
+            x (int): The pixel x location of the rectangle's top left corner.
+
+            y (int): The pixel y location of the rectangle's top left corner.
+
+            width (int): The width in pixels of the rectangle.
+
+            height (int): The height in pixels of the rectangle.
+
+        Returns:
+            None
+        """
+        canvas.save()
+        canvas.clipRect(skia.Rect.MakeXYWH(x, y, width, height))
+
+    def clear_region(self, canvas, x, y, width, height):
+        """
+        Makes a pixel rectangle of a canvas fully transparent.
+
+        Args:
+            canvas (skia.Canvas): The canvas to clear.
+
+            x (int): The pixel x location of the rectangle's top left corner.
+
+            y (int): The pixel y location of the rectangle's top left corner.
+
+            width (int): The width in pixels of the rectangle.
+
+            height (int): The height in pixels of the rectangle.
+
+        Returns:
+            None
+        """
+        canvas.save()
+        canvas.clipRect(skia.Rect.MakeXYWH(x, y, width, height))
+        canvas.clear(skia.ColorTRANSPARENT)
+        canvas.restore()
+
+    def pop_clip(self, canvas):
+        """
+        Removes the clip last added to a canvas by push_clip.
+
+        Args:
+            canvas (skia.Canvas): The canvas to unclip.
+
+        Returns:
+            None
+        """
+        canvas.restore()
+
+
+"""****************************
+****** Helper functions *******
+****************************"""
+
+def as_value_lists(x_values, y_values):
+    """
+    Returns coordinate values as python lists.
+
+    Converts numpy arrays of pixel values into python lists in one pass, lists
+    are returned unchanged.
+    """
+    if isinstance(x_values, np.ndarray):
+        x_values = x_values.tolist()
+        y_values = y_values.tolist()
+    return x_values, y_values
+
 
 """****************************
 ****** Caching functions ******
@@ -0,0 +1,276 @@
+"""
+Project: PyMapKit
+File: spatial_index.py
+Title: Packed R-tree Spatial Index
+Function: Provides a static R-tree of bounding boxes, bulk loaded with the
+    Sort-Tile-Recursive algorithm and packed into numpy arrays.
+Author: Ben Knisley [benknisley@gmail.com]
+Created: 16 October, 2026
+"""
+import heapq
+import math
+import numpy as np
+
+
+class PackedRTree:
+    """
+    A static R-tree of bounding boxes, packed into numpy arrays.
+
+    Boxes are bulk loaded with Sort-Tile-Recursive (STR): sorted into vertical
+    slices by x center, then by y center within each slice, and grouped into
+    full leaf nodes. Each level above groups node_size consecutive nodes of
+    the level below. Nodes are never split or merged, so the tree is built
+    once, in O(n log n), and rebuilt when the boxes change.
+
+    Queries walk the tree a level at a time, testing all candidate nodes of a
+    level with one vectorized comparison, so they cost O(log n + k) array
+    operations for k results.
+    """
+
+    def __init__(self, min_x, min_y, max_x, max_y, node_size=16):
+        """
+        Builds a new PackedRTree from arrays of bounding boxes.
+
+        Boxes with an inverted extent, like the infinite extents given to
+        empty geometries, are left out of the tree, and never match a query.
+
+        Args:
+            min_x (numpy.ndarray): The minimum x value of each box.
+
+            min_y (numpy.ndarray): The minimum y value of each box.
+
+            max_x (numpy.ndarray): The maximum x value of each box.
+
+            max_y (numpy.ndarray): The maximum y value of each box.
+
+        Optional Args:
+            node_size (int): The maximum number of children of each node.
+            Defaults to 16.
+
+        Returns:
+            None
+        """
+        self.node_size = node_size
+        self.count = len(min_x)
+        boxes = np.column_stack((min_x, min_y, max_x, max_y)).astype(float)
+
+        ## Leave out empty boxes, then order the rest into STR tiles, leaves
+        ## are consecutive runs
+        valid = np.flatnonzero((boxes[:, 0] <= boxes[:, 2]) & (boxes[:, 1] <= boxes[:, 3]))
+        self.order = valid[self._str_order(boxes[valid], node_size)]
+
+        ## Levels of node boxes, from the items up to the root
+        self.levels = [boxes[self.order]]
+        while len(self.levels[-1]) > 1:
+            self.levels.append(self._group(self.levels[-1], node_size))
+
+    @staticmethod
+    def _str_order(boxes, node_size):
+        """ Returns the order of boxes sorted into Sort-Tile-Recursive tiles. """
+        count = len(boxes)
+        if count == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        center_x = (boxes[:, 0] + boxes[:, 2]) / 2
+        center_y = (boxes[:, 1] + boxes[:, 3]) / 2
+
+        ## Split into vertical slices of whole leaves, sorted by x
+        leaf_count = math.ceil(count / node_size)
+        slice_size = math.ceil(math.sqrt(leaf_count)) * node_size
+        order = np.argsort(center_x, kind='stable')
+
+        ## Sort each slice by y, by sorting on (slice, y)
+        slices = np.arange(count) // slice_size
+        slice_order = np.lexsort((center_y[order], slices))
+        return order[slice_order]
+
+    @staticmethod
+    def _group(boxes, node_size):
+        """ Returns the boxes of nodes grouping runs of node_size boxes. """
+        starts = np.arange(0, len(boxes), node_size)
+        return np.column_stack((
+            np.minimum.reduceat(boxes[:, 0], starts),
+            np.minimum.reduceat(boxes[:, 1], starts),
+            np.maximum.reduceat(boxes[:, 2], starts),
+            np.maximum.reduceat(boxes[:, 3], starts),
+        ))
+
+    def __len__(self):
+        """ Returns the number of boxes in the index. """
+        return self.count
+
+    def query(self, min_x, min_y, max_x, max_y):
+        """
+        Returns the indices of the boxes intersecting a box.
+
+        Args:
+            min_x (float): The minimum x value of the query box.
+
+            min_y (float): The minimum y value of the query box.
+
+            max_x (float): The maximum x value of the query box.
+
+            max_y (float): The maximum y value of the query box.
+
+        Returns:
+            indices (numpy.ndarray): The indices of the intersecting boxes, in
+            the order they were given to the index.
+        """
+        if len(self.order) == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        node_size = self.node_size
+        children = np.arange(node_size)
+        nodes = np.zeros(1, dtype=np.int64)
+
+        levels = self.levels
+        for depth in range(len(levels) - 1, -1, -1):
+            ## Keep the candidate nodes of the level that intersect the box
+            node_boxes = levels[depth][nodes]
+            hits = ((node_boxes[:, 2] >= min_x) & (node_boxes[:, 0] <= max_x)
+                & (node_boxes[:, 3] >= min_y) & (node_boxes[:, 1] <= max_y))
+            nodes = nodes[hits]
+
+            ## Expand to the children of the hit nodes, on the level below
+            if depth:
+                nodes = (nodes[:, None] * node_size + children).ravel()
+                nodes = nodes[nodes < len(levels[depth-1])]
+
+        return np.sort(self.order[nodes])
+
+    def query_many(self, min_x, min_y, max_x, max_y):
+        """
+        Returns the boxes intersecting each of many query boxes.
+
+        Walks the tree once for all queries, testing (query, node) pairs a 
+        level at a time.
+
+        Args:
+            min_x (numpy.ndarray): The minimum x value of each query box.
+
+            min_y (numpy.ndarray): The minimum y value of each query box.
+
+            max_x (numpy.ndarray): The maximum x value of each query box.
+
+            max_y (numpy.ndarray): The maximum y value of each query box.
+
+        Returns:
+            query_indices (numpy.ndarray): The query of each result, sorted.
+
+            indices (numpy.ndarray): The index of the intersecting box of each
+            result, sorted within each query.
+        """
+        queries = np.column_stack((min_x, min_y, max_x, max_y)).astype(float)
+        if len(self.order) == 0 or len(queries) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        node_size = self.node_size
+        children = np.arange(node_size)
+        pair_queries = np.arange(len(queries))
+        nodes = np.zeros(len(queries), dtype=np.int64)
+
+        levels = self.levels
+        for depth in range(len(levels) - 1, -1, -1):
+            ## Keep the (query, node) pairs that intersect
+            node_boxes, query_boxes = levels[depth][nodes], queries[pair_queries]
+            hits = ((node_boxes[:, 2] >= query_boxes[:, 0]) & (node_boxes[:, 0] <= query_boxes[:, 2])
+                & (node_boxes[:, 3] >= query_boxes[:, 1]) & (node_boxes[:, 1] <= query_boxes[:, 3]))
+            nodes, pair_queries = nodes[hits], pair_queries[hits]
+
+            ## Expand each pair to the children of its node
+            if depth:
+                nodes = (nodes[:, None] * node_size + children).ravel()
+                pair_queries = np.repeat(pair_queries, node_size)
+                valid = nodes < len(levels[depth-1])
+                nodes, pair_queries = nodes[valid], pair_queries[valid]
+
+        indices = self.order[nodes]
+        sort = np.lexsort((indices, pair_queries))
+        return pair_queries[sort], indices[sort]
+
+    def nearest(self, x, y, k=1, max_distance=math.inf, distance_fn=None):
+        """
+        Returns the k boxes nearest a point, with a best-first search.
+
+        Nodes are visited in order of the distance from the point to their 
+        box, which is never more than the distance to anything inside them. 
+        When a leaf is reached, the exact distances of its items are found in
+        one call of distance_fn, so an item is only returned once nothing
+        left to visit can be nearer.
+
+        Args:
+            x (float): The x value of the point.
+
+            y (float): The y value of the point.
+
+        Optional Args:
+            k (int): The number of boxes to return. Defaults to 1.
+
+            max_distance (float): The distance beyond which boxes are not
+            returned. Defaults to inf.
+
+            distance_fn (function): Takes an array of box indices, & returns
+            an array of the exact distances of the point to what the boxes 
+            hold, each at least the distance to the box. Defaults to the 
+            distance to the boxes.
+
+        Returns:
+            indices (numpy.ndarray): The indices of the nearest boxes, nearest
+            first.
+
+            distances (numpy.ndarray): The distance to each box.
+        """
+        if len(self.order) == 0 or k < 1:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+        levels = self.levels
+        node_size = self.node_size
+
+        def box_distances(boxes):
+            """ Returns the distance from the point to each box. """
+            dx = np.maximum(np.maximum(boxes[:, 0] - x, x - boxes[:, 2]), 0)
+            dy = np.maximum(np.maximum(boxes[:, 1] - y, y - boxes[:, 3]), 0)
+            return np.hypot(dx, dy)
+
+        def push_items(positions):
+            """ Adds items, at positions of the item level, with exact distances. """
+            positions = positions[box_distances(levels[0][positions]) <= max_distance]
+            indices = self.order[positions]
+            if distance_fn is None:
+                distances = box_distances(levels[0][positions])
+            else:
+                distances = distance_fn(indices)
+            for index, distance in zip(indices.tolist(), distances.tolist()):
+                if distance <= max_distance:
+                    heapq.heappush(heap, (distance, 0, 0, index))
+
+        ## Entries are (distance, is_node, depth, node or item index). Exact
+        ## item distances sort before node bounds at the same distance
+        heap = []
+        top = len(levels) - 1
+        if top == 0:
+            push_items(np.arange(len(levels[0])))
+        else:
+            heap.append((box_distances(levels[top][:1])[0], 1, top, 0))
+
+        indices, distances = [], []
+        while heap and len(indices) < k:
+            distance, is_node, depth, node = heapq.heappop(heap)
+            if distance > max_distance:
+                break
+            if not is_node:
+                indices.append(node)
+                distances.append(distance)
+                continue
+
+            ## Visit the children of the node
+            children = np.arange(node * node_size, min((node + 1) * node_size, len(levels[depth-1])))
+            if depth == 1:
+                push_items(children)
+            else:
+                child_distances = box_distances(levels[depth-1][children])
+                for child, child_distance in zip(children.tolist(), child_distances.tolist()):
+                    if child_distance <= max_distance:
+                        heapq.heappush(heap, (child_distance, 1, depth - 1, child))
+
+        return np.array(indices, dtype=np.int64), np.array(distances)
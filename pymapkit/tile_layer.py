@@ -23,6 +23,10 @@ def zoom2scale(zoom):
 def scale2zoom(scale):
     return math.log(156543.03392 / scale, 2)
 
+def nearest_zoom(scale):
+    ## Web map tile zoom level nearest the scale
+    return int(round(scale2zoom(scale), 0))
+
 def tile2geo(zoom_lvl, tile_x, tile_y):
     n = 2.0 ** zoom_lvl
     lon_deg = tile_x / n * 360.0 - 180.0
@@ -31,14 +35,17 @@ def tile2geo(zoom_lvl, tile_x, tile_y):
     return (lat_deg, lon_deg)
 
 def geo2tile(lat, lon, scale):
-    zoom_lvl = int(round(math.log(156543.03392 / scale, 2),0))
+    zoom_lvl = nearest_zoom(scale)
+    x_tile, y_tile = geo2tile_at_zoom(lat, lon, zoom_lvl)
+    return x_tile, y_tile, zoom_lvl
 
+def geo2tile_at_zoom(lat, lon, zoom_lvl):
     lat_rad = math.radians(lat)
     n = 2.0 ** zoom_lvl
     x_tile = int((lon + 180.0) / 360.0 * n)
     y_tile = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
 
-    return x_tile, y_tile, zoom_lvl
+    return x_tile, y_tile
 
 class _tile:
     def __init__(self, parent_map, path, zoom_lvl, tile_x, tile_y):
@@ -53,14 +60,19 @@ class _tile:
         self.lat, self.lon = tile2geo(zoom_lvl, self.tile_x, self.tile_y)
         self.proj_x, self.proj_y = parent_map.geo2proj(self.lon, self.lat)
 
-    def draw(self, renderer, cr):
+        ## Get projected extent from the top left & bottom right corners
+        max_lat, min_lon = self.lat, self.lon
+        min_lat, max_lon = tile2geo(zoom_lvl, self.tile_x + 1, self.tile_y + 1)
+        self.extent = (*parent_map.geo2proj(min_lon, min_lat), *parent_map.geo2proj(max_lon, max_lat))
+
+    def draw(self, renderer, cr, viewport):
         if self.image == None:
             self.image = renderer.cache_image(self.path)
 
         ## Get pixel coord of tile
-        pix_x, pix_y = self.parent_map.proj2pix(self.proj_x, self.proj_y)
+        pix_x, pix_y = viewport.proj2pix(self.proj_x, self.proj_y)
 
-        scaling_factor = zoom2scale(self.zoom_lvl) / self.parent_map.get_scale()
+        scaling_factor = zoom2scale(self.zoom_lvl) / viewport.scale
         scaling_factor += (0.005 * (1/scaling_factor))
         
         renderer.draw_image(cr, self.image, pix_x, pix_y, scaling_factor, scaling_factor)
@@ -143,6 +155,11 @@ class TileLayer(BaseLayer):
         new_tile = _tile(self.map, path, zoom_lvl, tile_x, tile_y)
         self.tile_store[(zoom_lvl, tile_x, tile_y)] = new_tile
 
+        ## Redraw just the area of the layer covered by the new tile
+        self.mark_dirty()
+        if self.map is not None:
+            self.map.invalidate(new_tile.extent, self)
+
     def download_tile(self, tile_data):
         zoom_lvl, tile_x, tile_y = tile_data
         
@@ -166,19 +183,24 @@ class TileLayer(BaseLayer):
     def need_redrawn(self):
         return len(self.requested_tiles) != len(self.tile_store)
 
-    def render(self, renderer, cr):
+    def render(self, renderer, cr, viewport=None):
         """ """
-        ##
-        init_tile_x, init_tile_y, zoom_lvl = geo2tile(*self.map.get_location(), self.map.get_scale())
+        ## Use a snapshot of the view, so it is consistent for every tile
+        if viewport is None:
+            viewport = self.map.get_viewport()
+
+        ## Use the tile zoom level found once for the snapshot
+        zoom_lvl = viewport.tile_zoom
+        init_tile_x, init_tile_y = geo2tile_at_zoom(*viewport.location, zoom_lvl)
         
         #!! Simplify this
         ## Get number of tiles to cover width and height of canvas
-        sf = zoom2scale(zoom_lvl) / self.map.get_scale()
+        sf = zoom2scale(zoom_lvl) / viewport.scale
         sf += (0.005 * (1/sf))
         sf = 256 * sf
 
-        tile_x_size = int(self.map.width / sf) + 2
-        tile_y_size = int(self.map.height / sf) + 2
+        tile_x_size = int(viewport.width / sf) + 2
+        tile_y_size = int(viewport.height / sf) + 2
 
         ## Get tile at map location
 
@@ -199,7 +221,8 @@ class TileLayer(BaseLayer):
 
                 tile = self.fetch_tile(zoom_lvl, tile_x, tile_y, blocking=self.blocking)
 
-                if isinstance(tile, _tile):
-                    tile.draw(renderer, cr)
+                ## Only draw tiles in the drawn region of the canvas
+                if isinstance(tile, _tile) and viewport.intersects(*tile.extent):
+                    tile.draw(renderer, cr, viewport)
                 else:
                     pass
\ No newline at end of file
@@ -7,12 +7,35 @@ Date: 7, November 2020
 """
 import os
 import math
-import bisect
+import threading
+import weakref
+from collections import OrderedDict
 from operator import methodcaller
+import numpy as np
 import pyproj
 import ogr
 from .base_layer import BaseLayer
-from .base_style import BaseStyle
+from .base_style import BaseStyle, CompiledStyle
+from .buffers import BufferPool
+from .attributes import AttributeTable, AttributeRow, OPERATORS
+from .coordinates import CoordinateStore
+from . import hit_testing
+from .spatial_index import PackedRTree
+from .simplify import vertex_importance, simplified_offsets, pixel_decimate
+from .projection import invalid_mask, remove_invalid, TransformCancelled
+
+## Distance in pixels a point can be from a geometry and still hit it, by 
+## geometry type. Points must be inside polygons
+HIT_TOLERANCES = {'point': 5, 'line': 10, 'polygon': 0}
+
+## Fewest vertices a drawn part can have after dropping vertices on the 
+## same pixel, and the pixel offsets of the dot drawn for features that
+## collapse into one pixel, by geometry type
+MIN_PART_COUNTS = {'point': 1, 'line': 2, 'polygon': 3}
+DOT_SHAPES = {
+    'line': ([-0.5, 0.5], [0.0, 0.0]),
+    'polygon': ([-0.5, 0.5, 0.5, -0.5, -0.5], [-0.5, -0.5, 0.5, 0.5, -0.5]),
+}
 
 class LayerStyle(BaseStyle):
     def __init__(self, parent_feature):
@@ -26,9 +49,9 @@ class LayerStyle(BaseStyle):
             self.style.set_mode(new_value, domain_name)
             self.style.clear_cache()
             
-            for f in self.features:
-                f.style.set_mode(new_value, domain_name)
-                f.style.clear_cache()
+            for style in self.feature_styles(writable=True):
+                style.set_mode(new_value, domain_name)
+                style.clear_cache()
         
         if domain_name:
             setter_name = 'set_' + domain_name + '_display'
@@ -60,10 +83,10 @@ class LayerStyle(BaseStyle):
 
         ## Define [g][s]et_display templates
         def set_property_template(self, new_value):
-            for f in self.features:
-                if property_name in f.style.managed_properties:
-                    f.style.managed_properties[property_name] = new_value
-                f.style.clear_cache()
+            for style in self.feature_styles(writable=True):
+                if property_name in style.managed_properties:
+                    style.managed_properties[property_name] = new_value
+                style.clear_cache()
 
         ## Link, and bind set_display as a named method of the parent feature
         bound_setter = set_property_template.__get__(self.feature, type(self.feature))
@@ -77,50 +100,36 @@ class LayerStyle(BaseStyle):
         self.feature.__dict__['get_'+property_name] = bound_getter
 
     def clear_cache(self):
-        for f in self.layer:
-            f.style.cached_renderer_fn = None
-
-class FeatureStyle(BaseStyle):
-    def __init__(self, parent_feature):
-        BaseStyle.__init__(self, parent_feature)
-
-    def create_property_etters(self, property_name):
-
-        ## Define [g][s]et_display templates
-        def set_property_template(self, new_value):
-            self.style.managed_properties[property_name] = new_value
-            self.style.clear_cache()
-            ## Put feature to render last
-            self.parent.features.remove(self)
-            self.parent.features.append(self)
-
-
-        ## Link, and bind set_display as a named method of the parent feature
-        bound_setter = set_property_template.__get__(self.feature, type(self.feature))
-        self.feature.__dict__['set_'+property_name] = bound_setter
-
-        def get_property_template(self):
-            return self.style.managed_properties[property_name]
+        ## Clear each feature's cache, which also marks the layer dirty
+        for style in self.layer.feature_styles():
+            style.clear_cache()
+
+class FeatureStyle(CompiledStyle):
+    """ 
+    A compiled style shared by the features of a layer. Created with 
+    FeatureStyle.compile(build_style, geometry_type), styling the layer.
+    """
+    __slots__ = ('users',)
 
-        ## Link, and bind set_display as a named method of the parent feature
-        bound_getter = get_property_template.__get__(self.feature, type(self.feature))
-        self.feature.__dict__['get_'+property_name] = bound_getter
+    def __init__(self, layer, source=None):
+        CompiledStyle.__init__(self, layer, source)
 
+        ## Number of features using the style
+        self.users = 0
 
-        def get_property_template(self):
-            return self.managed_properties[property_name]
+    def clear_cache(self):
+        CompiledStyle.clear_cache(self)
 
-        ## Link, and bind set_display as a named method of the parent feature
-        bound_getter = get_property_template.__get__(self, type(self))
-        self.__dict__['get_'+property_name] = bound_getter
+        ## Style changed, so the layer needs to be redrawn
+        self.feature.mark_dirty()
 
 
 def build_style(style, geo_type):
     """
     Takes a style object and adds domains, modes, and properties to create
     a style object useful for thr given geometry type. Normal expected 
-    usage is for either a FeatureStyle object for feature, or a LayerStyle for
-    layers.
+    usage is for either compiling a FeatureStyle class for features, or a 
+    LayerStyle for layers.
     """
     style.type = geo_type
 
@@ -234,30 +243,42 @@ def build_style(style, geo_type):
 
 class Geometry:
     """
-    A class that abstracts a geometry
+    A class that abstracts a geometry, a view of the parent layer's columnar
+    coordinate store.
     """
-    def __init__(self, parent):
+    def __init__(self, parent, geom_index):
         self.parent = parent
         self.geometry_type = parent.geometry_type
+        self.geom_index = geom_index
 
-        self.skip_draw = False
-        ##
-        self.geom_index = len(parent.geometries)
-
-        self.structure = []
-        self.start_address = len(parent.x_values)
-        self.length = 0
+    @property
+    def skip_draw(self):
+        """ Whether the geometry was outside the view last culled to. """
+        visible = self.parent._visible
+        if visible is None:
+            return False
+        position = np.searchsorted(visible, self.geom_index)
+        return position == len(visible) or visible[position] != self.geom_index
+
+    @property
+    def start_address(self):
+        """ The index of the geometry's first vertex in the layer values. """
+        return self.parent.coordinates.geometry_range(self.geom_index)[0]
+
+    @property
+    def length(self):
+        """ The number of vertices in the geometry. """
+        start, end = self.parent.coordinates.geometry_range(self.geom_index)
+        return end - start
+
+    @property
+    def structure(self):
+        """ A list of the number of vertices in each subgeometry. """
+        return self.parent.coordinates.part_counts(self.geom_index).tolist()
     
     def add_subgeometry(self, x_points, y_points):
-        self.structure.append(len(x_points))
-        self.length += len(x_points)
-        
-        if self == self.parent.geometries[-1]:
-            self.parent.x_values += x_points
-            self.parent.y_values += y_points
-        else:
-            #! CHANGE ADDRESS OF ALL FOLLOWING GEOMS IN PARENT
-            pass
+        self.parent.coordinates.add_part(self.geom_index, x_points, y_points)
+        self.parent.mark_geo_changed()
         
     def get_points(self):
         x_values = self.parent.x_values[self.start_address:self.start_address+self.length]
@@ -293,93 +314,112 @@ class Geometry:
 
     def get_extent(self):
         x_vals, y_vals = self.get_points()
-        return min(x_vals), min(y_vals), max(x_vals), max(y_vals)
+
+        ## Leave out vertices that failed to project
+        if self.geom_index in self.parent.invalid_geometries:
+            valid = ~invalid_mask(x_vals, y_vals)
+            if not valid.any():
+                return math.inf, math.inf, -math.inf, -math.inf
+            x_vals, y_vals = x_vals[valid], y_vals[valid]
+
+        return np.min(x_vals), np.min(y_vals), np.max(x_vals), np.max(y_vals)
 
     def point_within(self, test_x, test_y):
-        if self.geometry_type == 'point':
-            for x_points, y_points in self.get_subgeometries():
-                for point_x, point_y in zip(x_points, y_points):
-                    if(math.isclose(test_x, point_x, abs_tol=self.parent.map._proj_scale*5) and
-                        math.isclose(test_y, point_y, abs_tol=self.parent.map._proj_scale*5)):
-                        return True
-            return False
-        elif self.geometry_type == 'line':
-            ## Loop through each subgeom
-            for x_points, y_points in self.get_subgeometries(): 
-                ## Set first set of compair points to first point of subgeom
-                x1, y1 = x_points[0], y_points[0]
-                ## Compair each set of points to the last
-                for x2, y2 in zip(x_points, y_points): 
-                    ## Only compair if points are different
-                    if (x1,y1) != (x2,y2):
-                        ## Find distance between compare points (ab)
-                        base = (( (x2-x1)**2 + (y2-y1)**2 )**0.5)
-
-                        ## Find distances from test point to both compair points 
-                        ac = (( (x1-test_x)**2 + (y1-test_y)**2 )**0.5)
-                        bc = (( (x2-test_x)**2 + (y2-test_y)**2 )**0.5)
-
-                        ## Only proceed if both ac & bc are smaller than base 
-                        if (ac < base) and (bc < base):
-                            ## Find area of triangle
-                            area = ( x1*(y2-test_y) + x2*(test_y-y1) + test_x*(y1-y2) )/2
-
-                            ## Find distance of test point from base line (height of triangle)
-                            dist = (2*area) / base
-                            ## Convert to pixel distance
-                            pix_dist = dist / self.parent.map._proj_scale
-
-                            ## If distance is less than 10 pixels, then point is near enough
-                            if pix_dist < 10:
-                                return True
-                    ## Increment last point
-                    x1,y1 = x2,y2 
-            return False
-        else: ## geom_type == polygon
-            ## Loop through each subgeom
-            for x_points, y_points in self.get_subgeometries():
-                inside = False
-                n = len(x_points)
-                p1x,p1y = x_points[0], y_points[0]
-                for i in range(n+1):
-                    p2x, p2y = x_points[i % n], y_points[i % n]
-                    if test_y > min(p1y,p2y):
-                        if test_y <= max(p1y,p2y):
-                            if test_x <= max(p1x,p2x):
-                                if p1y != p2y:
-                                    xints = (test_y-p1y)*(p2x-p1x)/(p2y-p1y)+p1x
-                                if p1x == p2x or test_x <= xints:
-                                    inside = not inside
-                    p1x,p1y = p2x,p2y
-                if inside:
-                    return True
-            return False
+        ## Test the single point with the layer's vectorized hit test
+        tolerance = HIT_TOLERANCES[self.geometry_type] * self.parent.map._proj_scale
+        hits = self.parent.hit_test(np.array([test_x], dtype=float), np.array([test_y], dtype=float), 
+            np.array([self.geom_index]), tolerance)
+        return bool(hits[0])
 
 class Feature:
     """
-    A class representing a single feature
+    A class representing a single feature.
+
+    Features are lightweight views of a row of the parent layer, created when
+    accessed. Attributes are held in the layer's columns. Styles are shared
+    flyweights: a feature is drawn with the layer's default feature style, or
+    a style shared with features restyled alongside it, and only gets a 
+    private copy when one of its style setters is used.
     """
-    def __init__(self, parent, geometry):
+    def __init__(self, parent, index):
         self.parent = parent
-        self.geometry = geometry
-
+        self.index = index
+
+    def __getattr__(self, name):
+        ## Style getters read whichever style the feature currently uses
+        if name.startswith('get_') and callable(getattr(self.style, name, None)):
+            return lambda: getattr(self.style, name)()
+
+        ## Style setters give the feature a private copy of its style first
+        if name.startswith('set_'):
+            setter = self._style_setter(name[4:])
+            if setter:
+                return setter
+        raise AttributeError(f"'Feature' object has no attribute '{name}'")
+
+    def _style_setter(self, name):
+        """ Returns a copy on write setter for a style mode or property. """
+        style = self.style
+
+        ## Display mode setters, e.g. set_fill_display
+        if name.endswith('display'):
+            domain = name[:-len('_display')] if name != 'display' else None
+            if domain in style.domains:
+                def set_display(new_value):
+                    style = self.parent._writable_style(self.index)
+                    style.set_mode(new_value, domain)
+                    style.clear_cache()
+                return set_display
+
+        if name in style.managed_properties:
+            def set_property(new_value):
+                style = self.parent._writable_style(self.index)
+                style.managed_properties[name] = new_value
+                style.clear_cache()
+                ## Put feature to render last
+                self.parent._raise_feature(self.index)
+            return set_property
+
+    @property
+    def geometry(self):
+        """ A Geometry view of the feature's coordinates. """
+        return Geometry(self.parent, self.index)
+
+    @property
+    def style(self):
+        """ 
+        The style the feature is drawn with. Shared with other features until
+        the feature's own style is changed, so it should be read, and changed 
+        through the feature's setters.
+        """
+        return self.parent._feature_styles.get(self.index, self.parent._default_style)
 
-        #style_class = {'point': PointStyle, 'line': LineStyle, 'polygon': PolyStyle}
-        #self.style = style_class[geometry.geometry_type](self)
-        self.style = FeatureStyle(self)
-        build_style(self.style, self.parent.geometry_type)
+    @style.setter
+    def style(self, new_style):
+        self.parent._set_feature_style(self.index, new_style)
 
-        #self.style.set_defaults(parent.geometry_type)
+    @property
+    def attributes(self):
+        """ 
+        A dict-like view of the feature's attribute values, backed by the 
+        layer's columns, so values set through it are kept.
+        """
+        return AttributeRow(self.parent._attributes, self.index)
 
-        self.attributes = {}
-        for field in parent.field_names:
-            self.attributes[field] = None
+    @attributes.setter
+    def attributes(self, new_attributes):
+        ## Replace every value, leaving fields not given missing
+        new_attributes = dict(new_attributes)
+        for field in self.parent._attributes.fields:
+            self[field] = new_attributes.pop(field, None)
+        for field, value in new_attributes.items():
+            self[field] = value
 
     def __getitem__(self, field_name):
-        return self.attributes[field_name]
+        return self.parent._attributes.get(self.index, field_name)
 
     def __setitem__(self, field_name, value):
-        self.attributes[field_name] = value
+        self.parent._attributes.set(self.index, field_name, value)
 
     ## 
     def focus(self):
@@ -450,11 +490,35 @@ class FeatureList:
         new_layer = VectorLayer(self.parent.geometry_type, self.parent.field_names)
         for f in self.features:
             new_layer.add(f)
-        
-        new_layer.geo_x_values, new_layer.geo_y_values = self.parent.map.proj2geo(new_layer.x_values, new_layer.y_values)
 
         return new_layer
 
+    def feature_styles(self, writable=False):
+        """ 
+        Returns the distinct styles of the features in the list.
+
+        Optional Args:
+            writable (bool): If True, features sharing a style with features
+            not in the list are given a copy of it first, shared by the 
+            features in the list. Defaults to False.
+
+        Returns:
+            styles (list): The styles.
+        """
+        indices = [f.index for f in self.features]
+        if writable:
+            return self.parent._writable_styles(indices)
+        return [style for style, _ in self.parent._style_groups(indices)]
+
+    def field_values(self, field):
+        """ Returns the values of a field for each feature in the list. """
+        return [f[field] for f in self.features]
+
+    def field_mask(self, field, op, value):
+        """ Returns a boolean array of the features where a field compares true. """
+        compare_fn = OPERATORS[op]
+        return np.array([item is not None and compare_fn(item, value) for item in self.field_values(field)], dtype=bool)
+
     def run_on_all(self, method_name, *args):
         has_return = False
         rtrn_list = []
@@ -469,21 +533,30 @@ class FeatureDict:
     def __init__(self, parent, field):
         self.parent = parent
         self.field = field
-        self.keys = []
-        self.features = []
-    
-        for feature in self.parent.features:
-            self.features.append(feature)
-            self.keys.append(feature[self.field])
 
-    def __getitem__(self, compair):
-        return_features = []
+        ## Features are only looked up once they match
+        self.features = self.parent.features
+        self._keys = None
 
+    @property
+    def keys(self):
+        """ The value of the field for each feature, listed when first used. """
+        if self._keys is None:
+            self._keys = self.parent.field_values(self.field)
+        return self._keys
+
+    def _select(self, mask):
+        """ Returns the features selected by a boolean mask, as a list. """
+        return [self.features[i] for i in np.flatnonzero(mask).tolist()]
+
+    def _mask(self, op, value):
+        """ Returns a boolean mask of the features where the field compares true. """
+        return self.parent.field_mask(self.field, op, value)
+
+    def __getitem__(self, compair):
         ## Equal to
         if not isinstance(compair, slice):
-            for value, feature in zip(self.keys, self.features):
-                if value == compair:
-                    return_features.append(feature)
+            return_features = self._select(self._mask('==', compair))
             
             ##
             if len(return_features) == 0:
@@ -493,9 +566,12 @@ class FeatureDict:
 
         ## Compair
         else:
-            for value, feature in zip(self.keys, self.features):
-                if (not bool(compair.start) or (value > compair.start)) and (not bool(compair.stop) or (value < compair.stop)):
-                    return_features.append(feature)
+            mask = np.ones(len(self.parent), dtype=bool)
+            if compair.start:
+                mask &= self._mask('>', compair.start)
+            if compair.stop:
+                mask &= self._mask('<', compair.stop)
+            return_features = self._select(mask)
 
         ##
         new_feature_list = FeatureList(self.parent, return_features)
@@ -518,50 +594,51 @@ class FeatureDict:
     
     ## 
     def __eq__(self, compare):
-        retn_list = []
-        for field, feature in zip(self.keys, self.features):
-            if field == compare:
-                retn_list.append(feature)
-        return FeatureList(self.parent, retn_list)
+        return FeatureList(self.parent, self._select(self._mask('==', compare)))
     
     def __ne__(self, compare):
-        retn_list = []
-        for field, feature in zip(self.keys, self.features):
-            if field != compare:
-                retn_list.append(feature)
-        return FeatureList(self.parent, retn_list)
+        return FeatureList(self.parent, self._select(self._mask('!=', compare)))
 
     def __lt__(self, compare):
-        retn_list = []
-        for field, feature in zip(self.keys, self.features):
-            if field < compare:
-                retn_list.append(feature)
-        return FeatureList(self.parent, retn_list)
+        return FeatureList(self.parent, self._select(self._mask('<', compare)))
     
     def __gt__(self, compare):
-        retn_list = []
-        for field, feature in zip(self.keys, self.features):
-            if field > compare:
-                retn_list.append(feature)
-        return FeatureList(self.parent, retn_list)
+        return FeatureList(self.parent, self._select(self._mask('>', compare)))
 
     def __le__(self, compare):
-        retn_list = []
-        for field, feature in zip(self.keys, self.features):
-            if field <= compare:
-                retn_list.append(feature)
-        return FeatureList(self.parent, retn_list)
+        return FeatureList(self.parent, self._select(self._mask('<=', compare)))
 
     def __ge__(self, compare):
-        retn_list = []
-        for field, feature in zip(self.keys, self.features):
-            if field >= compare:
-                retn_list.append(feature)
-        return FeatureList(self.parent, retn_list)
+        return FeatureList(self.parent, self._select(self._mask('>=', compare)))
+
+class FeatureSequence:
+    """
+    A read-only sequence of all features in a VectorLayer, creating Feature 
+    views as they are accessed.
+    """
+    def __init__(self, parent):
+        self.parent = parent
+
+    def __len__(self):
+        return len(self.parent)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self.parent.get_feature(i) for i in range(*key.indices(len(self)))]
+
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("feature index out of range")
+        return self.parent.get_feature(key)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.parent.get_feature(index)
 
 class VectorLayer(BaseLayer):
     """ """
-    def __init__(self, geometry_type, field_names):
+    def __init__(self, geometry_type, field_names, field_kinds=None):
         ## Init base layer parent
         BaseLayer.__init__(self)
 
@@ -570,29 +647,77 @@ class VectorLayer(BaseLayer):
         self.name = 'Vector Layer'
 
         self.field_names = field_names
-        self.features = []
+
+        ## Hold feature attributes in a typed column per field. Features are 
+        ## views created on access, & only kept while in use or styled
+        self._attributes = AttributeTable(field_names, field_kinds)
+        self.features = FeatureSequence(self)
+        self._feature_cache = weakref.WeakValueDictionary()
 
         ## >> self.projection = pyproj.Proj(projection)
         self.geographic_crs = pyproj.crs.CRS("EPSG:4326")
 
         self.geometry_type = geometry_type
-        self.geometries = []
 
-        ## Hold geo values as reference
-        self.geo_x_values = []
-        self.geo_y_values = []
+        ## Hold indices of geometries with vertices that failed to project
+        self.invalid_geometries = set()
+
+        ## Hold geo values, & geometry and part offsets, in columnar arrays.
+        ## Count edits to the geo values, to key projections by content
+        self.coordinates = CoordinateStore()
+        self.geo_version = 0
+
+        ## Projected values, None until activated
+        self._x_values = None
+        self._y_values = None
 
-        ## Projected values
-        self.x_values = []
-        self.y_values = []
+        ## Recently projected values & derived data, kept per target CRS
+        self.projection_cache_size = 4
+        self._projection_cache = OrderedDict()
+        self._projection_key = None
 
-        ## Setup variables for fast sorting
+        ## Max error of the projected values in projection units, None if 
+        ## they were projected exactly
+        self.projection_tolerance = None
+
+        ## Fraction of vertices projected by activate, an optional callback 
+        ## run as it changes, and an event to cancel activation
+        self.progress = 0.0
+        self.progress_callback = None
+        self._cancel_event = threading.Event()
+
+        ## Pool of pixel buffers reused between renders, & their type
+        self._buffers = BufferPool()
+        self.pixel_dtype = np.float64
+
+        ## Setup a spatial index of geometry extents, for fast culling and 
+        ## selection. Built when first used, for the projected values
         self.view_sort = True
-        self.extents_sorted = False
-        self.maxx = []
-        self.maxy = []
-        self.minx = []
-        self.miny = []
+        self.spatial_index = None
+        self._visible = None
+
+        ## Drop vertices on the same pixel as the one before when drawing, &
+        ## draw features that fit in a pixel as a 'dot', or 'skip' them. The
+        ## counts of the last frame are kept in render_stats
+        self.pixel_decimate = True
+        self.subpixel_policy = 'dot'
+        self.render_stats = {}
+
+        ## Rank vertices by Douglas-Peucker importance when activated, and 
+        ## draw lines & polygons simplified to simplify_tolerance pixels. The
+        ## simplified vertices are kept for recent power of two tolerances
+        self.simplify = True
+        self.simplify_tolerance = 0.5
+        self.simplify_cache_size = 8
+        self.vertex_importance = None
+        self._simplified = OrderedDict()
+
+        ## Features share the default style until restyled, then styles shared
+        ## by the features restyled together, & features drawn last, in order,
+        ## after their style was changed
+        self._default_style = FeatureStyle.compile(build_style, geometry_type)(self)
+        self._feature_styles = {}
+        self._raised = {}
 
         ## Style
         self.style = LayerStyle(self)
@@ -619,7 +744,196 @@ class VectorLayer(BaseLayer):
 
     def __len__(self):
         """ Returns the number of features stored in layer."""
-        return len(self.features)
+        return self.coordinates.geometry_count()
+
+    def get_feature(self, index):
+        """
+        Returns a view of the feature at an index.
+
+        The same Feature object is returned while it is in use.
+
+        Args:
+            index (int): The index of the feature.
+
+        Returns:
+            feature (Feature): The feature.
+        """
+        feature = self._feature_cache.get(index)
+        if feature is None:
+            feature = Feature(self, index)
+            self._feature_cache[index] = feature
+        return feature
+
+    def _set_feature_style(self, index, style):
+        """ Sets the style of a feature, counting the features using it. """
+        old_style = self._feature_styles.get(index)
+        if old_style is not None:
+            old_style.users -= 1
+        self._feature_styles[index] = style
+        style.users = getattr(style, 'users', 0) + 1
+
+    def _writable_style(self, index):
+        """ Returns a style only used by a feature, copying it if shared. """
+        return self._writable_styles([index])[0]
+
+    def _style_groups(self, indices):
+        """ Returns the distinct styles used by features, & their indices. """
+        groups = {}
+        default_style = self._default_style
+        for index in indices:
+            style = self._feature_styles.get(index, default_style)
+            groups.setdefault(id(style), (style, []))[1].append(index)
+        return list(groups.values())
+
+    def _writable_styles(self, indices):
+        """ 
+        Returns styles only used by the given features, that can be changed 
+        without changing any other feature.
+
+        Features sharing a style with features not given get one new copy of
+        it, shared between them.
+        """
+        default_style = self._default_style
+        styles = []
+        for style, members in self._style_groups(indices):
+            if style is default_style or style.users > len(members):
+                style = style.copy()
+                for index in members:
+                    self._set_feature_style(index, style)
+            styles.append(style)
+        return styles
+
+    def _raise_feature(self, index):
+        """ Moves a feature to be drawn after all others. """
+        self._raised.pop(index, None)
+        self._raised[index] = None
+
+    def feature_styles(self, writable=False):
+        """ 
+        Returns the default feature style, & each distinct feature style.
+
+        Optional Args:
+            writable (bool): If True, features using a style also used outside
+            the layer, e.g. one assigned from another layer's feature, are 
+            given a copy of it first. Defaults to False.
+
+        Returns:
+            styles (list): The styles.
+        """
+        if writable:
+            for style, members in self._style_groups(list(self._feature_styles)):
+                if style.feature is not self or style.users > len(members):
+                    new_style = style.copy(self)
+                    for index in members:
+                        self._set_feature_style(index, new_style)
+
+        styles = {id(self._default_style): self._default_style}
+        styles.update((id(style), style) for style in self._feature_styles.values())
+        return list(styles.values())
+
+    def field_values(self, field):
+        """ Returns the values of a field for each feature in the layer. """
+        return self._attributes.column(field).tolist()
+
+    def column(self, field):
+        """
+        Returns the column holding the values of a field, for whole column 
+        operations without creating features.
+
+        Numeric columns have typed values & null_mask arrays, and string
+        columns have categories & codes arrays. All columns have tolist and
+        vectorized compare methods.
+
+        Args:
+            field (string): The name of the field.
+
+        Returns:
+            column (attributes.AttributeColumn): The column of the field.
+        """
+        return self._attributes.column(field)
+
+    def field_mask(self, field, op, value):
+        """
+        Returns a boolean array of the features where a field compares true.
+
+        Args:
+            field (string): The name of the field.
+
+            op (string): The comparison operator, one of '==', '!=', '<', '>',
+            '<=', or '>='.
+
+            value (*): The value to compare to.
+
+        Returns:
+            mask (numpy.ndarray): True for each feature where the comparison is 
+            true. Features missing the value never match.
+        """
+        return self._attributes.column(field).compare(op, value)
+
+    @property
+    def geo_x_values(self):
+        """ The geographic x values of all vertices, a view of the store. """
+        return self.coordinates.x.values
+
+    @geo_x_values.setter
+    def geo_x_values(self, values):
+        self.coordinates.x.set(values)
+        self.mark_geo_changed()
+
+    @property
+    def geo_y_values(self):
+        """ The geographic y values of all vertices, a view of the store. """
+        return self.coordinates.y.values
+
+    @geo_y_values.setter
+    def geo_y_values(self, values):
+        self.coordinates.y.set(values)
+        self.mark_geo_changed()
+
+    def mark_geo_changed(self):
+        """
+        Records that the layer's geo values were edited.
+
+        Bumps geo_version, so projections of the old values are not reused, 
+        and marks the layer to be reprojected and redrawn. Called by the geo
+        value setters and Geometry.add_subgeometry, and should be called 
+        after geo values are edited in place.
+
+        Args:
+            None
+        
+        Returns:
+            None
+        """
+        self.geo_version += 1
+        self.spatial_index = None
+        self.mark_dirty()
+
+        ## Projected values no longer match, reproject when next used
+        if self.map is not None:
+            self.mark_stale()
+
+    @property
+    def x_values(self):
+        """ The projected x values of all vertices, geo values until activated. """
+        if self._x_values is None:
+            return self.geo_x_values
+        return self._x_values
+
+    @x_values.setter
+    def x_values(self, values):
+        self._x_values = values
+
+    @property
+    def y_values(self):
+        """ The projected y values of all vertices, geo values until activated. """
+        if self._y_values is None:
+            return self.geo_y_values
+        return self._y_values
+
+    @y_values.setter
+    def y_values(self, values):
+        self._y_values = values
 
     def __getitem__(self, key):
         """ Returns a feature or a FeatureDict based on given key """
@@ -633,12 +947,37 @@ class VectorLayer(BaseLayer):
         """
         self.status = 'loading'
 
-        self.x_values, self.y_values = self.map.geo2proj(self.geo_x_values, self.geo_y_values)
-        self.extents_sorted = False
-        self.maxx = []
-        self.maxy = []
-        self.minx = []
-        self.miny = []
+        ## Keep the current projection, and reuse a cached one if possible
+        self.cache_projection()
+        key = self.get_projection_key()
+        if self.restore_projection(key):
+            self.status = 'ready'
+            return
+
+        ## Project in parallel chunks, reporting progress & checking for cancel
+        self.status = 'projecting'
+        self._cancel_event.clear()
+        try:
+            self.x_values, self.y_values = self.map.geo2proj(self.geo_x_values, self.geo_y_values,
+                progress=self._report_progress, cancel=self._cancel_event)
+        except TransformCancelled:
+            self.status = 'cancelled'
+            raise
+        self._projection_key = key
+        self.projection_tolerance = self.map.get_approx_tolerance()
+
+        ## Find geometries with vertices that failed to project, the map 
+        ## leaves them as nan to be dropped or split apart when drawn
+        self.invalid_geometries = set()
+        if self.map.invalid_policy in ('drop', 'split'):
+            invalid_index = np.flatnonzero(invalid_mask(self.x_values, self.y_values))
+            if len(invalid_index):
+                starts = self.coordinates.part_offsets.values[self.coordinates.geom_offsets.values[:-1]]
+                owners = np.searchsorted(starts, invalid_index, side='right') - 1
+                self.invalid_geometries = set(np.unique(owners).tolist())
+
+        self.spatial_index = None
+        self.build_vertex_importance()
 
         self.status = 'ready'
 
@@ -646,80 +985,324 @@ class VectorLayer(BaseLayer):
         ## Update status
         self.status = 'initialized'
 
+    def _report_progress(self, done, total):
+        """ Records activation progress, and runs the progress callback. """
+        self.progress = done / total if total else 1.0
+        if self.progress_callback is not None:
+            self.progress_callback(self, self.progress)
+
+    def cancel_activation(self):
+        """
+        Cancels projecting the layer's values.
+
+        Stops a running activate from another thread, activate raises 
+        TransformCancelled and the layer is left stale, to be reprojected when
+        next refreshed.
+
+        Args:
+            None
+        
+        Returns:
+            None
+        """
+        self._cancel_event.set()
+
+    def get_projection_key(self):
+        """
+        Returns a key identifying the layer's projected values for its map.
+
+        Projected values depend on the map's geographic and projected CRS, its
+        invalid coordinate policy, and the layer's geo values, identified by 
+        geo_version. The approximation tolerance is kept with cached values 
+        instead, so more accurate values can be reused.
+
+        Args:
+            None
+        
+        Returns:
+            key (tuple): A hashable key for the current projection.
+        """
+        return (
+            self.map.geographic_crs.to_wkt(),
+            self.map.projected_crs.to_wkt(),
+            self.map.invalid_policy,
+            self.geo_version,
+        )
+
+    def cache_projection(self):
+        """
+        Stores the current projected values and derived data in the cache.
+
+        Stores the projected values, spatial index, vertex importance and 
+        invalid geometries under the key they were projected with, dropping 
+        the least recently used entries beyond projection_cache_size.
+
+        Args:
+            None
+        
+        Returns:
+            None
+        """
+        if self._projection_key is None or self.projection_cache_size < 1:
+            return
+
+        self._projection_cache[self._projection_key] = {
+            '_x_values': self._x_values,
+            '_y_values': self._y_values,
+            'invalid_geometries': self.invalid_geometries,
+            'spatial_index': self.spatial_index,
+            'vertex_importance': self.vertex_importance,
+            '_simplified': self._simplified,
+            'projection_tolerance': self.projection_tolerance,
+        }
+        self._projection_cache.move_to_end(self._projection_key)
+
+        while len(self._projection_cache) > self.projection_cache_size:
+            self._projection_cache.popitem(last=False)
+
+    def restore_projection(self, key):
+        """
+        Restores cached projected values and derived data.
+
+        Cached values are only restored if they are at least as accurate as 
+        the map's current approximation tolerance requires.
+
+        Args:
+            key (tuple): The projection key to restore, from get_projection_key.
+        
+        Returns:
+            restored (bool): True if the key was cached and restored.
+        """
+        cached = self._projection_cache.pop(key, None)
+        if cached is None:
+            return False
+
+        ## Exact values are always accurate enough, approximate ones only if
+        ## within the current tolerance
+        cached_tolerance = cached['projection_tolerance']
+        if cached_tolerance is not None:
+            tolerance = self.map.get_approx_tolerance()
+            if tolerance is None or cached_tolerance > tolerance:
+                return False
+
+        ## Restore all cached attributes
+        self.__dict__.update(cached)
+        self._projection_key = key
+        return True
+
+    def clear_projection_cache(self):
+        """
+        Removes all cached projected values.
+
+        Frees the memory of cached projections. Edits to the geo values do 
+        not need it, they are recorded by mark_geo_changed.
+
+        Args:
+            None
+        
+        Returns:
+            None
+        """
+        self._projection_cache.clear()
+        self._projection_key = None
+
     def new(self):
         """
         Creates a new feature inside FeatureSet
         """
         #! ADD A PROJECTION CHECK & FIELDS CHECK
 
-        new_geom = Geometry(self)
-        self.geometries.append(new_geom)
+        ## Add a row to the coordinate store & attribute columns
+        index = self.coordinates.add_geometry()
+        self._attributes.append_row()
+        self.mark_dirty()
 
-        new_feature = Feature(self, new_geom)
-        self.features.append(new_feature)
-
-        return new_feature
+        return self.get_feature(index)
 
     def add(self, old_feature):
         """
         Adds an existing feature inside FeatureSet
         """
-        new_geom = Geometry(self)
-        self.geometries.append(new_geom)
-
-        new_feature = Feature(self, new_geom)
-        self.features.append(new_feature)
-
-        new_geom.structure = old_feature.geometry.structure.copy()
+        new_feature = self.new()
+        new_geom = new_feature.geometry
 
-        x_values, y_values = old_feature.geometry.get_points()
-        new_geom.length = len(x_values)
-        self.x_values += x_values
-        self.y_values += y_values
+        ## Copy the geo values of each subgeometry
+        old_geom = old_feature.geometry
+        start = old_geom.start_address
+        geo_x_values, geo_y_values = old_geom.parent.geo_x_values, old_geom.parent.geo_y_values
+        for count in old_geom.structure:
+            new_geom.add_subgeometry(geo_x_values[start:start+count], geo_y_values[start:start+count])
+            start += count
 
         for field_name in self.field_names:
             new_feature[field_name] = old_feature[field_name]
 
+        self.mark_dirty()
         return new_feature
 
     def get_extent(self):
-        return min(self.x_values), min(self.y_values), max(self.x_values), max(self.y_values)
+        ## Reproject first if the map projection changed
+        self.refresh()
+        return np.nanmin(self.x_values), np.nanmin(self.y_values), np.nanmax(self.x_values), np.nanmax(self.y_values)
 
     def box_select(self, min_x, min_y, max_x, max_y):
-        ## Create return list
-        selected_features = []
-
-        ## Loop through all features in layer, adding them to return list 
-        ## if within selection box
-        for feature in self.features:
-            g_min_x, g_min_y, g_max_x, g_max_y = feature.geometry.get_extent()
-
-            if (
-                ## Geometry completely or partially within selector 
-                ((g_max_x >= min_x and g_min_x <= max_x) and (g_max_y >= min_y and g_min_y <= max_y)) 
-                or
-                ## Selector completely within geometry
-                (g_min_x <= min_x and g_max_x >= max_x and (g_min_y <= min_y and g_max_y >= max_y))):
-                    selected_features.append(feature)
+        ## Reproject first if the map projection changed
+        self.refresh()
 
+        ## Find geometries with extents overlapping the selector, which also
+        ## finds geometries with the selector completely within them
+        selected = self.get_spatial_index().query(min_x, min_y, max_x, max_y)
+
+        ## Only create features that were selected
+        selected_features = [self.get_feature(index) for index in selected.tolist()]
         return FeatureList(self, selected_features)
 
     def point_select(self, proj_x, proj_y):
-        ## Box select small two pixel sized box into shortlist
-        min_x = proj_x - self.map._proj_scale * 2
-        max_x = proj_x + self.map._proj_scale * 2
-        min_y = proj_y - self.map._proj_scale * 2
-        max_y = proj_y + self.map._proj_scale * 2
-
-        short_list = self.box_select(min_x, min_y, max_x, max_y)
-
-        ## If point is is within feature, added to final list
-        selected_features = []
-        for feature in short_list:
-            if feature.geometry.point_within(proj_x, proj_y):
-                selected_features.append(feature)
-        
+        ## Select with a batch of one point
+        _, selected = self.point_select_many([proj_x], [proj_y])
+        selected_features = [self.get_feature(index) for index in selected.tolist()]
         return FeatureList(self, selected_features)
+
+    def point_select_many(self, proj_x, proj_y, tolerance=None):
+        """
+        Finds the geometries hit by each of many points.
+
+        Candidates are found for all points at once from the spatial index,
+        then tested with vectorized hit tests: points inside polygons, or 
+        within the tolerance of lines & points.
+
+        Args:
+            proj_x (list | numpy.ndarray): The projected x value of each point.
+
+            proj_y (list | numpy.ndarray): The projected y value of each point.
+
+        Optional Args:
+            tolerance (float): The distance in pixels a point can be from a 
+            line or point geometry and hit it. Defaults to the value for the
+            geometry type in HIT_TOLERANCES.
+
+        Returns:
+            point_indices (numpy.ndarray): The point of each hit, sorted.
+
+            geometry_indices (numpy.ndarray): The geometry of each hit, sorted
+            within each point.
+        """
+        ## Reproject first if the map projection changed
+        self.refresh()
+
+        proj_x = np.asarray(proj_x, dtype=float)
+        proj_y = np.asarray(proj_y, dtype=float)
+        if tolerance is None:
+            tolerance = HIT_TOLERANCES[self.geometry_type]
+        tolerance = tolerance * self.map._proj_scale
+
+        ## Find candidate geometries with extents near each point
+        pad = max(tolerance, self.map._proj_scale * 2)
+        point_indices, geometry_indices = self.get_spatial_index().query_many(
+            proj_x - pad, proj_y - pad, proj_x + pad, proj_y + pad)
+
+        hits = self.hit_test(proj_x[point_indices], proj_y[point_indices], geometry_indices, tolerance)
+        return point_indices[hits], geometry_indices[hits]
+
+    def hit_test(self, proj_x, proj_y, geometry_indices, tolerance):
+        """
+        Tests whether each point hits the geometry it is paired with.
+
+        Args:
+            proj_x (numpy.ndarray): The projected x value of each point.
+
+            proj_y (numpy.ndarray): The projected y value of each point.
+
+            geometry_indices (numpy.ndarray): The index of the geometry paired
+            with each point.
+
+            tolerance (float): The projected distance a point can be from a 
+            line or point geometry and hit it.
+
+        Returns:
+            hits (numpy.ndarray): True for each point hitting its geometry.
+        """
+        part_offsets, vertex_starts, vertex_ends = self._vertex_ranges(geometry_indices)
+        x_values, y_values = self.x_values, self.y_values
+
+        if self.geometry_type == 'polygon':
+            return hit_testing.points_in_polygons(proj_x, proj_y, x_values, y_values, 
+                part_offsets, vertex_starts, vertex_ends)
+        elif self.geometry_type == 'line':
+            distances = hit_testing.polyline_distances(proj_x, proj_y, x_values, y_values,
+                part_offsets, vertex_starts, vertex_ends)
+            return distances < tolerance
+        else:
+            distances = hit_testing.point_distances(proj_x, proj_y, x_values, y_values,
+                vertex_starts, vertex_ends)
+            return distances <= tolerance
+
+    def _vertex_ranges(self, geometry_indices):
+        """ Returns the part offsets, & the vertex range of each geometry. """
+        part_offsets = self.coordinates.part_offsets.values
+        geom_offsets = self.coordinates.geom_offsets.values
+        vertex_starts = part_offsets[geom_offsets[geometry_indices]]
+        vertex_ends = part_offsets[geom_offsets[geometry_indices + 1]]
+        return part_offsets, vertex_starts, vertex_ends
+
+    def nearest(self, proj_x, proj_y, k=1, max_distance=None):
+        """
+        Finds the features nearest a point.
+
+        Args:
+            proj_x (float): The projected x value of the point.
+
+            proj_y (float): The projected y value of the point.
+
+        Optional Args:
+            k (int): The number of features to find. Defaults to 1.
+
+            max_distance (float): The projected distance beyond which features
+            are not found. Defaults to None, for no limit.
+
+        Returns:
+            features (FeatureList): The nearest features, nearest first.
+        """
+        indices, _ = self.nearest_indices(proj_x, proj_y, k, max_distance)
+        return FeatureList(self, [self.get_feature(index) for index in indices.tolist()])
+
+    def nearest_indices(self, proj_x, proj_y, k=1, max_distance=None):
+        """
+        Finds the geometries nearest a point, & their distances.
+
+        Searches the spatial index best-first, so only geometries with extents
+        nearer than the k-th nearest geometry are measured. Distances are to
+        the nearest vertex of points, the nearest segment of lines, and the 
+        outline of polygons, or 0 inside them.
+
+        Args:
+            proj_x (float): The projected x value of the point.
+
+            proj_y (float): The projected y value of the point.
+
+        Optional Args:
+            k (int): The number of geometries to find. Defaults to 1.
+
+            max_distance (float): The projected distance beyond which 
+            geometries are not found. Defaults to None, for no limit.
+
+        Returns:
+            indices (numpy.ndarray): The nearest geometries, nearest first.
+
+            distances (numpy.ndarray): The projected distance to each geometry.
+        """
+        ## Reproject first if the map projection changed
+        self.refresh()
+
+        def distance_fn(geometry_indices):
+            part_offsets, vertex_starts, vertex_ends = self._vertex_ranges(geometry_indices)
+            count = len(geometry_indices)
+            return hit_testing.geometry_distances(np.full(count, proj_x, dtype=float), np.full(count, proj_y, dtype=float),
+                self.x_values, self.y_values, part_offsets, vertex_starts, vertex_ends, self.geometry_type)
+
+        if max_distance is None:
+            max_distance = math.inf
+        return self.get_spatial_index().nearest(proj_x, proj_y, k, max_distance, distance_fn)
    
     def run_on_all(self, method_name, *args):
         has_return = False
@@ -730,94 +1313,319 @@ class VectorLayer(BaseLayer):
     
     """ Methods for viewport based rendering """
 
-    def sort_extents(self):
+    def build_spatial_index(self):
         """
+        Builds a packed R-tree of the extents of all geometries.
+
+        Extents are found for all geometries at once from the columnar 
+        projected values, and bulk loaded into the tree.
+
+        Args:
+            None
+        
+        Returns:
+            None
+        """
+        extents = self.coordinates.geometry_extents(self.x_values, self.y_values)
+        self.spatial_index = PackedRTree(*extents)
+
+    def get_spatial_index(self):
+        """
+        Returns the spatial index of the layer's geometries.
+
+        The index is rebuilt if there is none for the projected values, or if
+        geometries were added since it was built.
+
+        Args:
+            None
+        
+        Returns:
+            spatial_index (spatial_index.PackedRTree): The index, holding the
+            extent of each geometry by index.
         """
-        self.maxx = []
-        self.minx = []
-        self.maxy = []
-        self.miny = []
+        if self.spatial_index is None or len(self.spatial_index) != len(self):
+            self.build_spatial_index()
+        return self.spatial_index
 
-        for geom in self.geometries:
-            mnx, mny, mxx, mxy = geom.get_extent()
-            self.maxx.append( (mxx, geom ) )
-            self.minx.append( (mnx, geom ) )
-            self.maxy.append( (mxy, geom ) )
-            self.miny.append( (mny, geom ) )
+    def query_visible(self, viewport=None):
+        """
+        Returns the indices of the geometries in the view.
 
-        self.maxx.sort(key=lambda x: x[0])
-        self.minx.sort(key=lambda x: x[0])
-        self.maxy.sort(key=lambda x: x[0])
-        self.miny.sort(key=lambda x: x[0])
+        Queries the spatial index with the view bounds, so only visible
+        geometries are touched. The result is also kept for Geometry.skip_draw.
 
-        self.extents_sorted = True
+        Optional Args:
+            viewport (Viewport): The view to find geometries in. Defaults to 
+            the map's current view.
 
-    def mark_visible(self):
+        Returns:
+            visible (numpy.ndarray): The sorted indices of the geometries with
+            extents overlapping the view.
         """
+        if viewport is None:
+            viewport = self.map.get_viewport()
+
+        self._visible = self.get_spatial_index().query(*viewport.proj_bounds)
+        return self._visible
+
+    def build_vertex_importance(self):
         """
-        for geom in self.geometries:
-            geom.skip_draw = False
+        Ranks every projected vertex by its Douglas-Peucker importance.
 
-        xs, ys = self.map.pix2proj([0, self.map.width], [0, self.map.height])
-        minx, maxx = xs 
-        miny, maxy = ys
+        Vertices with importance above a tolerance are those Douglas-Peucker
+        keeps at the tolerance, so the layer can be drawn simplified to any
+        scale without simplifying again. Polygon rings always keep enough
+        vertices to stay rings. Point layers are never simplified.
 
-        ind = bisect.bisect_left([i[0] for i in self.minx], maxx)
-        for _, geom in self.minx[ind:]:
-            geom.skip_draw = True
+        Args:
+            None
         
-        ind = bisect.bisect_left([i[0] for i in self.maxx], minx)
-        for _, geom in self.maxx[:ind]:
-            geom.skip_draw = True
-    
-        ind = bisect.bisect_left([i[0] for i in self.miny], maxy)
-        for _, geom in self.miny[ind:]:
-            geom.skip_draw = True
+        Returns:
+            None
+        """
+        self._simplified = OrderedDict()
+        if self.geometry_type == 'point':
+            self.vertex_importance = None
+            return
+
+        keep_depth = 2 if self.geometry_type == 'polygon' else 0
+        self.vertex_importance = vertex_importance(self.x_values, self.y_values, 
+            self.coordinates.part_offsets.values, keep_depth)
+
+    def simplified_values(self, tolerance):
+        """
+        Returns the projected vertices simplified to a tolerance, for 
+        rendering.
+
+        The tolerance is rounded down to a power of two, and the vertices kept
+        for it are cached, so zooming within a scale reuses them. Full detail
+        is given if simplifying would keep most vertices anyway.
+
+        Args:
+            tolerance (float): The projected distance simplified geometries 
+            may be from the originals.
         
-        ind = bisect.bisect_left([i[0] for i in self.maxy], miny)
-        for _, geom in self.maxy[:ind]:
-            geom.skip_draw = True
+        Returns:
+            x_values (numpy.ndarray): The x values of the kept vertices.
+
+            y_values (numpy.ndarray): The y values of the kept vertices.
+
+            part_offsets (numpy.ndarray): The first kept vertex of each part,
+            and the end of the last part.
+        """
+        full_detail = (self.x_values, self.y_values, self.coordinates.part_offsets.values)
+        if not self.simplify or self.geometry_type == 'point' or not tolerance > 0:
+            return full_detail
+
+        ## Rank vertices again if geometries were added since
+        if self.vertex_importance is None or len(self.vertex_importance) != len(self.x_values):
+            self.build_vertex_importance()
+
+        level = math.floor(math.log2(tolerance))
+        if level not in self._simplified:
+            keep = self.vertex_importance > 2.0 ** level
+            if np.count_nonzero(keep) > 0.75 * len(keep):
+                self._simplified[level] = None
+            else:
+                self._simplified[level] = (self.x_values[keep], self.y_values[keep],
+                    simplified_offsets(keep, self.coordinates.part_offsets.values))
+            while len(self._simplified) > self.simplify_cache_size:
+                self._simplified.popitem(last=False)
+        self._simplified.move_to_end(level)
+
+        simplified = self._simplified[level]
+        return full_detail if simplified is None else simplified
+
+    def _draw_order(self, indices):
+        """ 
+        Returns positions in a sorted array of geometry indices, in draw 
+        order, with restyled geometries last.
+        """
+        if not self._raised:
+            return range(len(indices))
+
+        raised = np.fromiter(self._raised, dtype=np.int64, count=len(self._raised))
+        raised = raised[np.isin(raised, indices)]
+        rest = np.flatnonzero(~np.isin(indices, raised))
+        return rest.tolist() + np.searchsorted(indices, raised).tolist()
+
+    def pixel_geometries(self, indices, viewport):
+        """
+        Converts geometries to pixels for drawing, dropping vertices that 
+        would not show.
+
+        The vertices of all the geometries are gathered and converted at 
+        once, simplified to the scale. Then, if pixel_decimate is set, 
+        vertices on the same pixel as the vertex before them are dropped, and
+        so are parts left too small to draw. Features with no parts left fit
+        in a pixel, and are drawn as a one pixel dot if subpixel_policy is 
+        'dot', or skipped if 'skip'. Counts of what was dropped are left in
+        render_stats.
+
+        Args:
+            indices (numpy.ndarray): The sorted indices of the geometries.
+
+            viewport (Viewport): The view to convert to pixels for.
+
+        Returns:
+            pix_x (numpy.ndarray): The pixel x values of the kept vertices.
+
+            pix_y (numpy.ndarray): The pixel y values of the kept vertices.
+
+            geom_starts (list): The first kept vertex of each geometry, and 
+            the end of the last.
+
+            part_counts (list): The number of kept vertices of each kept part.
+
+            geom_parts (list): The first kept part of each geometry, and the 
+            end of the last.
+
+            dots (dict): The pixel x & y values of the dot drawn for each 
+            collapsed geometry, by position in indices.
+        """
+        tolerance = self.simplify_tolerance * viewport.proj_scale
+        x_values, y_values, part_offsets = self.simplified_values(tolerance)
+        geom_offsets = self.coordinates.geom_offsets.values
+
+        if len(indices) == len(geom_offsets) - 1:
+            ## Every geometry is drawn, so use the vertices in place
+            gathered_parts, gathered_offsets = geom_offsets, part_offsets
+        else:
+            ## Gather the parts of the geometries, then their vertices
+            _, parts = hit_testing.expand_ranges(geom_offsets[indices], geom_offsets[indices + 1])
+            _, vertices = hit_testing.expand_ranges(part_offsets[parts], part_offsets[parts + 1])
+            x_values, y_values = x_values[vertices], y_values[vertices]
+            gathered_parts = np.zeros(len(indices) + 1, dtype=np.int64)
+            np.cumsum(geom_offsets[indices + 1] - geom_offsets[indices], out=gathered_parts[1:])
+            gathered_offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+            np.cumsum(part_offsets[parts + 1] - part_offsets[parts], out=gathered_offsets[1:])
+        vertex_count = len(x_values)
+
+        ## Convert to pixels at once, into buffers reused between frames
+        pix_x, pix_y = self._buffers.get('pix', vertex_count, self.pixel_dtype)
+        viewport.proj2pix(x_values, y_values, out=(pix_x, pix_y))
+
+        ## Drop vertices on the same pixel, & parts too small to draw
+        if self.pixel_decimate:
+            keep, part_counts = pixel_decimate(pix_x, pix_y, gathered_offsets, 
+                MIN_PART_COUNTS[self.geometry_type])
+        else:
+            keep, part_counts = None, np.diff(gathered_offsets)
+
+        ## Find the kept parts of each geometry, & their kept vertices
+        kept_parts = part_counts > 0
+        geom_parts = simplified_offsets(kept_parts, gathered_parts)
+        vertex_offsets = np.zeros(len(part_counts) + 1, dtype=np.int64)
+        np.cumsum(part_counts, out=vertex_offsets[1:])
+        geom_starts = vertex_offsets[gathered_parts]
+
+        ## Features with vertices, but no parts left, fit in a pixel
+        collapsed = np.flatnonzero((np.diff(geom_parts) == 0) & (np.diff(gathered_offsets[gathered_parts]) > 0))
+        dots = {}
+        if len(collapsed) and self.subpixel_policy == 'dot':
+            dot_x, dot_y = DOT_SHAPES[self.geometry_type]
+            first = gathered_offsets[gathered_parts[collapsed]]
+            dots_x = pix_x[first][:, None] + np.array(dot_x, dtype=self.pixel_dtype)
+            dots_y = pix_y[first][:, None] + np.array(dot_y, dtype=self.pixel_dtype)
+            dots = dict(zip(collapsed.tolist(), zip(dots_x, dots_y)))
+
+        self.render_stats = {
+            'geometries': len(indices),
+            'vertices': vertex_count,
+            'drawn_vertices': int(vertex_offsets[-1]) + sum(len(dot_x) for dot_x, _ in dots.values()),
+            'collapsed': len(dots),
+            'skipped': len(collapsed) - len(dots),
+        }
+
+        if keep is not None and vertex_offsets[-1] < vertex_count:
+            pix_x, pix_y = pix_x[keep], pix_y[keep]
+        return (pix_x, pix_y, geom_starts.tolist(), part_counts[kept_parts].tolist(), 
+            geom_parts.tolist(), dots)
+
+    def remove_invalid_vertices(self, x_values, y_values, structure):
+        """
+        Removes vertices that failed to project from a single geometry.
+
+        Args:
+            x_values (numpy.ndarray): The x values of the geometry.
+
+            y_values (numpy.ndarray): The y values of the geometry.
+
+            structure (list): The number of points in each subgeometry.
         
-    def render(self, renderer, canvas):
+        Returns:
+            x_values (numpy.ndarray): The remaining x values.
+
+            y_values (numpy.ndarray): The remaining y values.
+
+            structure (list): The number of points in each remaining 
+            subgeometry.
+        """
+        part_offsets = np.zeros(len(structure) + 1, dtype=np.int64)
+        np.cumsum(structure, out=part_offsets[1:])
+
+        split = self.map.invalid_policy == 'split'
+        x_values, y_values, part_offsets, _ = remove_invalid(x_values, y_values, part_offsets, split=split)
+
+        ## Leave out subgeometries that lost all points
+        structure = [count for count in np.diff(part_offsets).tolist() if count]
+        return x_values, y_values, structure
+
+    def render(self, renderer, canvas, viewport=None):
         """
         """
         ## Update Status
         self.status = 'rendering'
 
+        if viewport is None:
+            viewport = self.map.get_viewport()
+
+        ## Find the geometries to draw, only those in view if culling
         if self.view_sort:
-            if not self.extents_sorted:
-                self.sort_extents()
-            self.mark_visible()
+            indices = self.query_visible(viewport)
+        else:
+            indices = np.arange(len(self))
             
+        ## Pick drawing method for geometry type
         if self.geometry_type == 'polygon':
-            for feature in self.features:
-
-                if feature.geometry.skip_draw:
-                    continue
-                                
-                pix_x, pix_y = self.map.proj2pix(*feature.geometry.get_points())
-                renderer.draw_polygon(canvas, feature.geometry.structure, pix_x, pix_y, feature.style)
-        
+            draw_fn = renderer.draw_polygon
         elif self.geometry_type == 'line':
-            for feature in self.features:
-                
-                if feature.geometry.skip_draw:
-                    continue
-                
-                pix_x, pix_y = self.map.proj2pix(*feature.geometry.get_points())
-                renderer.draw_line(canvas, feature.geometry.structure, pix_x, pix_y, feature.style)
-        
+            draw_fn = renderer.draw_line
         elif self.geometry_type == 'point':
-            for feature in self.features:
-            
-                if feature.geometry.skip_draw:
-                    continue
-                
-                pix_x, pix_y = self.map.proj2pix(*feature.geometry.get_points())
-                renderer.draw_point(canvas, feature.geometry.structure, pix_x, pix_y, feature.style)
-        
+            draw_fn = renderer.draw_point
         else:
-            pass
+            draw_fn = None
+
+        ## Convert the geometries to pixels, with geometry & part offsets as
+        ## lists, for fast lookups
+        pix_x, pix_y, geom_starts, part_counts, geom_parts, dots = self.pixel_geometries(indices, viewport)
+
+        ## Draw features in order, with those restyled last
+        order = self._draw_order(indices)
+        index_list = indices.tolist()
+        styles, default_style = self._feature_styles, self._default_style
+
+        if draw_fn:
+            for position in order:
+                index = index_list[position]
+                start, end = geom_starts[position], geom_starts[position+1]
+                geom_pix_x, geom_pix_y = pix_x[start:end], pix_y[start:end]
+                structure = part_counts[geom_parts[position]:geom_parts[position+1]]
+
+                ## Draw features that fit in a pixel as a dot, or skip them
+                if not structure:
+                    if position not in dots:
+                        continue
+                    geom_pix_x, geom_pix_y = dots[position]
+                    structure = [len(geom_pix_x)]
+
+                ## Drop or split apart vertices that failed to project
+                if index in self.invalid_geometries:
+                    geom_pix_x, geom_pix_y, structure = self.remove_invalid_vertices(geom_pix_x, geom_pix_y, structure)
+                    if not structure:
+                        continue
+
+                draw_fn(canvas, structure, geom_pix_x, geom_pix_y, styles.get(index, default_style))
 
         ## Update Status
         self.status = 'rendered'
@@ -848,12 +1656,16 @@ class VectorLayer(BaseLayer):
 
     @classmethod
     def from_gdal_layer(cls, gdal_layer):
-        ## Get scheme from layer, load into field_names
-        field_names = []
+        ## Get scheme from layer, load into field_names, & the column kind of
+        ## each field. Other field types are typed by their values
+        ogr_kinds = {ogr.OFTInteger: 'int', ogr.OFTInteger64: 'int', ogr.OFTReal: 'float', ogr.OFTString: 'string'}
+        field_names, field_kinds = [], {}
         layer_def = gdal_layer.GetLayerDefn()
         for i in range(layer_def.GetFieldCount()):
             field_def = layer_def.GetFieldDefn(i)
             field_names.append(field_def.GetName())
+            if field_def.GetType() in ogr_kinds:
+                field_kinds[field_def.GetName()] = ogr_kinds[field_def.GetType()]
         
         ## Find geometry type of layer
         test_feature = gdal_layer.GetNextFeature()
@@ -865,7 +1677,7 @@ class VectorLayer(BaseLayer):
         
         ## Create VectorLayer to hold features
         geometry_type = {"POLYGON":"polygon", "LINEARRING":"polygon", "MULTIPOLYGON":"polygon", "LINESTRING":"line", "MULTILINESTRING":"line", "POINT":"point", "MULTIPOINT":"point"}[geom_type]
-        new_layer = VectorLayer(geometry_type, field_names)
+        new_layer = VectorLayer(geometry_type, field_names, field_kinds)
 
         ## If polygon
         if geom_type in ("POLYGON", "LINEARRING", "MULTIPOLYGON"):
@@ -958,8 +1770,5 @@ class VectorLayer(BaseLayer):
                         new_geom.add_subgeometry(x_list, y_list)
         else:
             pass
-            
-        new_layer.geo_x_values = new_layer.x_values
-        new_layer.geo_y_values = new_layer.y_values
 
         return new_layer
\ No newline at end of file
@@ -0,0 +1,238 @@
+"""
+Project: PyMapKit
+File: viewport.py
+Title: Viewport Snapshot
+Function: Provides an immutable snapshot of the map view, computed once per
+    render and passed to every layer.
+Author: Ben Knisley [benknisley@gmail.com]
+Created: 16 October, 2026
+"""
+import math
+from dataclasses import dataclass, field
+import numpy as np
+from .buffers import affine_into
+from .tile_layer import nearest_zoom
+
+
+@dataclass(frozen=True)
+class Viewport:
+    """
+    An immutable snapshot of the map view.
+
+    Holds everything layers need to draw a frame: the canvas size, the view
+    location and scale, the affine from projection to pixel coordinates, and
+    the bounds of the view. Derived values are computed once, when the
+    viewport is created, and the map can keep changing while a frame renders
+    without affecting it. Created with Map.get_viewport.
+    """
+    ## Size of the canvas in pixels
+    width: int
+    height: int
+
+    ## Projected location of the center of the view, & scale in units/pixel
+    proj_x: float
+    proj_y: float
+    proj_scale: float
+
+    ## Scale in meters/pixel, None if the projection unit is not supported
+    scale: float = None
+
+    ## Geographic location of the center of the view as (latitude, longitude)
+    location: tuple = None
+
+    ## Geographic bounds of the view as (min_x, min_y, max_x, max_y)
+    geo_bounds: tuple = None
+
+    ## Pixel rectangle of the canvas being drawn, as (x, y, width, height). 
+    ## None for the whole canvas. Limits proj_bounds, so layers cull to it
+    region: tuple = None
+
+    ## Derived values, set from the fields above
+    half_width: int = field(init=False)
+    half_height: int = field(init=False)
+    x_factor: float = field(init=False)
+    y_factor: float = field(init=False)
+    unit_factor: float = field(init=False)
+    proj_bounds: tuple = field(init=False)
+    tile_zoom: int = field(init=False)
+
+    def __post_init__(self):
+        """ Computes the derived values of the viewport """
+        ## Frozen dataclasses must set attributes through object
+        set_value = lambda name, value: object.__setattr__(self, name, value)
+
+        ## Pixel offset of the view center, & the affine scale factors
+        set_value('half_width', int(self.width / 2))
+        set_value('half_height', int(self.height / 2))
+        set_value('x_factor', 1.0 / self.proj_scale)
+        set_value('y_factor', -1.0 / self.proj_scale)
+
+        ## Meters per projection unit
+        unit_factor = None
+        if self.scale is not None:
+            unit_factor = self.scale / self.proj_scale
+        set_value('unit_factor', unit_factor)
+
+        ## Projected bounds of the drawn region of the canvas
+        x, y, width, height = self.region or (0, 0, self.width, self.height)
+        set_value('proj_bounds', (
+            self.proj_x + (x - self.half_width) * self.proj_scale,
+            self.proj_y - (y + height - self.half_height) * self.proj_scale,
+            self.proj_x + (x + width - self.half_width) * self.proj_scale,
+            self.proj_y - (y - self.half_height) * self.proj_scale,
+        ))
+
+        ## Web map tile zoom level nearest the scale
+        tile_zoom = None
+        if self.scale:
+            tile_zoom = nearest_zoom(self.scale)
+        set_value('tile_zoom', tile_zoom)
+
+    def proj2pix(self, proj_x, proj_y, out=None):
+        """
+        Converts projection coordinates to canvas pixel coordinates.
+
+        Works exactly like Map.proj2pix, but for the snapshot view. Lists are
+        rounded to whole pixels, numpy arrays are returned as unrounded arrays.
+
+        Args:
+            proj_x (int | float | list | numpy.ndarray): The input projected x
+            value(s) to convert.
+
+            proj_y (int | float | list | numpy.ndarray): The input projected y
+            value(s) to convert.
+
+        Optional Args:
+            out (tuple): A pair of numpy arrays, the same size as the input, to
+            write the output values into. If given, the pair is returned.
+
+        Returns:
+            canvas_x (int | float | list | numpy.ndarray): The output pixel x
+            value(s).
+
+            canvas_y (int | float | list | numpy.ndarray): The output pixel y
+            value(s).
+        """
+        ## Convert list to numpy array
+        list_flag = isinstance(proj_x, list)
+        if list_flag:
+            proj_x = np.array(proj_x, dtype=float)
+            proj_y = np.array(proj_y, dtype=float)
+
+        ## Do math logic on singlet points
+        if not isinstance(proj_x, np.ndarray):
+            pix_x = ((proj_x - self.proj_x) / self.proj_scale) + self.half_width
+            pix_y = -((proj_y - self.proj_y) / self.proj_scale) + self.half_height
+            return pix_x, pix_y
+
+        ## Apply the view affine to vectorized points
+        if out is None:
+            pix_x, pix_y = np.empty(proj_x.shape), np.empty(proj_y.shape)
+        else:
+            pix_x, pix_y = out
+        affine_into(proj_x, self.proj_x, self.x_factor, self.half_width, pix_x)
+        affine_into(proj_y, self.proj_y, self.y_factor, self.half_height, pix_y)
+
+        if out is not None:
+            return out
+
+        ## Round and convert numpy array to list
+        if list_flag:
+            pix_x = np.rint(pix_x).astype(int).tolist()
+            pix_y = np.rint(pix_y).astype(int).tolist()
+
+        return pix_x, pix_y
+
+    def intersects(self, min_x, min_y, max_x, max_y):
+        """
+        Returns whether a projected bounding box overlaps the view.
+
+        Args:
+            min_x (float): The minimum x projection coordinate of the box.
+
+            min_y (float): The minimum y projection coordinate of the box.
+
+            max_x (float): The maximum x projection coordinate of the box.
+
+            max_y (float): The maximum y projection coordinate of the box.
+
+        Returns:
+            intersects (bool): True if the box overlaps the view.
+        """
+        view_min_x, view_min_y, view_max_x, view_max_y = self.proj_bounds
+        return (max_x >= view_min_x and min_x <= view_max_x
+            and max_y >= view_min_y and min_y <= view_max_y)
+
+    def bbox_region(self, min_x, min_y, max_x, max_y, padding=0):
+        """
+        Returns the pixel region of the canvas covered by a projected box.
+
+        The region is rounded out to whole pixels, padded, and limited to the
+        canvas.
+
+        Args:
+            min_x (float): The minimum x projection coordinate of the box.
+
+            min_y (float): The minimum y projection coordinate of the box.
+
+            max_x (float): The maximum x projection coordinate of the box.
+
+            max_y (float): The maximum y projection coordinate of the box.
+
+        Optional Args:
+            padding (int): The number of pixels to pad the region by on each 
+            side. Defaults to 0.
+
+        Returns:
+            region (tuple | None): The region as (x, y, width, height), or 
+            None if the box is not on the canvas.
+        """
+        left, top = self.proj2pix(min_x, max_y)
+        right, bottom = self.proj2pix(max_x, min_y)
+
+        left = max(math.floor(left) - padding, 0)
+        top = max(math.floor(top) - padding, 0)
+        right = min(math.ceil(right) + padding, self.width)
+        bottom = min(math.ceil(bottom) + padding, self.height)
+
+        if right <= left or bottom <= top:
+            return None
+        return (left, top, right - left, bottom - top)
+
+
+def exposed_regions(width, height, shift_x, shift_y):
+    """
+    Returns the pixel regions of a canvas left uncovered by shifting it.
+
+    Regions do not overlap. The first covers the columns uncovered by the x 
+    shift, for the full height. The second covers the rows uncovered by the y 
+    shift, without the columns already covered.
+
+    Args:
+        width (int): The width in pixels of the canvas.
+
+        height (int): The height in pixels of the canvas.
+
+        shift_x (int): The number of pixels the canvas is shifted right.
+
+        shift_y (int): The number of pixels the canvas is shifted down.
+
+    Returns:
+        regions (list): The uncovered regions, as (x, y, width, height).
+    """
+    regions = []
+
+    ## Columns uncovered by the x shift
+    if shift_x > 0:
+        regions.append((0, 0, shift_x, height))
+    elif shift_x < 0:
+        regions.append((width + shift_x, 0, -shift_x, height))
+
+    ## Rows uncovered by the y shift, between those columns
+    min_x, max_x = max(shift_x, 0), width + min(shift_x, 0)
+    if shift_y > 0:
+        regions.append((min_x, 0, max_x - min_x, shift_y))
+    elif shift_y < 0:
+        regions.append((min_x, height + shift_y, max_x - min_x, -shift_y))
+
+    return regions
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Author: Ben Knisley [benknisley@gmail.com]
+Date: 16 October, 2026
+"""
+import pytest
+import numpy as np
+from pymapkit.attributes import AttributeTable, AttributeRow, NumericColumn, StringColumn, ObjectColumn, new_column
+
+
+def test_numeric_column():
+    """ Test NumericColumn holding typed values & a null mask """
+    column = new_column('int', [3, None, 7])
+    assert isinstance(column, NumericColumn)
+    assert column.values.dtype == np.int64
+    assert column.null_mask.tolist() == [False, True, False]
+    assert column[0] == 3 and column[1] is None
+    assert type(column[2]) is int
+
+    ## Test whole column comparisons skip missing values
+    assert column.compare('>', 2).tolist() == [True, False, True]
+    assert column.compare('!=', 3).tolist() == [False, False, True]
+    assert column.compare('==', 'abc').tolist() == [False, False, False]
+
+    ## Test float columns hold ints, & missing values as nan
+    column = new_column('float', [1, None])
+    assert column.accepts(2) and not column.accepts('2')
+    assert column.tolist() == [1.0, None]
+    assert np.isnan(column.values[1])
+
+
+def test_string_column():
+    """ Test StringColumn dictionary encoding its values """
+    column = new_column('string', ['a', 'b', None, 'a'])
+    assert column.categories == ['a', 'b']
+    assert column.codes.tolist() == [0, 1, -1, 0]
+    assert column.null_mask.tolist() == [False, False, True, False]
+    assert column.tolist() == ['a', 'b', None, 'a']
+
+    column[1] = 'c'
+    assert column[1] == 'c'
+    assert column.compare('==', 'a').tolist() == [True, False, False, True]
+    assert column.compare('>', 'a').tolist() == [False, True, False, False]
+
+
+def test_attribute_table():
+    """ Test AttributeTable typing columns by their values """
+    table = AttributeTable(['name', 'count'], {'count': 'int'})
+    for _ in range(3):
+        table.append_row()
+    assert len(table) == 3
+    assert table.row(0) == {'name': None, 'count': None}
+
+    ## Test untyped columns are typed by their first value
+    table.set(0, 'name', 'first')
+    assert isinstance(table.column('name'), StringColumn)
+    assert table.get(0, 'name') == 'first'
+
+    ## Test columns are converted to hold new kinds of values
+    table.set(1, 'count', 2)
+    table.set(2, 'count', 2.5)
+    assert table.column('count').kind == 'float'
+    assert table.column('count').tolist() == [None, 2.0, 2.5]
+    table.set(2, 'name', 5)
+    assert isinstance(table.column('name'), ObjectColumn)
+    assert table.column('name').tolist() == ['first', None, 5]
+
+    ## Test new fields get a column
+    table.set(1, 'extra', True)
+    assert table.column('extra').tolist() == [None, True, None]
+
+def test_attribute_row():
+    """ Test AttributeRow reading and writing through to its table """
+    table = AttributeTable(['name', 'count'])
+    table.append_row()
+    row = AttributeRow(table, 0)
+    assert dict(row) == {'name': None, 'count': None}
+
+    ## Test setting values writes to the table's columns
+    row['count'] = 3
+    row['extra'] = 'new'
+    assert table.get(0, 'count') == 3
+    assert row == {'name': None, 'count': 3, 'extra': 'new'}
+
+    ## Test fields can not be deleted from one row
+    with pytest.raises(TypeError):
+        del row['name']
@@ -3,6 +3,7 @@
 Author: Ben Knisley [benknisley@gmail.com]
 Date: 29 June, 2020
 """
+import threading
 import pytest
 from unittest.mock import Base, MagicMock
 import pymapkit as pmk
@@ -157,3 +158,87 @@ def test_baselayer_focus():
     ## Reset mocks
     mock_map.set_scale.reset_mock()
     mock_map.set_projection_coordinates.reset_mock()
+
+def test_baselayer_refresh():
+    """
+    Test BaseLayer.mark_stale and BaseLayer.refresh methods
+    """
+    l = pmk.base_layer.BaseLayer()
+    l.activate = MagicMock()
+
+    ## Test that refresh does nothing when layer is not stale
+    l.map = MockMap()
+    l.refresh()
+    l.activate.assert_not_called()
+
+    ## Test that refresh reactivates a stale layer only once
+    l.mark_stale()
+    assert l.stale == True
+    l.refresh()
+    l.refresh()
+    l.activate.assert_called_once()
+    assert l.stale == False
+
+    ## Test that a failed refresh leaves the layer stale
+    l.activate.side_effect = RuntimeError
+    l.mark_stale()
+    with pytest.raises(RuntimeError):
+        l.refresh()
+    assert l.stale == True
+
+def test_baselayer_refresh_concurrent():
+    """
+    Test BaseLayer.refresh waits for, and repeats, a refresh in progress
+    """
+    l = pmk.base_layer.BaseLayer()
+    l.map = MockMap()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def activate():
+        calls.append(l.stale)
+        if len(calls) == 1:
+            started.set()
+            release.wait(5)
+    l.activate = activate
+
+    ## Start a refresh on another thread, and wait until it is activating
+    l.mark_stale()
+    worker = threading.Thread(target=l.refresh)
+    worker.start()
+    started.wait(5)
+
+    ## Test that the layer stays stale while it is activating
+    assert l.stale == True
+
+    ## Test that marking stale during activate causes another activate
+    l.mark_stale()
+    waiter = threading.Thread(target=l.refresh)
+    waiter.start()
+    release.set()
+    worker.join(5)
+    waiter.join(5)
+    assert len(calls) == 2
+    assert l.stale == False
+
+def test_baselayer_mark_dirty():
+    """
+    Test BaseLayer.mark_dirty, and version changes on (re)activation
+    """
+    l = pmk.base_layer.BaseLayer()
+    l.activate = MagicMock()
+    assert l.version == 0
+
+    ## Test mark_dirty increments the version
+    l.mark_dirty()
+    assert l.version == 1
+
+    ## Test activating and refreshing a stale layer change the version
+    l._activate(MockMap())
+    assert l.version == 2
+    l.refresh()
+    assert l.version == 2
+    l.mark_stale()
+    l.refresh()
+    assert l.version == 3
@@ -350,4 +350,52 @@ def test_clear_cache():
     s.clear_cache()
 
     ## Test that the renderer was cleared
-    assert s.cached_renderer_fn == None
\ No newline at end of file
+    assert s.cached_renderer_fn == None
+
+def build_test_style(style):
+    """ Builds a small style profile, for compiling """
+    style.add_property('opacity', 1)
+    style.add_domain('fill')
+    style.add_mode('none', 'fill')
+    style.add_mode('basic', 'fill')
+    style.add_mode('image', 'fill')
+    style.add_property('color', 'green', 'basic', 'fill')
+    style.add_property('opacity', 1, 'basic', 'fill')
+    style.add_property('opacity', 1, 'image', 'fill')
+    style.set_mode('basic', 'fill')
+
+def test_compiled_style():
+    """ Test CompiledStyle compiling a style profile into a class """
+    style_class = pmk.CompiledStyle.compile(build_test_style)
+
+    ## Assert the class is compiled once per schema
+    assert pmk.CompiledStyle.compile(build_test_style) is style_class
+
+    ## Assert new styles have the default profile, & no instance dict
+    f = MockFeature()
+    s = style_class(f)
+    assert not hasattr(s, '__dict__')
+    assert s.feature is f
+    assert s.get_fill_display() == 'basic'
+    assert s['fill_color'] == s.fill_color == s.get_fill_color() == 'green'
+
+    ## Assert descriptors set properties, & clear the cache
+    s.cached_renderer_fn = object()
+    s.fill_color = 'red'
+    assert s['fill_color'] == 'red'
+    assert s.cached_renderer_fn == None
+
+    ## Assert switching modes keeps shared properties, & removes others
+    s.fill_opacity = 0.5
+    s.set_mode('image', 'fill')
+    assert s.managed_properties['fill_mode'] == 'image'
+    assert s.fill_opacity == 0.5
+    assert 'fill_color' not in s.managed_properties
+    with pytest.raises(AttributeError):
+        s.fill_color
+
+    ## Assert copies are independent, & defaults are unchanged
+    c = s.copy()
+    c.set_mode('none', 'fill')
+    assert s.get_fill_display() == 'image'
+    assert style_class(f).fill_color == 'green'
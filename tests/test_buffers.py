@@ -0,0 +1,71 @@
+"""
+Author: Ben Knisley [benknisley@gmail.com]
+Date: 16 October, 2026
+"""
+import pytest
+import numpy as np
+import pymapkit as pmk
+from pymapkit.buffers import BufferPool, affine_into
+
+
+def test_buffer_pool_get():
+    """ Test BufferPool.get """
+    pool = BufferPool()
+
+    ## Test buffers have requested size and type
+    buf_x, buf_y = pool.get('test', 10, np.float32)
+    assert len(buf_x) == 10
+    assert len(buf_y) == 10
+    assert buf_x.dtype == np.float32
+
+    ## Test that smaller and equal requests reuse the same storage
+    small_x, _ = pool.get('test', 5, np.float32)
+    assert np.shares_memory(small_x, buf_x)
+
+    ## Test that different names and types get separate storage
+    other_x, _ = pool.get('other', 10, np.float32)
+    assert not np.shares_memory(other_x, buf_x)
+    double_x, _ = pool.get('test', 10, np.float64)
+    assert double_x.dtype == np.float64
+
+    ## Test that larger requests grow the storage
+    big_x, _ = pool.get('test', 100000, np.float32)
+    assert len(big_x) == 100000
+
+def test_affine_into():
+    """ Test affine_into function """
+    values = np.arange(10, dtype=float) + 1e7
+    expected = (values - 1e7) * 0.5 + 3
+
+    ## Test float64 output, in blocks smaller than input
+    out = np.empty(10)
+    result = affine_into(values, 1e7, 0.5, 3, out, block_size=3)
+    assert result is out
+    assert out.tolist() == pytest.approx(expected.tolist())
+
+    ## Test float32 output keeps precision for large offsets
+    out = np.empty(10, dtype=np.float32)
+    affine_into(values, 1e7, 0.5, 3, out)
+    assert out.tolist() == pytest.approx(expected.tolist())
+
+    ## Test in place
+    affine_into(values, 1e7, 0.5, 3, values)
+    assert values.tolist() == pytest.approx(expected.tolist())
+
+def test_map_geo2pix_reuses_buffers():
+    """ Test Map.geo2pix writes into float32 buffers across frames """
+    m = pmk.Map()
+    m.set_location(40, -83)
+    m.set_scale(5000)
+    geo_x = np.array([-83.0, -82.5, -83.5])
+    geo_y = np.array([40.0, 40.5, 39.5])
+    out = (np.empty(3, dtype=np.float32), np.empty(3, dtype=np.float32))
+
+    ## Render two "frames" with a pan in between
+    for pan in (0, 100):
+        m.set_projection_coordinates(m.proj_x + pan, m.proj_y)
+        pix_x, pix_y = m.geo2pix(geo_x, geo_y, out=out)
+        assert pix_x is out[0]
+        expected_x, expected_y = m.proj2pix(*m.geo2proj(geo_x, geo_y))
+        assert pix_x.tolist() == pytest.approx(expected_x.tolist(), abs=1e-3)
+        assert pix_y.tolist() == pytest.approx(expected_y.tolist(), abs=1e-3)
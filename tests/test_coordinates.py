@@ -0,0 +1,74 @@
+"""
+Author: Ben Knisley [benknisley@gmail.com]
+Date: 16 October, 2026
+"""
+import numpy as np
+from pymapkit.coordinates import GrowableArray, CoordinateStore
+
+
+def test_growable_array():
+    """ Test GrowableArray methods """
+    array = GrowableArray(capacity=2)
+    assert len(array) == 0
+
+    ## Test appending & extending past the capacity
+    array.append(1.0)
+    array.extend([2.0, 3.0, 4.0])
+    assert array.values.tolist() == [1.0, 2.0, 3.0, 4.0]
+    assert array.values.dtype == np.float64
+
+    ## Test inserting moves following values back
+    array.insert(1, [5.0, 6.0])
+    assert array.values.tolist() == [1.0, 5.0, 6.0, 2.0, 3.0, 4.0]
+
+    ## Test setting replaces the values, including with a view of itself
+    array.set(array.values)
+    assert array.values.tolist() == [1.0, 5.0, 6.0, 2.0, 3.0, 4.0]
+    array.set([7, 8])
+    assert array.values.tolist() == [7.0, 8.0]
+
+
+def test_coordinate_store():
+    """ Test CoordinateStore adding geometries and parts """
+    store = CoordinateStore()
+
+    ## Two geometries, the first with two parts
+    assert store.add_geometry() == 0
+    store.add_part(0, [0.0, 1.0, 2.0], [0.0, 1.0, 2.0])
+    store.add_part(0, [3.0, 4.0], [3.0, 4.0])
+    assert store.add_geometry() == 1
+    store.add_part(1, [5.0], [5.0])
+
+    assert len(store) == 6
+    assert store.geometry_count() == 2
+    assert store.part_offsets.values.tolist() == [0, 3, 5, 6]
+    assert store.geom_offsets.values.tolist() == [0, 2, 3]
+    assert store.geometry_range(0) == (0, 5)
+    assert store.part_counts(0).tolist() == [3, 2]
+
+    ## Test adding a part to an earlier geometry inserts it
+    store.add_part(0, [9.0, 9.0], [8.0, 8.0])
+    assert store.x.values.tolist() == [0.0, 1.0, 2.0, 3.0, 4.0, 9.0, 9.0, 5.0]
+    assert store.part_offsets.values.tolist() == [0, 3, 5, 7, 8]
+    assert store.geom_offsets.values.tolist() == [0, 3, 4]
+    assert store.geometry_range(1) == (7, 8)
+
+
+def test_geometry_extents():
+    """ Test CoordinateStore.geometry_extents """
+    store = CoordinateStore()
+    store.add_geometry()
+    store.add_part(0, [0.0, 2.0, 1.0], [5.0, 3.0, 4.0])
+    store.add_geometry()
+    store.add_geometry()
+    store.add_part(2, [np.inf, 7.0], [np.nan, 8.0])
+    store.add_geometry()
+    store.add_part(3, [np.nan], [np.nan])
+
+    min_x, min_y, max_x, max_y = store.geometry_extents(store.x.values, store.y.values)
+
+    ## Test invalid vertices are left out, & empty geometries are inverted
+    assert min_x.tolist() == [0.0, np.inf, 7.0, np.inf]
+    assert min_y.tolist() == [3.0, np.inf, 8.0, np.inf]
+    assert max_x.tolist() == [2.0, -np.inf, 7.0, -np.inf]
+    assert max_y.tolist() == [5.0, -np.inf, 8.0, -np.inf]
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Author: Ben Knisley [benknisley@gmail.com]
+Date: 16 October, 2026
+"""
+import numpy as np
+import pytest
+from pymapkit import hit_testing
+
+
+## A square ring with a square hole, and a two part line
+SQUARE_X = [0.0, 10, 10, 0, 0, 4, 6, 6, 4, 4]
+SQUARE_Y = [0.0, 0, 10, 10, 0, 4, 4, 6, 6, 4]
+SQUARE_PARTS = np.array([0, 5, 10])
+LINE_X = [0.0, 10, 20, 20]
+LINE_Y = [0.0, 0, 0, 10]
+LINE_PARTS = np.array([0, 2, 4])
+
+
+def pairs(query, start, end):
+    """ Returns arrays pairing each query point with one geometry range """
+    count = len(query)
+    query_x = np.array([x for x, _ in query], dtype=float)
+    query_y = np.array([y for _, y in query], dtype=float)
+    return query_x, query_y, np.full(count, start), np.full(count, end)
+
+
+def test_expand_ranges():
+    """ Test expand_ranges listing the indices of each range """
+    range_index, indices = hit_testing.expand_ranges(np.array([2, 7, 7]), np.array([4, 7, 9]))
+    assert range_index.tolist() == [0, 0, 2, 2]
+    assert indices.tolist() == [2, 3, 7, 8]
+
+
+def test_points_in_polygons():
+    """ Test points_in_polygons leaving out points in holes """
+    query = [(1, 1), (5, 5), (9, 5), (11, 5), (-1, -1)]
+    query_x, query_y, starts, ends = pairs(query, 0, 10)
+    inside = hit_testing.points_in_polygons(query_x, query_y, np.array(SQUARE_X), np.array(SQUARE_Y),
+        SQUARE_PARTS, starts, ends)
+    assert inside.tolist() == [True, False, True, False, False]
+
+
+def test_polyline_distances():
+    """ Test polyline_distances only measuring segments within parts """
+    query = [(5, 3), (-3, 4), (15, 0), (20, 12)]
+    query_x, query_y, starts, ends = pairs(query, 0, 4)
+    distances = hit_testing.polyline_distances(query_x, query_y, np.array(LINE_X), np.array(LINE_Y),
+        LINE_PARTS, starts, ends)
+    assert distances.tolist() == pytest.approx([3, 5, 5, 2])
+
+
+def test_point_distances():
+    """ Test point_distances finding the nearest valid vertex """
+    x_values, y_values = np.array([0.0, np.nan, 10]), np.array([0.0, np.nan, 0])
+    query_x, query_y, starts, ends = pairs([(8, 1), (1, -3)], 0, 3)
+    distances = hit_testing.point_distances(query_x, query_y, x_values, y_values, starts, ends)
+    assert distances.tolist() == [2, 3]
+
+    ## Test geometries without valid vertices are infinitely far
+    distances = hit_testing.point_distances(query_x, query_y, x_values, y_values, 
+        np.array([1, 1]), np.array([2, 2]))
+    assert distances.tolist() == [np.inf, np.inf]
@@ -17,6 +17,8 @@ class MockLayer:
         self._activate = MagicMock()
         self._deactivate = MagicMock()
         self.render = MagicMock()
+        self.mark_stale = MagicMock()
+        self.refresh = MagicMock()
 
 class mock_renderer:
     def __init__(self):
@@ -106,9 +108,11 @@ def test_set_projection():
     assert m.transform_geo2proj.is_exact_same(old_transform_geo2proj) == False
     assert m.transform_proj2geo.is_exact_same(old_transform_proj2geo) == False
 
-    ## Check that method calls layer activate method
-    mock_layer1.activate.assert_called_once()
-    mock_layer2.activate.assert_called_once()
+    ## Check that method marks layers stale, without reactivating them
+    mock_layer1.mark_stale.assert_called_once()
+    mock_layer2.mark_stale.assert_called_once()
+    mock_layer1.activate.assert_not_called()
+    mock_layer2.activate.assert_not_called()
 
 def test_set_geographic_crs():
     """ Test Map.set_projection method """
@@ -140,9 +144,64 @@ def test_set_geographic_crs():
     assert m.transform_geo2proj.is_exact_same(old_transform_geo2proj) == False
     assert m.transform_proj2geo.is_exact_same(old_transform_proj2geo) == False
 
-    ## Check that method calls layer activate method
-    mock_layer1.activate.assert_called_once()
-    mock_layer2.activate.assert_called_once()
+    ## Check that method marks layers stale, without reactivating them
+    mock_layer1.mark_stale.assert_called_once()
+    mock_layer2.mark_stale.assert_called_once()
+    mock_layer1.activate.assert_not_called()
+    mock_layer2.activate.assert_not_called()
+
+def test_set_projection_background():
+    """ Test Map.set_projection refreshing layers in the background """
+    m = pmk.Map()
+    mock_layer = MockLayer()
+    m.add(mock_layer)
+
+    m.set_projection('EPSG:32023', background=True)
+    m.close()
+    assert m._executor is None
+
+    mock_layer.mark_stale.assert_called_once()
+    mock_layer.refresh.assert_called_once()
+
+def test_set_approximate():
+    """ Test Map.set_approximate method """
+    m = pmk.Map()
+    mock_layer = MockLayer()
+    m.add(mock_layer)
+
+    ## Test invalid tolerance raises exception
+    with pytest.raises(ValueError):
+        m.set_approximate(0)
+
+    ## Test setting a tolerance marks layers stale
+    m.set_approximate(0.5)
+    mock_layer.mark_stale.assert_called_once()
+    mock_layer.mark_stale.reset_mock()
+
+    ## Test large arrays are approximated within tolerance
+    m.set_scale(100)
+    geo_x = np.random.default_rng(0).uniform(-120, -70, 20000)
+    geo_y = np.random.default_rng(1).uniform(25, 50, 20000)
+    proj_x, proj_y = m.geo2proj(geo_x, geo_y)
+    exact_x, exact_y = m.transform_geo2proj.transform(geo_x, geo_y)
+    assert np.hypot(proj_x - exact_x, proj_y - exact_y).max() <= m.get_approx_tolerance()
+
+    ## Test converting arrays doesn't change when layers are reprojected
+    m.set_scale(1000)
+    m.geo2proj(geo_x, geo_y)
+    m.set_scale(100)
+    mock_layer.mark_stale.assert_not_called()
+
+    ## Test zooming in past a layer's approximation accuracy marks it stale
+    mock_layer.projection_tolerance = m.get_approx_tolerance()
+    m.set_scale(60)
+    mock_layer.mark_stale.assert_not_called()
+    m.set_scale(40)
+    mock_layer.mark_stale.assert_called_once()
+
+    ## Test disabling approximation
+    m.set_approximate(None)
+    assert m.get_approx_tolerance() == None
 
 def test_set_location():
     """ Test Map.set_projection method """
@@ -368,10 +427,12 @@ def test_render():
     ## Assert that draw_background was called
     mock_renderer_obj.draw_background.assert_called_once()
 
-    ## Assert the each layer had draw method called
-    new_layer1.render.assert_called_once_with(mock_renderer_obj, mock_renderer_obj)
-    new_layer2.render.assert_called_once_with(mock_renderer_obj, mock_renderer_obj)
-    new_layer3.render.assert_called_once_with(mock_renderer_obj, mock_renderer_obj)
+    ## Assert the each layer had draw method called, with a shared viewport
+    viewport = new_layer1.render.call_args[0][2]
+    assert isinstance(viewport, pmk.viewport.Viewport)
+    new_layer1.render.assert_called_once_with(mock_renderer_obj, mock_renderer_obj, viewport)
+    new_layer2.render.assert_called_once_with(mock_renderer_obj, mock_renderer_obj, viewport)
+    new_layer3.render.assert_called_once_with(mock_renderer_obj, mock_renderer_obj, viewport)
     ## Assert that save was called 
     mock_renderer_obj.save.assert_called_once_with(mock_renderer_obj, None)
 
@@ -385,6 +446,213 @@ def test_render():
     ## Assert that save was called 
     mock_renderer_obj.save.assert_called_once_with(mock_renderer_obj, "./file.png")
 
+def test_get_viewport():
+    """ Test Map.get_viewport method """
+    m = pmk.Map()
+    m.set_size(400, 300)
+    m.set_location(40, -83)
+    m.set_scale(100)
+
+    viewport = m.get_viewport()
+
+    ## Test viewport holds the current view
+    assert (viewport.width, viewport.height) == (400, 300)
+    assert viewport.proj_scale == m._proj_scale
+    assert viewport.scale == m.get_scale()
+    assert viewport.location == pytest.approx(m.get_location())
+    assert viewport.tile_zoom == 11
+
+    ## Test viewport conversions match the map
+    assert viewport.proj2pix(m.proj_x + 500, m.proj_y - 500) == m.proj2pix(m.proj_x + 500, m.proj_y - 500)
+    assert viewport.proj2pix([m.proj_x], [m.proj_y]) == ([200], [150])
+    assert viewport.proj_bounds == pytest.approx((m.proj_x - 20000, m.proj_y - 15000, m.proj_x + 20000, m.proj_y + 15000))
+    min_lon, min_lat, max_lon, max_lat = viewport.geo_bounds
+    assert min_lon < -83 < max_lon and min_lat < 40 < max_lat
+
+    ## Test viewport is unchanged by, and can't be changed like, the map
+    m.set_location(0, 0)
+    assert viewport.location == pytest.approx((40, -83))
+    with pytest.raises(AttributeError):
+        viewport.proj_x = 0
+
+    ## Test intersection with projected boxes
+    assert viewport.intersects(viewport.proj_x - 1, viewport.proj_y - 1, viewport.proj_x + 1, viewport.proj_y + 1)
+    assert not viewport.intersects(0, 0, 1, 1)
+
+def test_render_parallel():
+    """ Test map.render method with parallel offscreen rendering """
+    m = pmk.Map()
+
+    mock_renderer_obj = mock_renderer()
+    mock_renderer_obj.supports_offscreen = True
+    mock_renderer_obj.new_offscreen = MagicMock(side_effect=lambda width, height: MagicMock())
+    mock_renderer_obj.offscreen_canvas = MagicMock(side_effect=lambda offscreen: offscreen.canvas)
+    mock_renderer_obj.draw_offscreen = MagicMock()
+    m.set_renderer(mock_renderer_obj)
+
+    ## Create mock layers, with different opacities
+    layers = [MockLayer() for _ in range(3)]
+    for opacity, layer in zip((1, 0.5, 1), layers):
+        layer.opacity = opacity
+        m.add(layer)
+
+    ## Test serial render only uses an offscreen surface for the translucent layer
+    m.render()
+    assert mock_renderer_obj.new_offscreen.call_count == 1
+    layers[0].render.assert_called_once_with(mock_renderer_obj, mock_renderer_obj, m.get_viewport())
+
+    ## Test parallel render draws each layer onto its own surface
+    mock_renderer_obj.new_offscreen.reset_mock()
+    mock_renderer_obj.draw_offscreen.reset_mock()
+    m.set_parallel_render(True, workers=2)
+    m.render()
+
+    assert mock_renderer_obj.new_offscreen.call_count == 3
+    for layer in layers:
+        offscreen_canvas = layer.render.call_args[0][1]
+        assert offscreen_canvas is not mock_renderer_obj
+
+    ## Test surfaces are composited in layer order, with layer opacity
+    opacities = [c.kwargs['opacity'] for c in mock_renderer_obj.draw_offscreen.call_args_list]
+    assert opacities == [1, 0.5, 1]
+    composited = [c.args[1].canvas for c in mock_renderer_obj.draw_offscreen.call_args_list]
+    assert composited == [layer.render.call_args[0][1] for layer in layers]
+
+    ## Test a parallel render clears pending invalidations
+    m.invalidate((m.proj_x, m.proj_y, m.proj_x + 1, m.proj_y + 1))
+    m.render()
+    assert m._invalid_boxes == []
+
+def test_render_cached():
+    """ Test map.render method with cached layer surfaces """
+    m = pmk.Map()
+
+    mock_renderer_obj = mock_renderer()
+    mock_renderer_obj.supports_offscreen = True
+    mock_renderer_obj.new_offscreen = MagicMock(side_effect=lambda width, height: MagicMock())
+    mock_renderer_obj.offscreen_canvas = MagicMock(side_effect=lambda offscreen: offscreen.canvas)
+    mock_renderer_obj.draw_offscreen = MagicMock()
+    m.set_renderer(mock_renderer_obj)
+    m.set_layer_cache(True)
+
+    layers = [MockLayer() for _ in range(3)]
+    for layer in layers:
+        layer.version = 0
+        m.add(layer)
+
+    ## Test first render draws every layer
+    m.render()
+    assert mock_renderer_obj.new_offscreen.call_count == 3
+    assert mock_renderer_obj.draw_offscreen.call_count == 3
+
+    ## Test only layers with a new version are redrawn, all are composited
+    layers[2].version += 1
+    m.render()
+    assert [layer.render.call_count for layer in layers] == [1, 1, 2]
+    assert mock_renderer_obj.draw_offscreen.call_count == 6
+
+    ## Test composited surfaces are in layer order
+    composited = [c.args[1].canvas for c in mock_renderer_obj.draw_offscreen.call_args_list[3:]]
+    assert composited == [layer.render.call_args[0][1] for layer in layers]
+
+    ## Test changing the view redraws every layer
+    m.set_scale(m.get_scale() * 2)
+    m.render()
+    assert [layer.render.call_count for layer in layers] == [2, 2, 3]
+
+    ## Test removing a layer, and disabling the cache, drop cached surfaces
+    m.remove(layers[0])
+    assert len(m._layer_surfaces) == 2
+    m.set_layer_cache(False)
+    assert len(m._layer_surfaces) == 0
+
+def test_render_cached_pan():
+    """ Test map.render shifting cached layer surfaces when the view pans """
+    m = pmk.Map()
+
+    mock_renderer_obj = mock_renderer()
+    mock_renderer_obj.supports_offscreen = True
+    mock_renderer_obj.new_offscreen = MagicMock(side_effect=lambda width, height: MagicMock())
+    mock_renderer_obj.offscreen_canvas = MagicMock(side_effect=lambda offscreen: offscreen.canvas)
+    mock_renderer_obj.draw_offscreen = MagicMock()
+    mock_renderer_obj.push_clip = MagicMock()
+    mock_renderer_obj.pop_clip = MagicMock()
+    m.set_renderer(mock_renderer_obj)
+    m.set_layer_cache(True)
+
+    layer = MockLayer()
+    layer.version = 0
+    m.add(layer)
+    m.render()
+    cached_surface = m._layer_surfaces[id(layer)][1]
+
+    ## Test a whole pixel pan shifts the surface, & draws only the exposed strip
+    m.set_projection_coordinates(m.proj_x + 10 * m._proj_scale, m.proj_y)
+    m.render()
+    shift_call = mock_renderer_obj.draw_offscreen.call_args_list[1]
+    assert shift_call.args[1] is cached_surface
+    assert (shift_call.kwargs['x'], shift_call.kwargs['y']) == (-10, 0)
+    mock_renderer_obj.push_clip.assert_called_once_with(layer.render.call_args[0][1], 490, 0, 10, 500)
+    mock_renderer_obj.pop_clip.assert_called_once()
+
+    ## Test the layer is culled to the strip, padded by the region margin
+    viewport = layer.render.call_args[0][2]
+    assert viewport.region == (490 - m.region_margin, -m.region_margin, 10 + 2 * m.region_margin, 500 + 2 * m.region_margin)
+
+    ## Test a sub pixel pan redraws the whole layer
+    m.set_projection_coordinates(m.proj_x + 0.5 * m._proj_scale, m.proj_y)
+    m.render()
+    assert layer.render.call_args[0][2].region is None
+    mock_renderer_obj.push_clip.assert_called_once()
+
+def test_render_region():
+    """ Test map.render with a region, and map.invalidate """
+    m = pmk.Map()
+
+    mock_renderer_obj = mock_renderer()
+    mock_renderer_obj.supports_offscreen = True
+    mock_renderer_obj.new_offscreen = MagicMock(side_effect=lambda width, height: MagicMock())
+    mock_renderer_obj.offscreen_canvas = MagicMock(side_effect=lambda offscreen: offscreen.canvas)
+    for method in ('draw_offscreen', 'push_clip', 'pop_clip', 'clear_region'):
+        setattr(mock_renderer_obj, method, MagicMock())
+    m.set_renderer(mock_renderer_obj)
+
+    layers = [MockLayer() for _ in range(2)]
+    for layer in layers:
+        layer.version = 0
+        m.add(layer)
+
+    ## Test an uncached region render clears, clips and culls to the region
+    m.render(region=(10, 20, 30, 40))
+    mock_renderer_obj.clear_region.assert_called_once_with(mock_renderer_obj, 10, 20, 30, 40)
+    assert mock_renderer_obj.push_clip.call_args_list[0].args == (mock_renderer_obj, 10, 20, 30, 40)
+    for layer in layers:
+        assert layer.render.call_args[0][2].region == (10 - m.region_margin, 20 - m.region_margin, 
+            30 + 2 * m.region_margin, 40 + 2 * m.region_margin)
+
+    ## Test invalidating a layer after editing it only redraws the box
+    m.set_layer_cache(True)
+    m.render()
+    mock_renderer_obj.clear_region.reset_mock()
+    layers[1].version += 1
+    m.invalidate((m.proj_x, m.proj_y, m.proj_x + 10 * m._proj_scale, m.proj_y + 10 * m._proj_scale), layers[1], padding=2)
+    m.render()
+    assert [layer.render.call_count for layer in layers] == [2, 3]
+    surface = m._layer_surfaces[id(layers[1])][1]
+    mock_renderer_obj.clear_region.assert_called_once_with(surface.canvas, 248, 238, 14, 14)
+    assert m._invalid_boxes == []
+
+    ## Test edits not covered by an invalidated box fully redraw the layer
+    m.invalidate((m.proj_x, m.proj_y, m.proj_x + 1, m.proj_y + 1), layers[1])
+    layers[1].version += 1
+    m.render()
+    assert layers[1].render.call_args[0][2].region is None
+
+    ## Test invalidating every layer redraws the region on each
+    m.invalidate((m.proj_x, m.proj_y, m.proj_x + 1, m.proj_y + 1))
+    m.render()
+    assert [layer.render.call_args[0][2].region is not None for layer in layers] == [True, True]
+
 def test_geo2proj():
     """ Test Map.geo2proj method """
     m = pmk.Map()
@@ -614,4 +882,121 @@ def test_pix2geo():
     ## Test for expected results
     for actual_x, actual_y, expected_x, expected_y in zip(*actual, *expected):
         assert expected_x == pytest.approx(actual_x , abs=0.1)
-        assert expected_y == pytest.approx(actual_y , abs=0.1)
\ No newline at end of file
+        assert expected_y == pytest.approx(actual_y , abs=0.1)
+
+
+def test_conversions_ndarray():
+    """ Test Map conversion methods with numpy array input """
+    m = pmk.Map()
+    m.set_size(500, 500)
+    m.set_location(40, -83)
+    m.set_scale(5000)
+
+    geo_x = np.array([22.52, -3.13, -83.1, -77.1])
+    geo_y = np.array([33.45, 43.80, -31.8, -22.9])
+
+    ## Test that arrays are returned as arrays
+    proj_x, proj_y = m.geo2proj(geo_x, geo_y)
+    assert isinstance(proj_x, np.ndarray)
+    assert isinstance(proj_y, np.ndarray)
+
+    ## Test that array results match list results
+    expected = m.geo2proj(geo_x.tolist(), geo_y.tolist())
+    assert proj_x.tolist() == pytest.approx(expected[0])
+    assert proj_y.tolist() == pytest.approx(expected[1])
+
+    ## Test that proj2pix returns unrounded arrays
+    pix_x, pix_y = m.proj2pix(proj_x, proj_y)
+    assert isinstance(pix_x, np.ndarray)
+    assert np.rint(pix_x).tolist() == m.proj2pix(proj_x.tolist(), proj_y.tolist())[0]
+
+    ## Test round trip
+    back_x, back_y = m.proj2geo(proj_x, proj_y)
+    assert isinstance(back_x, np.ndarray)
+    assert back_x.tolist() == pytest.approx(geo_x.tolist())
+    assert back_y.tolist() == pytest.approx(geo_y.tolist())
+
+def test_conversions_out_buffer():
+    """ Test Map conversion methods with out buffers """
+    m = pmk.Map()
+    m.set_location(40, -83)
+    m.set_scale(5000)
+
+    geo_x = np.array([22.52, -3.13, -83.1, -77.1])
+    geo_y = np.array([33.45, 43.80, -31.8, -22.9])
+    expected_x, expected_y = m.geo2proj(geo_x, geo_y)
+
+    ## Test float64 buffers are filled and returned
+    out = (np.empty(4), np.empty(4))
+    result = m.geo2proj(geo_x, geo_y, out=out)
+    assert result[0] is out[0]
+    assert result[1] is out[1]
+    assert out[0].tolist() == pytest.approx(expected_x.tolist())
+    assert out[1].tolist() == pytest.approx(expected_y.tolist())
+
+    ## Test input is not modified
+    assert geo_x.tolist() == [22.52, -3.13, -83.1, -77.1]
+
+    ## Test float32 buffers
+    out = (np.empty(4, dtype=np.float32), np.empty(4, dtype=np.float32))
+    pix_x, pix_y = m.geo2pix(geo_x, geo_y, out=out)
+    assert pix_x is out[0]
+    expected = m.geo2pix(geo_x, geo_y)
+    assert pix_x.tolist() == pytest.approx(expected[0].tolist(), abs=0.5)
+    assert pix_y.tolist() == pytest.approx(expected[1].tolist(), abs=0.5)
+
+def test_set_invalid_policy():
+    """ Test Map.set_invalid_policy method """
+    m = pmk.Map()
+    mock_layer = MockLayer()
+    m.add(mock_layer)
+    mock_layer.activate.reset_mock()
+
+    ## Test that invalid policies raise exception
+    with pytest.raises(ValueError):
+        m.set_invalid_policy('teleport')
+
+    geo_x = np.array([10.0, 10.0, 10.0, 20.0])
+    geo_y = np.array([45.0, 100.0, 120.0, 45.0])
+    valid_x, valid_y = m.geo2proj(np.array([10.0, 20.0]), np.array([45.0, 45.0]))
+
+    ## Test fill policy uses last valid value
+    m.set_invalid_policy('fill')
+    proj_x, proj_y = m.geo2proj(geo_x, geo_y)
+    assert proj_y.tolist() == pytest.approx([valid_y[0]] * 3 + [valid_y[1]])
+    mock_layer.mark_stale.assert_called_once()
+
+    ## Test clamp policy clamps to area of use
+    m.set_invalid_policy('clamp')
+    proj_x, proj_y = m.geo2proj(geo_x, geo_y)
+    north = m.projected_crs.area_of_use.north
+    assert proj_y[1] == pytest.approx(m.geo2proj(10.0, north)[1])
+
+    ## Test drop and split policies leave nan
+    for policy in ('drop', 'split'):
+        m.set_invalid_policy(policy)
+        proj_x, proj_y = m.geo2proj(geo_x, geo_y)
+        assert np.isnan(proj_x[1:3]).all()
+        assert np.isnan(proj_y[1:3]).all()
+        assert proj_x[[0, 3]].tolist() == pytest.approx(valid_x.tolist())
+
+    ## Test the clamp bounds are cached until the projection changes
+    bounds = m.get_crs_bounds()
+    assert m.get_crs_bounds() is bounds
+    m.set_projection('EPSG:32023')
+    assert m.get_crs_bounds() is not bounds
+    assert m.get_crs_bounds()[0] == m.projected_crs.area_of_use.bounds
+
+def test_clamp_antimeridian():
+    """ Test the 'clamp' policy with an area of use crossing the antimeridian """
+    m = pmk.Map()
+    m.set_projection('EPSG:3832')
+    m.set_invalid_policy('clamp')
+    west, south, east, north = m.get_crs_bounds()[0]
+    assert west > east
+
+    ## Test invalid vertices are clamped to the nearer edge of the area
+    proj_x, proj_y = m.geo2proj(np.array([150.0, 90.0, -50.0]), np.array([95.0, 95.0, 95.0]))
+    expected_x, expected_y = m.geo2proj(np.array([150.0, west, east]), np.array([north] * 3))
+    assert proj_x.tolist() == pytest.approx(expected_x.tolist())
+    assert proj_y.tolist() == pytest.approx(expected_y.tolist())
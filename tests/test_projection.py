@@ -0,0 +1,224 @@
+"""
+Author: Ben Knisley [benknisley@gmail.com]
+Date: 16 October, 2026
+"""
+import pytest
+import numpy as np
+import pyproj
+from pymapkit import projection
+
+inf = np.inf
+nan = np.nan
+
+
+def test_fill_invalid():
+    """ Test projection.fill_invalid function """
+    ## Test runs are filled with the last valid value
+    x = np.array([1.0, inf, inf, inf, 5.0, nan, 7.0, inf])
+    y = np.array([1.0, 2.0, inf, inf, 5.0, 6.0, 7.0, 8.0])
+    projection.fill_invalid(x, y)
+    assert x.tolist() == [1.0, 1.0, 1.0, 1.0, 5.0, 5.0, 7.0, 7.0]
+    assert y.tolist() == [1.0, 1.0, 1.0, 1.0, 5.0, 5.0, 7.0, 7.0]
+
+    ## Test leading invalid values take the first valid value
+    x = np.array([inf, inf, 3.0, 4.0])
+    y = np.array([inf, 2.0, 3.0, 4.0])
+    projection.fill_invalid(x, y)
+    assert x.tolist() == [3.0, 3.0, 3.0, 4.0]
+    assert y.tolist() == [3.0, 3.0, 3.0, 4.0]
+
+    ## Test all invalid and all valid data is untouched
+    x = np.array([inf, inf])
+    projection.fill_invalid(x, x.copy())
+    assert np.isinf(x).all()
+
+def test_clamp_invalid():
+    """ Test projection.clamp_invalid function """
+    transformer = pyproj.Transformer.from_crs("EPSG:4326", "EPSG:3785", always_xy=True)
+    in_x = np.array([10.0, 10.0, 10.0])
+    in_y = np.array([45.0, 120.0, -120.0])
+    out_x, out_y = transformer.transform(in_x, in_y)
+    assert np.isinf(out_y[1])
+
+    projection.clamp_invalid(transformer, in_x, in_y, out_x, out_y, (-180, -85, 180, 85))
+    expected_x, expected_y = transformer.transform([10.0, 10.0], [85.0, -85.0])
+    assert out_x[1:].tolist() == pytest.approx(expected_x)
+    assert out_y[1:].tolist() == pytest.approx(expected_y)
+
+def test_remove_invalid():
+    """ Test projection.remove_invalid function """
+    ## Two geometries, the first with two parts
+    x = np.array([0.0, inf, inf, 3.0, 4.0, 5.0, 6.0, nan, 8.0, 9.0])
+    y = np.arange(10.0)
+    part_offsets = np.array([0, 5, 7, 10])
+    geom_offsets = np.array([0, 2, 3])
+
+    ## Test drop keeps the part structure
+    new_x, new_y, new_parts, new_geoms = projection.remove_invalid(x, y, part_offsets, geom_offsets)
+    assert new_x.tolist() == [0.0, 3.0, 4.0, 5.0, 6.0, 8.0, 9.0]
+    assert new_y.tolist() == [0.0, 3.0, 4.0, 5.0, 6.0, 8.0, 9.0]
+    assert new_parts.tolist() == [0, 3, 5, 7]
+    assert new_geoms.tolist() == [0, 2, 3]
+
+    ## Test split makes a new part at each removed run
+    new_x, new_y, new_parts, new_geoms = projection.remove_invalid(x, y, part_offsets, geom_offsets, split=True)
+    assert new_x.tolist() == [0.0, 3.0, 4.0, 5.0, 6.0, 8.0, 9.0]
+    assert new_parts.tolist() == [0, 1, 3, 5, 7]
+    assert new_geoms.tolist() == [0, 3, 4]
+
+    ## Test parts with no valid points are removed when split
+    x = np.array([inf, inf, 3.0, 4.0])
+    new_x, _, new_parts, new_geoms = projection.remove_invalid(x, x.copy(), [0, 2, 4], [0, 1, 2], split=True)
+    assert new_x.tolist() == [3.0, 4.0]
+    assert new_parts.tolist() == [0, 2]
+    assert new_geoms.tolist() == [0, 0, 1]
+
+def test_transformer_cache(monkeypatch):
+    """ Test projection.TransformerCache class """
+    cache = projection.TransformerCache(max_size=2)
+
+    ## Test same CRS pair returns the same transformer, from any input form
+    t1 = cache.get("EPSG:4326", "EPSG:3785")
+    t2 = cache.get(pyproj.crs.CRS("EPSG:4326"), pyproj.crs.CRS("EPSG:3785"))
+    assert t1 is t2
+    assert len(cache) == 1
+
+    ## Test always_xy is part of the key
+    t3 = cache.get("EPSG:4326", "EPSG:3785", always_xy=False)
+    assert t3 is not t1
+    assert t3.transform(40, -83) == pytest.approx(t1.transform(-83, 40))
+
+    ## Test least recently used transformer is dropped
+    cache.get("EPSG:4326", "EPSG:3785")
+    cache.get("EPSG:4326", "EPSG:32023")
+    assert len(cache) == 2
+    assert cache.get("EPSG:4326", "EPSG:3785") is t1
+
+    ## Test a cache hit does not serialize the CRSs
+    source, target = pyproj.crs.CRS("EPSG:4326"), pyproj.crs.CRS("EPSG:3785")
+    monkeypatch.setattr(pyproj.crs.CRS, 'to_wkt', lambda *args, **kwargs: pytest.fail())
+    assert cache.get(source, target) is t1
+
+    ## Test clear
+    cache.clear()
+    assert len(cache) == 0
+
+def test_get_transformer_shared_by_maps():
+    """ Test maps share transformers from projection.get_transformer """
+    import pymapkit as pmk
+    m1 = pmk.Map()
+    m2 = pmk.Map()
+    assert m1.transform_geo2proj is m2.transform_geo2proj
+    assert m1.transform_proj2geo is m2.transform_proj2geo
+    assert m1.transform_geo2proj is projection.get_transformer(m1.geographic_crs, m1.projected_crs)
+
+def test_transform_chunked():
+    """ Test projection.transform_chunked function """
+    from concurrent.futures import ThreadPoolExecutor
+    import threading
+
+    transformer = projection.get_transformer("EPSG:4326", "EPSG:3857")
+    x = np.linspace(-170, 170, 10001)
+    y = np.linspace(-80, 80, 10001)
+    expected_x, expected_y = transformer.transform(x, y)
+
+    ## Test chunks transform the same as a single call, serial and parallel
+    calls = []
+    with ThreadPoolExecutor(4) as executor:
+        for pool in (None, executor):
+            calls.clear()
+            out_x, out_y = projection.transform_chunked(transformer, x, y, chunk_size=1000,
+                executor=pool, progress=lambda done, total: calls.append((done, total)))
+            assert out_x.tolist() == pytest.approx(expected_x.tolist())
+            assert out_y.tolist() == pytest.approx(expected_y.tolist())
+
+            ## Test progress is reported after each chunk
+            assert len(calls) == 11
+            assert calls[-1] == (10001, 10001)
+
+    ## Test a set cancel event raises
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(projection.TransformCancelled):
+        projection.transform_chunked(transformer, x, y, chunk_size=1000, cancel=cancel)
+
+def test_chunked_transformer():
+    """ Test projection.ChunkedTransformer class """
+    transformer = projection.get_transformer("EPSG:4326", "EPSG:3857")
+    x = np.linspace(-170, 170, 5000)
+    y = np.linspace(-80, 80, 5000)
+    expected_x, _ = transformer.transform(x, y)
+
+    ## Test pool is only created for arrays larger than a chunk
+    chunked = projection.ChunkedTransformer(workers=2, chunk_size=1000)
+    chunked.transform(transformer, x[:10], y[:10])
+    assert chunked._executor is None
+
+    out_x, _ = chunked.transform(transformer, x, y)
+    assert chunked._executor is not None
+    assert out_x.tolist() == pytest.approx(expected_x.tolist())
+
+    ## Test single worker runs without a pool
+    chunked.set_workers(1)
+    assert chunked.get_executor() is None
+
+def test_approx_transform():
+    """ Test projection.approx_transform function """
+    transformer = projection.get_transformer("EPSG:4267", "EPSG:32023")
+    rng = np.random.default_rng(0)
+    x = rng.uniform(-84, -80, 50000)
+    y = rng.uniform(38, 41, 50000)
+    expected_x, expected_y = transformer.transform(x, y)
+
+    ## Test approximated values are within tolerance
+    for tolerance in (10.0, 0.1):
+        out_x, out_y = projection.approx_transform(transformer, x, y, tolerance)
+        assert np.hypot(out_x - expected_x, out_y - expected_y).max() <= tolerance
+
+    ## Test small inputs are transformed exactly
+    out_x, out_y = projection.approx_transform(transformer, x[:100], y[:100], 10.0)
+    assert out_x.tolist() == expected_x[:100].tolist()
+
+    ## Test invalid inputs are left to the exact transform
+    x[5], y[7] = np.nan, np.inf
+    out_x, out_y = projection.approx_transform(transformer, x, y, 10.0)
+    assert not np.isfinite(out_x[5]) and not np.isfinite(out_y[7])
+    assert np.isfinite(np.delete(out_x, [5, 7])).all()
+
+def test_spherical_mercator_transformer():
+    """ Test projection.SphericalMercatorTransformer class """
+    ## Test the pair is detected, in both directions and for 3785
+    assert isinstance(projection.get_transformer("EPSG:4326", "EPSG:3857"), projection.SphericalMercatorTransformer)
+    assert projection.get_transformer("EPSG:3785", "EPSG:4326").inverse == True
+    assert not isinstance(projection.get_transformer("EPSG:4326", "EPSG:3857", always_xy=False), projection.SphericalMercatorTransformer)
+    assert not isinstance(projection.get_transformer("EPSG:4267", "EPSG:3857"), projection.SphericalMercatorTransformer)
+
+    forward = projection.SphericalMercatorTransformer()
+    inverse = projection.SphericalMercatorTransformer(inverse=True)
+    exact = pyproj.Transformer.from_crs("EPSG:4326", "EPSG:3857", always_xy=True)
+
+    ## Test values match PROJ, and round trip
+    lon = np.linspace(-180, 180, 1001)
+    lat = np.linspace(-85, 85, 1001)
+    expected_x, expected_y = exact.transform(lon, lat)
+    merc_x, merc_y = forward.transform(lon, lat)
+    assert merc_x.tolist() == pytest.approx(expected_x.tolist(), abs=1e-6)
+    assert merc_y.tolist() == pytest.approx(expected_y.tolist(), abs=1e-6)
+    geo_x, geo_y = inverse.transform(merc_x, merc_y)
+    assert geo_x.tolist() == pytest.approx(lon.tolist(), abs=1e-9)
+    assert geo_y.tolist() == pytest.approx(lat.tolist(), abs=1e-9)
+
+    ## Test singlet values match PROJ exactly
+    assert forward.transform(-83.0, 40.0) == exact.transform(-83.0, 40.0)
+
+    ## Test latitudes are clamped, wrapped, and invalid past the poles
+    merc_x, merc_y = forward.transform([190.0, 0.0, 0.0, 0.0], [0.0, 89.0, -90.0, 95.0])
+    assert merc_x[0] == pytest.approx(exact.transform(-170.0, 0.0)[0])
+    assert merc_y[1] == pytest.approx(20037508.342789244)
+    assert merc_y[2] == pytest.approx(-20037508.342789244)
+    assert merc_x[3] == inf and merc_y[3] == inf
+
+    ## Test in place transform
+    x, y = np.array([10.0]), np.array([45.0])
+    forward.transform(x, y, inplace=True)
+    assert (x[0], y[0]) == pytest.approx(exact.transform(10.0, 45.0))
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Author: Ben Knisley [benknisley@gmail.com]
+Date: 16 October, 2026
+"""
+import numpy as np
+from pymapkit.simplify import vertex_importance, simplified_offsets, pixel_decimate
+
+
+def douglas_peucker(x_values, y_values, tolerance):
+    """ Returns the vertices kept by a plain recursive Douglas-Peucker """
+    def segment_distance(index, start, end):
+        dx, dy = x_values[end] - x_values[start], y_values[end] - y_values[start]
+        px, py = x_values[index] - x_values[start], y_values[index] - y_values[start]
+        length = dx * dx + dy * dy
+        t = 0.0 if length == 0 else min(1.0, max(0.0, (px * dx + py * dy) / length))
+        return np.hypot(px - t * dx, py - t * dy)
+
+    kept = [0, len(x_values) - 1]
+    def simplify(start, end):
+        if end - start < 2:
+            return
+        distance, index = max((segment_distance(i, start, end), -i) for i in range(start + 1, end))
+        if distance > tolerance:
+            kept.append(-index)
+            simplify(start, -index)
+            simplify(-index, end)
+    simplify(0, len(x_values) - 1)
+    return sorted(kept)
+
+
+def test_vertex_importance():
+    """ Test importance thresholds matching Douglas-Peucker """
+    rng = np.random.default_rng(0)
+    for _ in range(10):
+        count = rng.integers(2, 50)
+        x_values, y_values = np.cumsum(rng.normal(size=(2, count)), axis=1)
+        importance = vertex_importance(x_values, y_values, np.array([0, count]))
+        for tolerance in (0.1, 0.5, 1.0, 3.0):
+            assert np.flatnonzero(importance > tolerance).tolist() == douglas_peucker(x_values, y_values, tolerance)
+
+
+def test_vertex_importance_parts():
+    """ Test importance keeping part ends, nan vertices, & ring shapes """
+    ## A straight line, a nan vertex, & a square ring, in three parts
+    x_values = np.array([0.0, 1, 2, 3, 0, np.nan, 2, 0, 1, 1, 0, 0])
+    y_values = np.array([0.0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 0])
+    part_offsets = np.array([0, 4, 7, 12])
+
+    importance = vertex_importance(x_values, y_values, part_offsets)
+    assert np.flatnonzero(importance > 100).tolist() == [0, 3, 4, 5, 6, 7, 11]
+
+    ## Test rings keep a triangle when always keeping two levels
+    importance = vertex_importance(x_values, y_values, part_offsets, keep_depth=2)
+    assert np.count_nonzero(importance[7:] > 100) >= 4
+
+
+def test_simplified_offsets():
+    """ Test simplified_offsets counting the kept vertices of each part """
+    keep = np.array([True, False, True, True, False, False, True])
+    assert simplified_offsets(keep, np.array([0, 3, 3, 7])).tolist() == [0, 2, 2, 4]
+
+
+def test_pixel_decimate():
+    """ Test pixel_decimate dropping vertices on the pixel before them """
+    pix_x = np.array([0.0, 0.2, 3, 3.4, np.nan, np.nan, 5, 5.1, 5.2, 8, 8, 9])
+    pix_y = np.array([0.0, 0.1, 0, 0.3, 0, 0, 5, 5, 5, 8, 9, 9])
+    part_offsets = np.array([0, 4, 6, 9, 12])
+
+    keep, part_counts = pixel_decimate(pix_x, pix_y, part_offsets)
+    assert np.flatnonzero(keep).tolist() == [0, 2, 4, 5, 6, 9, 10, 11]
+    assert part_counts.tolist() == [2, 2, 1, 3]
+
+    ## Test parts left too small are dropped whole
+    keep, part_counts = pixel_decimate(pix_x, pix_y, part_offsets, min_count=3)
+    assert np.flatnonzero(keep).tolist() == [9, 10, 11]
+    assert part_counts.tolist() == [0, 0, 0, 3]
@@ -49,6 +49,46 @@ def test_is_canvas():
     assert r.is_canvas(None) == False
 
 
+def test_offscreen():
+    """ Test SkiaRenderer offscreen surface methods """
+    r = pmk.SkiaRenderer()
+    canvas = r.new_canvas(20, 20)
+    surface = r.surface
+
+    ## Test offscreen surfaces don't replace the main surface
+    offscreen = r.new_offscreen(10, 10)
+    assert r.surface is surface
+    assert isinstance(r.offscreen_canvas(offscreen), skia.Canvas)
+
+    ## Test surfaces start transparent
+    assert offscreen.makeImageSnapshot().toarray()[5, 5].tolist() == [0, 0, 0, 0]
+
+    ## Test surfaces are composited at location with opacity
+    r.offscreen_canvas(offscreen).clear(skia.ColorRED)
+    canvas.clear(skia.ColorWHITE)
+    r.draw_offscreen(canvas, offscreen, 5, 5, opacity=0.5)
+    pixels = surface.makeImageSnapshot().toarray()
+    assert pixels[0, 0].tolist() == [255, 255, 255, 255]
+    blue, green, red, alpha = pixels[10, 10].tolist()
+    assert (red, alpha) == (255, 255)
+    assert green == pytest.approx(127, abs=1)
+
+    ## Test clipping limits drawing to a rectangle until popped
+    canvas.clear(skia.ColorWHITE)
+    r.push_clip(canvas, 0, 0, 5, 20)
+    canvas.clear(skia.ColorRED)
+    r.pop_clip(canvas)
+    pixels = surface.makeImageSnapshot().toarray()
+    assert pixels[10, 2].tolist() == [0, 0, 255, 255]
+    assert pixels[10, 10].tolist() == [255, 255, 255, 255]
+
+    ## Test clearing a region makes only it transparent
+    r.clear_region(canvas, 0, 0, 5, 5)
+    pixels = surface.makeImageSnapshot().toarray()
+    assert pixels[2, 2].tolist() == [0, 0, 0, 0]
+    assert pixels[10, 2].tolist() == [0, 0, 255, 255]
+
+
 def test_save():
     """ Test SkiaRenderer.save """
     ## Setup
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Author: Ben Knisley [benknisley@gmail.com]
+Date: 16 October, 2026
+"""
+import numpy as np
+import pytest
+from pymapkit.spatial_index import PackedRTree
+
+
+def brute_force(min_x, min_y, max_x, max_y, box):
+    """ Returns the indices of boxes intersecting a box, by testing each """
+    q_min_x, q_min_y, q_max_x, q_max_y = box
+    return np.flatnonzero((max_x >= q_min_x) & (min_x <= q_max_x) & (max_y >= q_min_y) & (min_y <= q_max_y))
+
+
+def test_packed_rtree_query():
+    """ Test PackedRTree.query matching a brute force search """
+    rng = np.random.default_rng(1)
+    for count in (0, 1, 16, 17, 1000):
+        x, y, size = rng.uniform(0, 100, count), rng.uniform(0, 100, count), rng.uniform(0, 5, count)
+        boxes = (x, y, x + size, y + size)
+        tree = PackedRTree(*boxes, node_size=4)
+        assert len(tree) == count
+
+        for box in ((10, 10, 30, 20), (0, 0, 105, 105), (-10, -10, -1, -1), (50, 50, 50, 50)):
+            assert tree.query(*box).tolist() == brute_force(*boxes, box).tolist()
+
+
+def test_packed_rtree_empty_boxes():
+    """ Test PackedRTree never matching inverted, empty extents """
+    inf = np.inf
+    tree = PackedRTree(np.array([0, inf, 2.0]), np.array([0, inf, 2.0]),
+        np.array([1, -inf, 3.0]), np.array([1, -inf, 3.0]))
+    assert tree.query(-inf, -inf, inf, inf).tolist() == [0, 2]
+
+
+def test_packed_rtree_query_many():
+    """ Test PackedRTree.query_many matching single queries """
+    rng = np.random.default_rng(2)
+    x, y = rng.uniform(0, 100, 500), rng.uniform(0, 100, 500)
+    tree = PackedRTree(x, y, x + 2, y + 2, node_size=8)
+
+    query_x, query_y = rng.uniform(0, 100, 50), rng.uniform(0, 100, 50)
+    query_indices, indices = tree.query_many(query_x - 3, query_y - 3, query_x + 3, query_y + 3)
+    for query in range(50):
+        expected = tree.query(query_x[query] - 3, query_y[query] - 3, query_x[query] + 3, query_y[query] + 3)
+        assert indices[query_indices == query].tolist() == expected.tolist()
+
+
+def test_packed_rtree_nearest():
+    """ Test PackedRTree.nearest finding boxes in order of distance """
+    rng = np.random.default_rng(3)
+    x, y = rng.uniform(0, 100, 300), rng.uniform(0, 100, 300)
+    tree = PackedRTree(x, y, x, y, node_size=4)
+    distances = np.hypot(x - 40, y - 60)
+
+    indices, found = tree.nearest(40, 60, k=10)
+    assert indices.tolist() == np.argsort(distances)[:10].tolist()
+    assert found == pytest.approx(np.sort(distances)[:10])
+
+    ## Test max_distance limits the boxes returned
+    indices, found = tree.nearest(40, 60, k=300, max_distance=10)
+    assert len(indices) == np.sum(distances <= 10)
+
+    ## Test the exact distance function orders the results
+    indices, _ = tree.nearest(40, 60, k=3, distance_fn=lambda found: 1000 - found)
+    assert indices.tolist() == [299, 298, 297]
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Author: Ben Knisley [benknisley@gmail.com]
+Date: 16 October, 2026
+"""
+import pytest
+from unittest.mock import MagicMock
+import numpy as np
+import pymapkit as pmk
+from pymapkit.vector_layer import VectorLayer, FeatureList
+
+
+def make_layer(geometry_type='polygon', count=20):
+    """ Creates a layer of small squares over the continental US """
+    layer = VectorLayer(geometry_type, ['name'])
+    for i in range(count):
+        feature = layer.new()
+        feature['name'] = f'feature {i}'
+        x, y = -120.0 + i * 2, 30.0 + i % 10
+        feature.geometry.add_subgeometry([x, x + 1, x + 1, x, x], [y, y, y + 1, y + 1, y])
+
+    ## Layers hold geo values in x_values until activated
+    layer.geo_x_values = layer.x_values
+    layer.geo_y_values = layer.y_values
+    return layer
+
+
+def test_projection_cache():
+    """ Test VectorLayer reusing cached projections """
+    m = pmk.Map()
+    layer = make_layer()
+    m.add(layer)
+    layer.build_spatial_index()
+
+    mercator_x, mercator_index = layer.x_values, layer.spatial_index
+
+    ## Test switching projection reprojects the layer
+    m.set_projection('EPSG:32023')
+    layer.refresh()
+    assert layer.x_values is not mercator_x
+    assert layer.spatial_index is None
+
+    ## Test switching back restores projected values and the spatial index
+    m.geo2proj = MagicMock(side_effect=m.geo2proj)
+    m.set_projection('EPSG:3785')
+    layer.refresh()
+    ## Only the map location should have been converted
+    for args, _ in m.geo2proj.call_args_list:
+        assert not isinstance(args[0], np.ndarray)
+    assert layer.x_values is mercator_x
+    assert layer.spatial_index is mercator_index
+
+    ## Test cache is bounded
+    layer.projection_cache_size = 1
+    for crs in ('EPSG:32023', 'EPSG:2163', 'EPSG:3785'):
+        m.set_projection(crs)
+        layer.refresh()
+    assert len(layer._projection_cache) == 1
+
+    ## Test clearing the cache
+    layer.clear_projection_cache()
+    assert len(layer._projection_cache) == 0
+
+
+def test_projection_cache_tolerance():
+    """ Test VectorLayer reusing cached approximate projections """
+    m = pmk.Map()
+    m.set_approximate(0.5)
+    layer = make_layer()
+    m.add(layer)
+    mercator_x = layer.x_values
+    assert layer.projection_tolerance == m.get_approx_tolerance()
+
+    ## Test values are reused after zooming out, as they are accurate enough
+    m.set_projection('EPSG:32023')
+    layer.refresh()
+    m.set_scale(m.get_scale() * 4)
+    m.set_projection('EPSG:3785')
+    layer.refresh()
+    assert layer.x_values is mercator_x
+
+    ## Test values are reprojected after zooming in past their accuracy
+    m.set_projection('EPSG:32023')
+    layer.refresh()
+    m.set_scale(m.get_scale() / 16)
+    m.set_projection('EPSG:3785')
+    layer.refresh()
+    assert layer.x_values is not mercator_x
+    assert layer.projection_tolerance == m.get_approx_tolerance()
+
+
+def test_projection_cache_geo_edits():
+    """ Test VectorLayer not reusing projections of replaced geo values """
+    m = pmk.Map()
+    layer = make_layer('point', count=1)
+    layer.geo_x_values = np.array([-100.0])
+    layer.geo_y_values = np.array([40.0])
+    m.add(layer)
+    m.set_projection('EPSG:32023')
+    layer.refresh()
+
+    ## Test replacing values with as many values marks the layer stale
+    layer.geo_x_values = np.array([-80.0])
+    assert layer.stale
+
+    ## Test switching back projects the new values, not the cached ones
+    m.set_projection('EPSG:3785')
+    layer.refresh()
+    assert layer.x_values[0] == pytest.approx(m.geo2proj(-80.0, 40.0)[0])
+
+
+def test_version():
+    """ Test VectorLayer version changing with content and style edits """
+    layer = make_layer(count=3)
+
+    ## Test adding features changes the version
+    version = layer.version
+    layer.new()
+    assert layer.version > version
+
+    ## Test feature style changes change the version
+    version = layer.version
+    layer[0].set_fill_color('red')
+    assert layer.version > version
+
+    ## Test layer wide style changes change the version
+    version = layer.version
+    layer.set_outline_display('none')
+    assert layer.version > version
+
+
+def test_columnar_coordinates():
+    """ Test VectorLayer holding coordinates in columnar arrays """
+    layer = make_layer(count=3)
+
+    ## Test values are views of the coordinate store
+    assert isinstance(layer.x_values, np.ndarray)
+    assert len(layer.x_values) == 15
+    assert layer[1].geometry.start_address == 5
+    assert layer[1].geometry.structure == [5]
+
+    ## Test adding a subgeometry to an earlier feature moves those after it
+    layer[0].geometry.add_subgeometry([0.0, 1.0, 0.0], [0.0, 0.0, 1.0])
+    assert layer[0].geometry.structure == [5, 3]
+    assert layer[1].geometry.start_address == 8
+    assert layer[0].geometry.get_subgeometry(1)[0].tolist() == [0.0, 1.0, 0.0]
+
+    ## Test activating projects the stored geo values
+    m = pmk.Map()
+    m.add(layer)
+    assert layer.x_values is not layer.geo_x_values
+    assert layer.x_values[0] == pytest.approx(m.geo2proj(-120.0, 30.0)[0])
+
+    ## Test adding features to an active layer reprojects it when next used
+    feature = layer.new()
+    feature.geometry.add_subgeometry([-80.0], [40.0])
+    assert layer.stale
+    layer.refresh()
+    assert len(layer.x_values) == 19
+    assert feature.geometry.get_points()[0][0] == pytest.approx(m.geo2proj(-80.0, 40.0)[0])
+
+
+def test_lazy_features():
+    """ Test VectorLayer creating features & styles only when used """
+    layer = make_layer(count=5)
+
+    ## Test no features or feature styles are held after loading
+    assert len(layer._feature_cache) == 0
+    assert layer._feature_styles == {}
+    assert layer[2]['name'] == 'feature 2'
+    assert layer[-1]['name'] == 'feature 4'
+
+    ## Test features in use are the same object, & have no style until used
+    feature = layer[1]
+    assert layer[1] is feature
+    assert 1 not in layer._feature_styles
+
+    ## Test using a style setter gives the feature its own style
+    feature.set_fill_color('red')
+    assert layer._feature_styles[1] is feature.style
+    assert feature.get_fill_color() == 'red'
+    assert layer._default_style['fill_color'] == 'green'
+
+    ## Test restyled features are drawn last
+    assert list(layer._raised) == [1]
+
+    ## Test new feature styles match layer wide style changes
+    layer.set_fill_color('blue')
+    assert feature.get_fill_color() == 'blue'
+    assert layer[3].style['fill_color'] == 'blue'
+
+    ## Test selecting by field only creates matching features
+    selected = layer['name'] == 'feature 4'
+    assert len(selected) == 1 and selected[0].index == 4
+    assert layer['name']['feature 0'].index == 0
+
+
+def test_shared_styles():
+    """ Test features sharing styles until changed """
+    layer = make_layer(count=5)
+
+    ## Test getters read the shared default style without copying it
+    assert layer[0].get_fill_color() == 'green'
+    assert layer[0].style is layer[1].style is layer._default_style
+    assert layer._feature_styles == {}
+
+    ## Test features restyled together share one copy of the style
+    selection = FeatureList(layer, [layer[0], layer[1], layer[2]])
+    selection.set_fill_color('red')
+    shared = layer[0].style
+    assert shared is layer[1].style is layer[2].style
+    assert shared.users == 3
+    assert layer[3].get_fill_color() == 'green'
+
+    ## Test the renderer cache is shared by features using the style
+    shared.cached_renderer_fn = object()
+    assert layer[2].style.cached_renderer_fn is shared.cached_renderer_fn
+
+    ## Test changing a shared style copies it for the changed feature only
+    layer[1].set_fill_color('blue')
+    assert layer[1].style is not shared
+    assert layer[0].get_fill_color() == layer[2].get_fill_color() == 'red'
+    assert shared.users == 2
+
+    ## Test a style only used by one feature is changed in place
+    style = layer[1].style
+    layer[1].set_fill_color('orange')
+    assert layer[1].style is style
+    assert layer[1].get_fill_color() == 'orange'
+
+    ## Test layer wide edits change every style of the layer in place
+    layer.set_fill_color('purple')
+    assert layer[0].style is shared and layer[1].style is style
+    assert layer[3].get_fill_color() == layer[0].get_fill_color() == 'purple'
+    assert layer.feature_styles() == layer.feature_styles(writable=True)
+
+    ## Test layer wide edits copy styles shared with another layer first
+    other = make_layer(count=2)
+    other[0].style = layer[0].style
+    other.set_fill_color('black')
+    assert layer[0].get_fill_color() == 'purple'
+    assert other[0].get_fill_color() == other[1].get_fill_color() == 'black'
+    assert other[0].style.feature is other
+
+
+def test_attribute_columns():
+    """ Test VectorLayer holding attributes in typed columns """
+    layer = make_layer(count=5)
+    for index in range(len(layer)):
+        layer[index]['size'] = index * 10
+    layer[2]['size'] = None
+
+    ## Test whole column access & selection, without features
+    column = layer.column('size')
+    assert column.values.dtype == np.int64
+    assert column.null_mask.tolist() == [False, False, True, False, False]
+    assert layer.field_mask('size', '>=', 10).tolist() == [False, True, False, True, True]
+    assert layer.column('name').categories[:2] == ['feature 0', 'feature 1']
+    assert len(layer._feature_cache) == 0
+
+    ## Test selections through FeatureDict use the columns
+    selected = layer['size'] > 10
+    assert [f.index for f in selected] == [3, 4]
+    assert layer['name']['feature 4'].index == 4
+    assert layer[2].attributes == {'name': 'feature 2', 'size': None}
+
+    ## Test attributes are a live view, which writes through to the columns
+    attributes = layer[2].attributes
+    attributes['size'] = 7
+    assert layer[2]['size'] == 7
+    assert layer.column('size').values[2] == 7
+    with pytest.raises(KeyError):
+        attributes['missing']
+
+    ## Test replacing attributes sets every field
+    layer[2].attributes = {'name': 'renamed'}
+    assert layer[2].attributes == {'name': 'renamed', 'size': None}
+
+
+def test_spatial_index():
+    """ Test VectorLayer selecting & culling through its spatial index """
+    m = pmk.Map()
+    layer = make_layer(count=10)
+    m.add(layer)
+
+    ## Test box_select finds geometries overlapping, or around, the box
+    min_x, min_y = m.geo2proj(-116.5, 32.5)
+    max_x, max_y = m.geo2proj(-113.5, 33.5)
+    assert [f.index for f in layer.box_select(min_x, min_y, max_x, max_y)] == [2, 3]
+    center_x, center_y = m.geo2proj(-119.5, 30.5)
+    assert [f.index for f in layer.box_select(center_x, center_y, center_x, center_y)] == [0]
+
+    ## Test the index is rebuilt for added geometries
+    index = layer.spatial_index
+    feature = layer.new()
+    feature.geometry.add_subgeometry([-115.0, -114.0, -114.0], [33.0, 33.0, 34.0])
+    assert 10 in [f.index for f in layer.box_select(min_x, min_y, max_x, max_y)]
+    assert layer.spatial_index is not index
+
+    ## Test culling skips geometries outside the view
+    m.set_location(30.5, -119.5)
+    m.set_scale(100)
+    assert layer.query_visible().tolist() == [0]
+    assert not layer[0].geometry.skip_draw and layer[1].geometry.skip_draw
+
+
+def test_render_visible():
+    """ Test VectorLayer.render drawing only geometries in view """
+    m = pmk.Map()
+    layer = make_layer(count=10)
+    m.add(layer)
+    m.set_location(31.5, -115.5)
+    m.set_scale(1000)
+    layer[2].set_fill_color('red')
+
+    renderer = MagicMock()
+    drawn = lambda: [call.args[4] for call in renderer.draw_polygon.call_args_list]
+    layer.render(renderer, None)
+    assert layer.query_visible().tolist() == [1, 2, 3]
+    assert renderer.draw_polygon.call_count == 3
+    assert drawn()[-1] is layer[2].style
+
+    ## Test all geometries are drawn without culling
+    renderer.reset_mock()
+    layer.view_sort = False
+    layer.render(renderer, None)
+    assert renderer.draw_polygon.call_count == 10
+
+
+def test_simplified_render():
+    """ Test VectorLayer.render drawing geometries simplified to the scale """
+    m = pmk.Map()
+    layer = VectorLayer('line', ['name'])
+    x_values = np.linspace(-120.0, -80.0, 401)
+    y_values = 40.0 + 0.01 * (-1) ** np.arange(401)
+    layer.new().geometry.add_subgeometry(x_values.tolist(), y_values.tolist())
+    layer.geo_x_values, layer.geo_y_values = layer.x_values, layer.y_values
+    m.add(layer)
+    m.set_location(40.0, -100.0)
+
+    renderer = MagicMock()
+    drawn = lambda: len(renderer.draw_line.call_args.args[2])
+
+    ## Test zoomed out, the wiggle is below a pixel & left out
+    m.set_scale(10**7)
+    layer.render(renderer, None)
+    assert drawn() < 20
+    assert renderer.draw_line.call_args.args[1] == [drawn()]
+
+    ## Test zoomed in, or without simplifying, every vertex is drawn
+    m.set_scale(1000)
+    layer.render(renderer, None)
+    assert drawn() == 401
+    m.set_scale(10**7)
+    layer.simplify = layer.pixel_decimate = False
+    layer.render(renderer, None)
+    assert drawn() == 401
+
+
+def test_pixel_decimate():
+    """ Test VectorLayer.render dropping vertices that share a pixel """
+    m = pmk.Map()
+    layer = make_layer(count=10)
+    layer.simplify = False
+    m.add(layer)
+    m.set_location(35.0, -110.0)
+
+    renderer = MagicMock()
+    drawn = lambda: [(call.args[1], len(call.args[2])) for call in renderer.draw_polygon.call_args_list]
+
+    ## Test zoomed in, squares keep all five vertices
+    m.set_scale(10**4)
+    layer.render(renderer, None)
+    assert all(structure == [5] and count == 5 for structure, count in drawn())
+    assert layer.render_stats['drawn_vertices'] == layer.render_stats['vertices']
+
+    ## Test zoomed out, squares fit in a pixel & are drawn as a dot
+    renderer.reset_mock()
+    m.set_scale(10**7)
+    layer.render(renderer, None)
+    assert renderer.draw_polygon.call_count == 10
+    x_values, y_values = renderer.draw_polygon.call_args.args[2:4]
+    assert np.ptp(x_values) == 1 and np.ptp(y_values) == 1
+    assert layer.render_stats['collapsed'] == 10
+
+    ## Test sub pixel features can be skipped instead
+    renderer.reset_mock()
+    layer.subpixel_policy = 'skip'
+    layer.render(renderer, None)
+    assert renderer.draw_polygon.call_count == 0
+    assert layer.render_stats['skipped'] == 10
+
+
+def test_point_select_many():
+    """ Test VectorLayer hit testing many points at once """
+    m = pmk.Map()
+    layer = make_layer(count=10)
+    m.add(layer)
+
+    ## Points inside squares 0 & 3, between squares, & inside square 0 again
+    points = [(-119.5, 30.5), (-113.5, 33.5), (-118.5, 30.5), (-119.9, 30.1)]
+    proj_points = [m.geo2proj(x, y) for x, y in points]
+    xs, ys = [x for x, _ in proj_points], [y for _, y in proj_points]
+
+    point_indices, geometry_indices = layer.point_select_many(xs, ys)
+    assert point_indices.tolist() == [0, 1, 3]
+    assert geometry_indices.tolist() == [0, 3, 0]
+
+    ## Test single point selection & point_within agree
+    assert [f.index for f in layer.point_select(xs[1], ys[1])] == [3]
+    assert layer[3].geometry.point_within(xs[1], ys[1])
+    assert not layer[3].geometry.point_within(xs[2], ys[2])
+
+
+def test_nearest():
+    """ Test VectorLayer.nearest ordering features by distance to their geometry """
+    m = pmk.Map()
+    layer = make_layer(count=10)
+    m.add(layer)
+
+    ## Test a point inside square 3 is nearest it, then its neighbours, the
+    ## one to the south nearer in mercator
+    x, y = m.geo2proj(-113.5, 33.5)
+    assert [f.index for f in layer.nearest(x, y, k=3)] == [3, 2, 4]
+    indices, distances = layer.nearest_indices(x, y, k=3)
+    assert distances[0] == 0 and distances[1] <= distances[2]
+
+    ## Test max_distance leaves out farther features
+    assert [f.index for f in layer.nearest(x, y, k=3, max_distance=distances[1])] == [3, 2]
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Author: Ben Knisley [benknisley@gmail.com]
+Date: 16 October, 2026
+"""
+import pytest
+from pymapkit.viewport import Viewport, exposed_regions
+
+
+def test_viewport_region():
+    """ Test Viewport.proj_bounds limited to a pixel region """
+    viewport = Viewport(400, 300, 1000.0, 2000.0, 10.0)
+    assert viewport.proj_bounds == pytest.approx((-1000, 500, 3000, 3500))
+
+    ## Test region bounds, with y flipped between pixels and projection
+    region_viewport = Viewport(400, 300, 1000.0, 2000.0, 10.0, region=(0, 0, 100, 50))
+    assert region_viewport.proj_bounds == pytest.approx((-1000, 3000, 0, 3500))
+
+    ## Test the region does not change the transform
+    assert region_viewport.proj2pix(1000.0, 2000.0) == viewport.proj2pix(1000.0, 2000.0)
+
+
+def test_viewport_bbox_region():
+    """ Test Viewport.bbox_region method """
+    viewport = Viewport(400, 300, 1000.0, 2000.0, 10.0)
+
+    ## Test boxes are rounded out to whole pixels, & padded
+    assert viewport.bbox_region(1000, 2000, 1100, 2100) == (200, 140, 10, 10)
+    assert viewport.bbox_region(1005, 2000, 1100, 2095, padding=2) == (198, 138, 14, 14)
+
+    ## Test regions are limited to the canvas
+    assert viewport.bbox_region(-5000, 2000, 1100, 2100) == (0, 140, 210, 10)
+    assert viewport.bbox_region(-5000, 0, -4000, 100) is None
+
+
+def test_exposed_regions():
+    """ Test exposed_regions function """
+    ## Test no shift exposes nothing
+    assert exposed_regions(400, 300, 0, 0) == []
+
+    ## Test single axis shifts
+    assert exposed_regions(400, 300, 10, 0) == [(0, 0, 10, 300)]
+    assert exposed_regions(400, 300, -10, 0) == [(390, 0, 10, 300)]
+    assert exposed_regions(400, 300, 0, 20) == [(0, 0, 400, 20)]
+    assert exposed_regions(400, 300, 0, -20) == [(0, 280, 400, 20)]
+
+    ## Test diagonal shifts don't overlap
+    assert exposed_regions(400, 300, 10, -20) == [(0, 0, 10, 300), (10, 280, 390, 20)]
+    assert exposed_regions(400, 300, -10, 20) == [(390, 0, 10, 300), (0, 0, 390, 20)]